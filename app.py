@@ -7,6 +7,8 @@ CLI interface for interacting with the blockchain.
 """
 
 from blockchain import Blockchain
+from events import configure_cli
+from mining import target_to_difficulty
 import sys
 
 class BlockchainCLI:
@@ -53,8 +55,9 @@ class BlockchainCLI:
             sender = input("Enter sender: ").strip()
             receiver = input("Enter receiver: ").strip()
             amount = float(input("Enter amount: "))
+            fee = float(input("Enter fee (default: 0): ").strip() or 0)
             
-            result = self.blockchain.new_transaction(sender, receiver, amount)
+            result = self.blockchain.new_transaction(sender, receiver, amount, fee=fee)
             if result:
                 print(f"📝 Transaction will be included in block {result}")
         except ValueError:
@@ -84,7 +87,10 @@ class BlockchainCLI:
     
     def verify_chain(self):
         print("\n🔍 Verifying blockchain integrity...")
-        self.blockchain.verify_chain()
+        report = self.blockchain.audit_chain()
+        if not report['valid']:
+            bad_blocks = len(set(report['invalid_hashes']) | set(report['broken_links']) | set(report['invalid_targets']))
+            print(f"⚠️ {bad_blocks} of {report['checked']} blocks failed verification")
     
     def edit_block_demo(self):
         print("\n🛠️ Block Editing Demo (Security Test)")
@@ -109,7 +115,7 @@ class BlockchainCLI:
             print(f"\n📝 MEMPOOL ({len(self.blockchain.mempool)} transactions)")
             print("-" * 30)
             for i, tx in enumerate(self.blockchain.mempool, 1):
-                print(f"{i}. {tx['sender']} → {tx['receiver']}: {tx['amount']}")
+                print(f"{i}. {tx['sender']} → {tx['receiver']}: {tx['amount']} (fee: {tx.get('fee', 0)})")
 
     def modify_difficulty_menu(self):
         """Menu for difficulty management"""
@@ -119,6 +125,18 @@ class BlockchainCLI:
             
             new_difficulty = int(input("Enter new difficulty (1-6 recommended): "))
             self.blockchain.modify_difficulty(new_difficulty)
+
+            interval = input("Retarget automatically every N blocks (Enter to keep a fixed difficulty): ").strip()
+            if interval:
+                block_time = float(input("Target seconds per block: "))
+                first_run = self.blockchain.retarget_start is None
+                self.blockchain.modify_retargeting(int(interval), block_time)
+                if first_run:
+                    print("🎯 Automatic retargeting enabled (starting from the difficulty above)")
+                else:
+                    print("🎯 Automatic retargeting enabled (continuing from the chain's starting target)")
+            else:
+                self.blockchain.modify_retargeting(None)
             
         except ValueError:
             print("❌ Please enter a valid integer")
@@ -128,6 +146,7 @@ class BlockchainCLI:
     def save_blockchain(self):
         """Save blockchain to file"""
         try:
+            print("Tip: use a .blocklog filename to keep an append-only log that only writes new blocks")
             filename = input("Enter filename (default: blockchain.pkl): ").strip()
             if not filename:
                 filename = "blockchain.pkl"
@@ -163,10 +182,20 @@ class BlockchainCLI:
         print(f"Total Transactions: {info['total_transactions']}")
         print(f"Pending Transactions: {info['pending_transactions']}")
         print(f"Difficulty: {info['difficulty']}")
+        if info['next_target'] is not None:
+            print(f"Next Block Difficulty: {target_to_difficulty(info['next_target']):.2f} (retargeting)")
         print(f"Chain Valid: {'✅ Yes' if info['chain_valid'] else '❌ No'}")
         if info['last_block_hash']:
             print(f"Last Block Hash: {info['last_block_hash'][:16]}...")
 
+        metrics = info['metrics']
+        mining_time = metrics['histograms'].get('block_time_seconds')
+        print(f"Blocks Mined (this session): {metrics['counters'].get('blocks_mined_total', 0)}")
+        if 'hashrate' in metrics['gauges']:
+            print(f"Last Hashrate: {metrics['gauges']['hashrate']:,.0f} H/s")
+        if mining_time:
+            print(f"Average Time per Block: {mining_time['mean']:.2f}s")
+
     def run(self):
         while True:
             self.show_menu()
@@ -209,5 +238,7 @@ class BlockchainCLI:
                 print(f"❌ An error occurred: {e}")
 
 if __name__ == "__main__":
+    # Show the library's status messages on the console
+    configure_cli()
     cli = BlockchainCLI()
     cli.run()
\ No newline at end of file
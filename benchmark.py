@@ -0,0 +1,575 @@
+"""
+Performance Benchmarks
+Measures the hot paths of the blockchain so optimizations can be compared against the original implementation.
+Created by: Zyle Estacion (s4064846)
+RMIT University - INTE264 Assignment 2
+
+Usage: python benchmark.py [benchmark ...]
+"""
+
+from blockchain import Blockchain
+from block import Block
+from mining import MiningHasher
+from transaction import Transaction
+from merkle import merkle_root
+from codec import encode_block, decode_block, BINARY_HASHING
+from compression import save_compressed, load_compressed
+from node import NodeClient
+from verification import audit_chain
+import argparse
+import asyncio
+import hashlib
+import os
+import pickle
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+
+
+def sample_block(transaction_count=5):
+    """
+    Builds an unmined block holding a handful of realistic transactions.
+    """
+    transactions = [
+        {
+            'transaction_id': hashlib.sha256(f"tx{i}".encode()).hexdigest(),
+            'sender': f"sender{i}",
+            'receiver': f"receiver{i}",
+            'amount': 10 + i,
+            'spent_transactions': [hashlib.sha256(f"input{i}".encode()).hexdigest()],
+            'transaction_time': time.time()
+        }
+        for i in range(transaction_count)
+    ]
+    return Block(
+        id=2,
+        timestamp=time.time(),
+        transactions=transactions,
+        previous_hash=hashlib.sha256(b"previous").hexdigest(),
+        nonce=0,
+        current_hash=""
+    )
+
+
+def naive_hash(block, nonce):
+    """
+    The original hashing path: rebuild the whole string and hash it from scratch for every nonce.
+    """
+    hashable_string = f"{block.id}{block.timestamp}{block.transactions}{block.previous_hash}{nonce}"
+    return hashlib.sha256(hashable_string.encode()).hexdigest()
+
+
+def benchmark_hashing(difficulties=(4, 5, 6), max_attempts=300000):
+    """
+    Compares hashes/sec of the naive hash against the midstate hasher while mining at each difficulty.
+    Each run stops at a valid nonce or after max_attempts, whichever comes first.
+    """
+    print("\n⏱️ HASHING BENCHMARK (naive f-string vs midstate)")
+    print("=" * 60)
+
+    block = sample_block()
+    hasher = MiningHasher.for_block(block)
+
+    # Sanity check: both paths must agree with Blockchain.hash
+    block.nonce = 12345
+    assert naive_hash(block, 12345) == hasher.hash(12345) == Blockchain.hash(block)
+    block.nonce = 0
+
+    for difficulty in difficulties:
+        target = "0" * difficulty
+        results = {}
+        for name, hash_fn in (("naive", lambda nonce: naive_hash(block, nonce)), ("midstate", hasher.hash)):
+            start = time.perf_counter()
+            attempts = 0
+            for nonce in range(max_attempts):
+                attempts += 1
+                if hash_fn(nonce).startswith(target):
+                    break
+            elapsed = time.perf_counter() - start
+            results[name] = attempts / elapsed
+
+        speedup = results['midstate'] / results['naive']
+        print(f"Difficulty {difficulty}: naive {results['naive']:,.0f} H/s | "
+              f"midstate {results['midstate']:,.0f} H/s | {speedup:.2f}x")
+
+
+def build_chain(length, transactions_per_block=5):
+    """
+    Builds a linked chain of unmined blocks (hashes are valid, PoW is skipped).
+    """
+    chain = []
+    previous_hash = None
+    for i in range(length):
+        block = sample_block(transactions_per_block)
+        block.id = i + 1
+        block.previous_hash = previous_hash
+        block.current_hash = Blockchain.hash(block)
+        chain.append(block)
+        previous_hash = block.current_hash
+    return chain
+
+
+def benchmark_verification(length=100000):
+    """
+    Times a full chain audit with an increasing number of worker processes.
+    """
+    print(f"\n⏱️ VERIFICATION BENCHMARK ({length:,} blocks)")
+    print("=" * 60)
+
+    chain = build_chain(length)
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for workers in worker_counts:
+        start = time.perf_counter()
+        report = audit_chain(chain, workers=workers)
+        elapsed = time.perf_counter() - start
+        print(f"{workers} worker(s): {elapsed:.2f}s ({length / elapsed:,.0f} blocks/s, valid={report['valid']})")
+
+
+def benchmark_header_hashing(transaction_counts=(10, 100, 1000), attempts=20000):
+    """
+    Compares the cost of a full Blockchain.hash call for full-list and header (Merkle root) blocks as blocks grow.
+    """
+    print("\n⏱️ HEADER HASHING BENCHMARK (full transaction list vs Merkle header)")
+    print("=" * 60)
+
+    for count in transaction_counts:
+        block = sample_block(count)
+        results = {}
+        for name, root in (("full", None), ("header", merkle_root(block.transactions))):
+            block.merkle_root = root
+            start = time.perf_counter()
+            for nonce in range(attempts):
+                block.nonce = nonce
+                Blockchain.hash(block)
+            results[name] = attempts / (time.perf_counter() - start)
+        print(f"{count:>5} transactions: full {results['full']:,.0f} H/s | header {results['header']:,.0f} H/s")
+
+
+def benchmark_batch(transactions=50000):
+    """
+    Compares admitting transactions one at a time against a single new_transactions batch.
+    """
+    print(f"\n⏱️ BATCH SUBMISSION BENCHMARK ({transactions:,} transactions)")
+    print("=" * 60)
+
+    single = Blockchain()
+    single.modify_mempool_size(None)
+    start = time.perf_counter()
+    for i in range(transactions):
+        single.new_transaction(f"sender{i}", "receiver", i + 1)
+    single_elapsed = time.perf_counter() - start
+
+    batched = Blockchain()
+    batched.modify_mempool_size(None)
+    items = [{'sender': f"sender{i}", 'receiver': "receiver", 'amount': i + 1} for i in range(transactions)]
+    start = time.perf_counter()
+    batched.new_transactions(items)
+    batch_elapsed = time.perf_counter() - start
+
+    print(f"new_transaction : {transactions / single_elapsed:,.0f} tx/s")
+    print(f"new_transactions: {transactions / batch_elapsed:,.0f} tx/s ({single_elapsed / batch_elapsed:.2f}x)")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def rpc_load(port, transactions, connections, mine_every):
+    """
+    Sends transactions from several connections at once, mining a block every mine_every transactions.
+
+    Returns:
+        tuple: (elapsed seconds, list of per-request latencies in seconds)
+    """
+    # Wait for the node to start listening
+    for _ in range(100):
+        try:
+            clients = [await NodeClient(port=port).connect() for _ in range(connections)]
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+    else:
+        raise Exception("Node did not start")
+
+    latencies = []
+    mining = []
+
+    async def sender(client, count, offset):
+        for i in range(count):
+            start = time.perf_counter()
+            await client.call('new_transaction', sender=f"user{offset}", receiver=f"user{i}", amount=i + 1)
+            latencies.append(time.perf_counter() - start)
+            if (offset + i * connections) % mine_every == 0:
+                mining.append(asyncio.create_task(clients[0].call('mine')))
+
+    per_client = transactions // connections
+    start = time.perf_counter()
+    await asyncio.gather(*(sender(client, per_client, n) for n, client in enumerate(clients)))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.gather(*mining)
+    for client in clients:
+        await client.close()
+    return elapsed, latencies
+
+
+def benchmark_rpc(transactions=2000, connections=10, mine_every=500):
+    """
+    Load-tests a node started on localhost: transactions/sec and latency percentiles while blocks are mined.
+    """
+    print(f"\n⏱️ RPC LOAD TEST ({transactions:,} transactions over {connections} connections)")
+    print("=" * 60)
+
+    port = free_port()
+    node = subprocess.Popen(
+        [sys.executable, "node.py", "--port", str(port), "--genesis", "--log-level", "WARNING"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        stdout=subprocess.DEVNULL
+    )
+    try:
+        elapsed, latencies = asyncio.run(rpc_load(port, transactions, connections, mine_every))
+    finally:
+        node.terminate()
+        node.wait()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} tx/s")
+    print(f"Latency: p50 {p50 * 1000:.2f} ms | p99 {p99 * 1000:.2f} ms | max {latencies[-1] * 1000:.2f} ms")
+
+
+class LegacyBlock:
+    """
+    The original Block layout (a plain class with a per-instance __dict__), kept for comparison.
+    """
+    def __init__(self, id, timestamp, transactions, previous_hash, nonce, current_hash):
+        self.id = id
+        self.timestamp = timestamp
+        self.transactions = transactions
+        self.previous_hash = previous_hash
+        self.nonce = nonce
+        self.current_hash = current_hash
+
+
+def build_memory_sample(block_type, make_transaction, blocks, transactions_per_block):
+    """
+    Builds a chain-shaped structure using the given block type and transaction factory.
+    """
+    addresses = [f"address{i}" for i in range(100)]
+    chain = []
+    for b in range(blocks):
+        transactions = []
+        for t in range(transactions_per_block):
+            n = b * transactions_per_block + t
+            transactions.append(make_transaction(
+                transaction_id=hashlib.sha256(f"tx{n}".encode()).hexdigest(),
+                # Rebuild the address string so each transaction holds its own copy, like parsed input would
+                sender="".join(addresses[n % 100]),
+                receiver="".join(addresses[(n + 1) % 100]),
+                amount=n,
+                spent_transactions=[hashlib.sha256(f"tx{n - 1}".encode()).hexdigest()],
+                transaction_time=time.time()
+            ))
+        chain.append(block_type(b + 1, time.time(), transactions, "0" * 64, b, "0" * 64))
+    return chain
+
+
+def benchmark_memory(blocks=2000, transactions_per_block=5):
+    """
+    Compares the heap used by the original dict/__dict__ representation and the slotted Block/Transaction records.
+    """
+    print(f"\n⏱️ MEMORY BENCHMARK ({blocks:,} blocks x {transactions_per_block} transactions)")
+    print("=" * 60)
+
+    variants = (
+        ("dict + __dict__ Block", LegacyBlock, dict),
+        ("Transaction + slotted Block", Block, Transaction),
+    )
+    results = {}
+    for name, block_type, make_transaction in variants:
+        tracemalloc.start()
+        chain = build_memory_sample(block_type, make_transaction, blocks, transactions_per_block)
+        results[name] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del chain
+        print(f"{name:<30}: {results[name] / 1024 / 1024:.2f} MiB")
+
+    old, new = (results[name] for name, _, _ in variants)
+    print(f"Saved {100 * (1 - new / old):.1f}% of heap")
+
+
+def benchmark_codec(blocks=2000, transactions_per_block=20, hash_attempts=50000):
+    """
+    Compares the binary codec with pickle for encoding and decoding blocks, and the text hash preimage (f-string)
+    with the binary header for hashing.
+    """
+    print(f"\n⏱️ CODEC BENCHMARK ({blocks:,} blocks x {transactions_per_block} transactions)")
+    print("=" * 60)
+
+    chain = [Block.from_dict(block.to_dict()) for block in build_chain(blocks, transactions_per_block)]
+    codecs = (
+        ("pickle", lambda block: pickle.dumps(block, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+        ("codec", encode_block, decode_block),
+    )
+    for name, encode, decode in codecs:
+        start = time.perf_counter()
+        encoded = [encode(block) for block in chain]
+        encode_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        for data in encoded:
+            decode(data)
+        decode_elapsed = time.perf_counter() - start
+        size = sum(len(data) for data in encoded)
+        print(f"{name:<7}: encode {blocks / encode_elapsed:,.0f} blocks/s | decode {blocks / decode_elapsed:,.0f} "
+              f"blocks/s | {size / blocks:,.0f} bytes/block")
+
+    block = chain[-1]
+    block.merkle_root = merkle_root(block.transactions)
+    variants = (
+        ("text, full list", None, None),
+        ("text header", block.merkle_root, None),
+        ("binary header", merkle_root(block.transactions, binary=True), BINARY_HASHING),
+    )
+    for name, root, version in variants:
+        block.merkle_root, block.version = root, version
+        start = time.perf_counter()
+        for nonce in range(hash_attempts):
+            block.nonce = nonce
+            Blockchain.hash(block)
+        print(f"{name:<16}: {hash_attempts / (time.perf_counter() - start):,.0f} H/s (Blockchain.hash)")
+
+
+def benchmark_sqlite(length=20000, transactions_per_block=5, queries=1000):
+    """
+    Compares a pickle save/load with the SQLite store: bulk save, lazy open, and indexed block lookups that
+    decode only the block found.
+    """
+    print(f"\n⏱️ SQLITE STORE BENCHMARK ({length:,} blocks x {transactions_per_block} transactions)")
+    print("=" * 60)
+
+    source = Blockchain()
+    source.chain = build_chain(length, transactions_per_block)
+    hashes = [source.chain[i * length // queries].current_hash for i in range(queries)]
+    os.makedirs("saves", exist_ok=True)
+    try:
+        start = time.perf_counter()
+        with open(os.path.join("saves", "benchmark.pkl"), 'wb') as f:
+            pickle.dump({'chain': source.chain}, f)
+        pickle_save = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(os.path.join("saves", "benchmark.pkl"), 'rb') as f:
+            pickle.load(f)
+        pickle_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        source.save_blockchain("benchmark.sqlite")
+        sqlite_save = time.perf_counter() - start
+        source.block_log.close()
+        start = time.perf_counter()
+        store = Blockchain()
+        store.load_blockchain("benchmark.sqlite", lazy=True)
+        sqlite_open = time.perf_counter() - start
+        start = time.perf_counter()
+        for block_hash in hashes:
+            store.get_block_by_hash(block_hash)
+        lookups = time.perf_counter() - start
+        store.block_log.close()
+        store.chain.close()
+    finally:
+        for name in ("benchmark.pkl", "benchmark.sqlite", "benchmark.sqlite-wal", "benchmark.sqlite-shm"):
+            path = os.path.join("saves", name)
+            if os.path.exists(path):
+                os.remove(path)
+
+    print(f"pickle : save {pickle_save:.2f}s | load {pickle_load:.2f}s (whole chain in memory)")
+    print(f"sqlite : save {sqlite_save:.2f}s | lazy open {sqlite_open * 1000:.1f} ms | "
+          f"{queries / lookups:,.0f} get_block_by_hash/s")
+
+
+def benchmark_restart(length=20000, tail=100):
+    """
+    Times restarting from a block log with and without a snapshot of the derived state, when tail blocks were added
+    after the snapshot.
+    """
+    print(f"\n⏱️ RESTART BENCHMARK ({length:,} blocks, snapshot {tail} blocks behind the tip)")
+    print("=" * 60)
+
+    chain = build_chain(length)
+    source = Blockchain()
+    source.modify_snapshots(None)
+    source.chain = chain[:length - tail]
+    source.rebuild_indexes()
+    source.verified_height = len(source.chain)
+    names = ("benchmark.blocklog", "benchmark.blocklog.snapshot")
+    try:
+        source.save_blockchain(names[0])
+        source.save_snapshot()
+        for block in chain[length - tail:]:
+            source.commit_block(block)
+        source.block_log.close()
+
+        results = {}
+        variants = (("full replay", False, False), ("snapshot", True, False), ("snapshot, lazy", True, True))
+        for name, keep_snapshot, lazy in variants:
+            snapshot = os.path.join("saves", names[1])
+            if not keep_snapshot:
+                os.rename(snapshot, snapshot + ".off")
+            start = time.perf_counter()
+            restarted = Blockchain()
+            valid = restarted.load_blockchain(names[0], lazy=lazy)
+            results[name] = time.perf_counter() - start
+            restarted.block_log.close()
+            if not keep_snapshot:
+                os.rename(snapshot + ".off", snapshot)
+            print(f"{name:<15}: {results[name]:.3f}s (valid={valid}, {results['full replay'] / results[name]:.1f}x)")
+    finally:
+        for name in names:
+            path = os.path.join("saves", name)
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def build_spending_chain(length, transactions_per_block=5):
+    """
+    Builds a linked chain of Transaction records with unique IDs where every transaction spends an earlier one,
+    like a real history (IDs reappear as inputs and hashes as previous_hash).
+    """
+    addresses = [f"address{i}" for i in range(100)]
+    chain = []
+    previous_hash = None
+    for b in range(length):
+        transactions = []
+        for t in range(transactions_per_block):
+            n = b * transactions_per_block + t
+            transactions.append(Transaction(
+                transaction_id=hashlib.sha256(f"tx{n}".encode()).hexdigest(),
+                sender=addresses[n % 100],
+                receiver=addresses[(n * 7 + 1) % 100],
+                amount=n % 1000 + 1,
+                spent_transactions=[hashlib.sha256(f"tx{n - transactions_per_block}".encode()).hexdigest()] if b else [],
+                transaction_time=1700000000 + n * 0.37
+            ))
+        block = Block(b + 1, 1700000000 + b * 10.5, transactions, previous_hash, b, "")
+        block.current_hash = Blockchain.hash(block)
+        chain.append(block)
+        previous_hash = block.current_hash
+    return chain
+
+
+def benchmark_compression(length=20000, transactions_per_block=5):
+    """
+    Compares file size and save/load time of the plain pickle save with the segmented, ID-deduplicated save
+    uncompressed and under each codec.
+    """
+    print(f"\n⏱️ COMPRESSION BENCHMARK ({length:,} blocks x {transactions_per_block} transactions)")
+    print("=" * 60)
+
+    chain = build_spending_chain(length, transactions_per_block)
+    path = os.path.join("saves", "benchmark.compressed")
+    os.makedirs("saves", exist_ok=True)
+    results = []
+    try:
+        start = time.perf_counter()
+        with open(path, 'wb') as f:
+            pickle.dump({'chain': chain, 'mempool': [], 'difficulty': 4}, f)
+        save_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(path, 'rb') as f:
+            pickle.load(f)
+        results.append(("pickle", os.path.getsize(path), save_elapsed, time.perf_counter() - start))
+
+        for compression in ('none', 'zlib', 'lzma', 'bz2'):
+            start = time.perf_counter()
+            save_compressed(path, chain, [], 4, compression=compression)
+            save_elapsed = time.perf_counter() - start
+            start = time.perf_counter()
+            loaded = load_compressed(path, compression)
+            load_elapsed = time.perf_counter() - start
+            assert loaded['chain'][-1].current_hash == chain[-1].current_hash
+            results.append((f"dedup + {compression}", os.path.getsize(path), save_elapsed, load_elapsed))
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    plain_size = results[0][1]
+    for name, size, save_elapsed, load_elapsed in results:
+        print(f"{name:<13}: {size / 1024 / 1024:6.2f} MiB ({100 * size / plain_size:5.1f}%) | "
+              f"save {save_elapsed:.2f}s | load {load_elapsed:.2f}s")
+
+
+def benchmark_pruning(length=20000, transactions_per_block=5, depth=100):
+    """
+    Compares memory and block log size of a full node with a pruning node (modify_pruning) on a header-hashed chain
+    where every output is spent a block later.
+    """
+    print(f"\n⏱️ PRUNING BENCHMARK ({length:,} blocks x {transactions_per_block} transactions, depth {depth})")
+    print("=" * 60)
+
+    chain = build_spending_chain(length, transactions_per_block)
+    previous_hash = None
+    for block in chain:
+        block.merkle_root = merkle_root(block.transactions)
+        block.previous_hash = previous_hash
+        block.current_hash = Blockchain.hash(block)
+        previous_hash = block.current_hash
+
+    path = os.path.join("saves", "benchmark.blocklog")
+    results = {}
+    try:
+        for name, prune_depth in (("full", None), ("pruned", depth)):
+            blocks = [Block(**block.__getstate__()) for block in chain]
+            tracemalloc.start()
+            blockchain = Blockchain()
+            blockchain.modify_pruning(prune_depth)
+            start = time.perf_counter()
+            for block in blocks:
+                blockchain.commit_block(block)
+            elapsed = time.perf_counter() - start
+            del blocks
+            memory = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            blockchain.modify_snapshots(None)
+            blockchain.save_blockchain("benchmark.blocklog")
+            blockchain.block_log.close()
+            results[name] = (memory, os.path.getsize(path))
+            print(f"{name:<7}: {memory / 1024 / 1024:6.1f} MiB in memory | block log {results[name][1] / 1024 / 1024:6.2f} MiB | "
+                  f"{length / elapsed:,.0f} blocks/s (valid={blockchain.verify_chain()})")
+            os.remove(path)
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+    print(f"Pruning keeps {100 * results['pruned'][0] / results['full'][0]:.1f}% of the memory and "
+          f"{100 * results['pruned'][1] / results['full'][1]:.1f}% of the disk")
+
+
+BENCHMARKS = {
+    'hashing': benchmark_hashing,
+    'verification': benchmark_verification,
+    'memory': benchmark_memory,
+    'header': benchmark_header_hashing,
+    'rpc': benchmark_rpc,
+    'batch': benchmark_batch,
+    'codec': benchmark_codec,
+    'sqlite': benchmark_sqlite,
+    'restart': benchmark_restart,
+    'compression': benchmark_compression,
+    'pruning': benchmark_pruning,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blockchain performance benchmarks")
+    parser.add_argument('benchmarks', nargs='*', help=f"Benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.benchmarks or BENCHMARKS:
+        BENCHMARKS[name]()
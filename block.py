@@ -4,6 +4,11 @@
 
 import hashlib
 import time
+from collections.abc import Mapping
+from transaction import Transaction
+
+# Block fields other than the transactions, as sent during header sync
+HEADER_FIELDS = ('id', 'timestamp', 'previous_hash', 'nonce', 'current_hash', 'merkle_root', 'target', 'version')
 
 class Block:
     """
@@ -16,14 +21,70 @@ class Block:
         previous_hash (str): SHA-256 hash of the previous block in the chain.
         nonce (int): Arbitrary number used to track Proof-of-Work difficulty.
         hash (str): SHA-256 hash of the block contents.
+        merkle_root (str): Merkle root of the transactions. When set, the hash covers the header only (None for
+            blocks that hash the full transaction list).
+        target (int): Numeric Proof-of-Work target the block was mined against (None for blocks mined with the
+            fixed leading-zeros difficulty).
+        version (int): Hashing format. None for the original text hashing; codec.BINARY_HASHING for blocks whose
+            hash covers the canonical binary header.
+        pruned (bool): True if the transactions were discarded by pruning mode. Only header-hashed blocks are
+            pruned, so the hash (and Merkle root) still commit to the discarded transactions.
     """
-    def __init__(self, id, timestamp, transactions, previous_hash, nonce, current_hash):
+    # Fixed attributes instead of a per-instance __dict__ to keep large chains small in memory
+    __slots__ = ('id', 'timestamp', 'transactions', 'previous_hash', 'nonce', 'current_hash', 'merkle_root', 'target',
+                 'version', 'pruned')
+
+    def __init__(self, id, timestamp, transactions, previous_hash, nonce, current_hash, merkle_root=None, target=None,
+                 version=None, pruned=False):
         self.id = id
         self.timestamp = timestamp
         self.transactions = transactions
         self.previous_hash = previous_hash
         self.nonce = nonce
         self.current_hash = current_hash
+        self.merkle_root = merkle_root
+        self.target = target
+        self.version = version
+        self.pruned = pruned
+
+    def __getstate__(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state):
+        """
+        Restores a pickled block. Accepts both the slot state written by this class and the __dict__ state of
+        blocks pickled before Block used __slots__. Attributes missing from older saves default to None.
+        """
+        if isinstance(state, tuple):
+            # (dict state, slot state) form used by the default pickling of slotted objects
+            state = {**(state[0] or {}), **(state[1] or {})}
+        for name in self.__slots__:
+            setattr(self, name, state.get(name))
+
+    def to_dict(self):
+        """
+        Converts the block to plain data (e.g. for JSON).
+        """
+        data = self.__getstate__()
+        data['transactions'] = [dict(tx) if isinstance(tx, Mapping) else tx for tx in self.transactions]
+        return data
+
+    def header(self):
+        """
+        Returns the block without its transactions, as plain data.
+        """
+        return {name: getattr(self, name) for name in HEADER_FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Rebuilds a block from to_dict() output. Transactions with the standard layout become Transaction records.
+        """
+        transactions = [
+            Transaction.from_dict(tx) if Transaction.has_layout(tx) else tx
+            for tx in data['transactions']
+        ]
+        return cls(**dict(data, transactions=transactions))
 
     # Asked ChatGPT to make this look like a block
     def __str__(self):
@@ -35,6 +96,14 @@ class Block:
             f"│ Hash        : {self.current_hash}",
             f"│ Prev. Hash  : {self.previous_hash}",
         ]
+        if self.merkle_root is not None:
+            lines.append(f"│ Merkle Root : {self.merkle_root}")
+        if self.target is not None:
+            lines.append(f"│ Target      : {self.target:064x}")
+        if self.version is not None:
+            lines.append(f"│ Version     : {self.version}")
+        if self.pruned:
+            lines.append("│ Pruned      : transactions discarded")
         width = max(len(line) for line in lines)
         top = "┌" + "─" * (width - 2) + "┐"
         bottom = "└" + "─" * (width - 2) + "┘"
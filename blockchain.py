@@ -5,9 +5,37 @@
 import hashlib
 import time
 from block import Block
+from transaction import Transaction
+from mempool import Mempool
+from merkle import merkle_root, merkle_proof
+from codec import BINARY_HASHING, encode_nonce
+from collections.abc import Mapping
+from mining import (MiningHasher, hash_prefix, parallel_mine, DEFAULT_CHUNK_SIZE,
+                    difficulty_to_target, target_to_difficulty, meets_target, retarget, block_work)
+from verification import audit_chain, DEFAULT_BATCH_SIZE
+from storage import BlockLog, LazyChain, LOG_EXTENSION
+from sqlstore import SQLiteStore, SQLiteChain, SQLITE_EXTENSION
+from snapshot import snapshot_path, write_snapshot, read_snapshot, remove_snapshot
+from compression import compression_for, save_compressed, load_compressed
+from events import emit, DEBUG, INFO, WARNING, ERROR
+from metrics import Metrics, ATTEMPT_BUCKETS, SECONDS_BUCKETS
+from utxo import UTXOSet
+from indexes import ChainIndex
+from blocktree import BlockTree
 import pickle
 import os
 
+# Location stored in the transaction index for transactions that have not been mined yet
+MEMPOOL = "mempool"
+
+# Difficulty retargeting defaults (see modify_retargeting)
+DEFAULT_RETARGET_INTERVAL = 10
+DEFAULT_BLOCK_TIME = 10
+DEFAULT_MAX_RETARGET_FACTOR = 4
+
+# Blocks between snapshots of the derived state (see modify_snapshots)
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+
 # Source: https://hackernoon.com/learn-blockchains-by-building-one-117428612f46
 class Blockchain(object):
     """
@@ -15,12 +43,186 @@ class Blockchain(object):
     """
     def __init__(self):
         self.chain = []
-        self.mempool = []
+        self.mempool = Mempool()
+        # Block size limits (None = no limit)
+        self.max_block_transactions = 5
+        self.max_block_bytes = None
+        # Hash a fixed-size header (with a Merkle root) instead of the full transaction list
+        self.header_hashing = False
+        # Hash the canonical binary header (codec) instead of text; only used together with header_hashing
+        self.binary_hashing = False
+        # Mining/verification telemetry, optionally dumped as Prometheus text after every block
+        self.metrics = Metrics()
+        self.metrics_path = None
         # Define mining difficulty
         self.difficulty = 4
+        # Automatic difficulty retargeting every retarget_interval blocks (None = fixed difficulty)
+        self.retarget_interval = None
+        self.target_block_time = DEFAULT_BLOCK_TIME
+        self.max_retarget_factor = DEFAULT_MAX_RETARGET_FACTOR
+        # Target of the first block of a retargeted run (fixed when retargeting is first turned on)
+        self.retarget_start = None
+        # Parallel mining settings (None = mine on a single core)
+        self.mining_workers = None
+        self.mining_chunk_size = DEFAULT_CHUNK_SIZE
+        # Lookup indexes used by transaction admission (tx_id -> block id or MEMPOOL, spent_id -> spender tx_id)
+        self.tx_index = {}
+        self.spent_index = {}
+        # Unspent outputs and balances of the mined chain
+        self.utxos = UTXOSet()
+        # Block/transaction lookups by hash, ID, address and timestamp
+        self.chain_index = ChainIndex()
+        # Every known block (including competing branches) with its cumulative work, for fork choice
+        self.block_tree = BlockTree()
+        # Set when the chain was loaded lazily; the indexes are then built on first use
+        self.indexes_stale = False
+        # Number of blocks from genesis that have already been verified
+        self.verified_height = 0
+        # Append-only block log the chain is persisted to (set by saving/loading a LOG_EXTENSION file)
+        self.block_log = None
+        self.log_needs_rewrite = False
+        # Blocks pruned in memory that are still whole in the block log (it is compacted once they are half of it)
+        self.unwritten_prunes = 0
+        # Positions of blocks pruned in memory that are still whole in the SQLite store (replaced by save_snapshot)
+        self.unstored_prunes = []
+        # A snapshot of the derived state is written beside the block log every snapshot_interval blocks
+        self.snapshot_interval = DEFAULT_SNAPSHOT_INTERVAL
+        # Pruning mode: blocks deeper than prune_depth lose their transactions once every output is spent (None = off).
+        # prune_candidates maps the ID of each deep, unpruned block that still has unspent outputs to its position
+        # (None = not scanned yet); blocks before prune_height have been considered.
+        self.prune_depth = None
+        self.prune_candidates = None
+        self.prune_height = 0
 
     def modify_difficulty(self, difficulty):
         self.difficulty = difficulty
+
+    def modify_retargeting(self, interval=DEFAULT_RETARGET_INTERVAL, block_time=DEFAULT_BLOCK_TIME,
+                           max_factor=DEFAULT_MAX_RETARGET_FACTOR, start_target=None):
+        """
+        Turns on automatic difficulty retargeting. New blocks record a numeric target; every interval blocks the
+        target is scaled by how long the previous interval blocks took compared to block_time each.
+        The first retargeted block records start_target. It is fixed the first time retargeting is turned on and
+        saved with the settings, so a later modify_difficulty cannot invalidate blocks that are already mined.
+
+        Args:
+            interval (int): Blocks between adjustments (None turns retargeting off).
+            block_time (float): Desired seconds per block.
+            max_factor (int): Largest change in one adjustment, in either direction.
+            start_target (int): Target of the first retargeted block. Defaults to the one already in use, or the
+                target of the current difficulty.
+        """
+        if interval is not None and interval < 2:
+            raise ValueError("Retarget interval must be at least 2 blocks")
+        if block_time <= 0 or max_factor < 1:
+            raise ValueError("Block time must be positive and the max factor at least 1")
+        self.retarget_interval = interval
+        self.target_block_time = block_time
+        self.max_retarget_factor = max_factor
+        if start_target is not None:
+            self.retarget_start = start_target
+        elif interval is not None and self.retarget_start is None:
+            self.retarget_start = difficulty_to_target(self.difficulty)
+
+    def retarget_settings(self):
+        """
+        Returns:
+            dict: The retargeting settings, or None if retargeting is off.
+        """
+        if self.retarget_interval is None:
+            return None
+        return {'interval': self.retarget_interval, 'block_time': self.target_block_time,
+                'max_factor': self.max_retarget_factor, 'start_target': self.retarget_start}
+
+    def modify_block_size(self, max_transactions=5, max_bytes=None):
+        """
+        Configures how many pending transactions go into each new block.
+
+        Args:
+            max_transactions (int): Maximum transactions per block (None for no limit).
+            max_bytes (int): Maximum total transaction size per block (None for no limit).
+        """
+        self.max_block_transactions = max_transactions
+        self.max_block_bytes = max_bytes
+
+    def modify_mempool_size(self, max_size):
+        """
+        Sets the mempool capacity. The lowest-fee transactions are evicted if the pool is already over it.
+
+        Args:
+            max_size (int): Maximum pending transactions (None for unbounded).
+        """
+        self.mempool.max_size = max_size
+        while max_size is not None and len(self.mempool) > max_size:
+            self.unindex_transaction(self.mempool.evict_lowest())
+
+    def modify_hashing(self, header_hashing=True, binary=False):
+        """
+        Switches between hashing the full transaction list and hashing a fixed-size header containing the Merkle
+        root. Only affects new blocks; existing blocks keep the format they were mined with.
+
+        Args:
+            header_hashing (bool): True to hash id, timestamp, merkle_root, previous_hash and nonce.
+            binary (bool): With header hashing, hash the canonical binary header and transaction encodings
+                (codec) instead of their text form. Such blocks record version BINARY_HASHING.
+        """
+        self.header_hashing = header_hashing
+        self.binary_hashing = header_hashing and binary
+
+    def modify_metrics(self, path=None):
+        """
+        Sets a file that receives a Prometheus-text dump of the metrics after every new block.
+
+        Args:
+            path (str): File to write, or None to stop writing.
+        """
+        self.metrics_path = path
+
+    def modify_snapshots(self, interval=DEFAULT_SNAPSHOT_INTERVAL):
+        """
+        Sets how often a snapshot of the derived state is written beside the block log (or SQLite store), so a
+        restart only replays the blocks after it.
+
+        Args:
+            interval (int): Blocks between snapshots (None to stop writing them).
+        """
+        if interval is not None and interval < 1:
+            raise ValueError("Snapshot interval must be at least 1")
+        self.snapshot_interval = interval
+
+    def modify_pruning(self, depth=None):
+        """
+        Turns on pruning mode. Once a block is more than depth blocks from the tip and every output it created has
+        been spent, its transactions are discarded. The header (with the Merkle root the hash commits to) is kept,
+        so memory and disk use follow the unspent outputs and recent history instead of the full history.
+        Only header-hashed blocks are pruned; the hash of any other block covers its transactions.
+        Reorganisations deeper than depth are refused, since the pruned blocks could not be put back.
+
+        Args:
+            depth (int): Number of recent blocks that always keep their transactions (None turns pruning off).
+        """
+        if depth is not None and depth < 1:
+            raise ValueError("Pruning depth must be at least 1 block")
+        self.prune_depth = depth
+        self.prune_candidates = None
+        self.prune_height = 0
+        if depth is not None:
+            self.prune_blocks()
+        else:
+            self.utxos.track_spent_blocks(False)
+
+    def modify_mining(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Configures parallel mining.
+
+        Args:
+            workers (int): Number of worker processes to split the nonce space across. None or 1 mines serially.
+            chunk_size (int): Number of nonces a worker checks before checking whether another worker has finished.
+        """
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1")
+        self.mining_workers = workers
+        self.mining_chunk_size = chunk_size
     
     def new_block(self, nonce=None, previous_hash=None, mine=True):
         """
@@ -34,12 +236,36 @@ class Blockchain(object):
         Returns:
             block: The created block
         """
+        block = self.prepare_block(nonce, previous_hash)
+        
+        if mine:
+            # Mine the block using PoW
+            block = self.mine_block(block)
+        else:
+            # An unmined block makes no Proof-of-Work claim
+            block.target = None
+            block.current_hash = self.hash(block)
+
+        return self.commit_block(block)
+
+    def prepare_block(self, nonce=None, previous_hash=None):
+        """
+        Builds the next (unmined) block from the mempool. Split out of new_block so mining can run elsewhere
+        (e.g. in an executor) between prepare_block and commit_block.
 
-        if not self.verify_chain():
+        Args:
+            nonce (int): Starting nonce.
+            previous_hash (string): Hash of the previous block. None for genesis block.
+
+        Returns:
+            block: The block, with its transactions already taken out of the mempool
+        """
+        # Only the blocks added since the last verification need to be checked
+        if not self.verify_chain(incremental=True):
             raise Exception("Invalid block, it cannot be added to the chain.")
         
-        # Take up to 5 transactions from the mempool
-        transaction_for_block = self.mempool[:5]
+        # Take the highest-fee transactions from the mempool, up to the block size limits
+        transaction_for_block = self.mempool.select(self.max_block_transactions, self.max_block_bytes)
 
         block = Block(
             id = len(self.chain) + 1,
@@ -48,55 +274,526 @@ class Blockchain(object):
             previous_hash=previous_hash,
             # Only fill the nonce if its not a genesis block
             nonce= nonce if nonce is not None else 0,
-            current_hash=""
+            current_hash="",
+            merkle_root=merkle_root(transaction_for_block, self.binary_hashing) if self.header_hashing else None,
+            target=self.next_target(),
+            version=BINARY_HASHING if self.binary_hashing else None
         )
-        
-        if mine:
-            # Mine the block using PoW
-            block = self.mine_block(block)
-        else:
-            block.current_hash = self.hash(block)
+        return block
+
+    def next_target(self):
+        """
+        Returns:
+            int: The numeric target the next block must be mined against, or None if retargeting is off.
+        """
+        if self.retarget_interval is None:
+            return None
+        return self.expected_target(len(self.chain))
+
+    def expected_target(self, height, chain=None):
+        """
+        Works out the target the block at a given position must record under the retargeting rules: the previous
+        block's target, adjusted by the time the last retarget_interval blocks took at every interval boundary.
+
+        Args:
+            height (int): Position of the block in the chain.
+            chain (list): Blocks (or headers) to apply the rules to. Defaults to this chain.
+
+        Returns:
+            int: The expected target. A block that starts a retargeted run (the previous block has no target) must
+                use retarget_start (the target of the current difficulty if retargeting was never turned on).
+        """
+        chain = self.chain if chain is None else chain
+        previous = chain[height - 1] if height > 0 else None
+        if previous is None or previous.target is None:
+            if self.retarget_start is None:
+                return difficulty_to_target(self.difficulty)
+            return self.retarget_start
+        interval = self.retarget_interval
+        if interval is None or height < interval or height % interval != 0:
+            return previous.target
+        first = chain[height - interval]
+        return retarget(previous.target, previous.timestamp - first.timestamp,
+                        (interval - 1) * self.target_block_time, self.max_retarget_factor)
+
+    def target_allowed(self, target, height, chain=None):
+        """
+        Checks the numeric target a block records. With retargeting on it must follow the retarget schedule;
+        with retargeting off it must be the target of the current difficulty, so a block cannot pick an easier one.
+
+        Args:
+            target (int): The target the block records (None for a block mined against the leading-zeros prefix).
+            height (int): Position of the block in the chain.
+            chain (list): Blocks (or headers) to apply the retarget rules to. Defaults to this chain.
+
+        Returns:
+            bool: True if the block may record this target.
+        """
+        if target is None:
+            return True
+        if self.retarget_interval is None:
+            return target == difficulty_to_target(self.difficulty)
+        return target == self.expected_target(height, chain)
+
+    def commit_block(self, block):
+        """
+        Adds a prepared and hashed block to the chain. Also used to connect blocks mined elsewhere, so its
+        transactions are taken out of the mempool along with any pending transactions that spend the same inputs.
+
+        Args:
+            block: The block returned by prepare_block, after mining.
 
+        Returns:
+            block: The added block
+        """
         # Add it to the chain
         self.chain.append(block)
 
-        # Remove processed transactions from the mempool
-        self.mempool = self.mempool[5:]
+        # The transactions now live in this block
+        if not self.indexes_stale:
+            self.index_block(block, len(self.chain) - 1)
+
+        # Persist only the new block if the chain is backed by a block log
+        if self.block_log is not None:
+            self.block_log.append_block(block)
+            self.block_log.commit()
+
+        if self.prune_depth is not None:
+            self.prune_blocks()
+
+        if self.block_log is not None:
+            if self.snapshot_interval is not None and len(self.chain) % self.snapshot_interval == 0:
+                self.save_snapshot()
+
+        if self.metrics_path is not None:
+            self.write_metrics(self.metrics_path)
 
         return block
+
+    def index_block(self, block, position):
+        """
+        Updates the indexes, UTXO set and block tree for a block at the given chain position, taking its
+        transactions (and pending transactions that spend the same inputs) out of the mempool.
+        """
+        for tx in block.transactions:
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                tx_id = tx['transaction_id']
+                self.mempool.remove(tx_id)
+                for spent_tx in tx.get('spent_transactions', []):
+                    holder = self.spent_index.get(spent_tx)
+                    if holder is not None and holder != tx_id and self.tx_index.get(holder) == MEMPOOL:
+                        # The conflicting transaction may already be out of the pool, in a block being mined
+                        removed = self.mempool.remove(holder)
+                        if removed is not None:
+                            self.unindex_transaction(removed)
+                        else:
+                            self.tx_index.pop(holder, None)
+                self.index_transaction(tx, block.id)
+        self.utxos.apply_block(block)
+        self.chain_index.add_block(block, position)
+        parent = self.block_tree.get(self.chain[position - 1].current_hash) if position > 0 else None
+        node = self.block_tree.get(block.current_hash)
+        if node is None:
+            self.block_tree.add(block, self.block_work(block), parent, keep_block=False)
+        else:
+            node.block = None
+
+    def disconnect_block(self):
+        """
+        Removes the tip block, undoing its effect on the UTXO set and indexes and putting its transactions back in
+        the mempool. The block stays in the block tree as a side branch.
+
+        Returns:
+            block: The removed block
+        """
+        block = self.chain.pop()
+        self.utxos.undo_block(block)
+        self.chain_index.remove_block(block, len(self.chain))
+        node = self.block_tree.get(block.current_hash)
+        if node is not None:
+            node.block = block
+
+        for tx in block.transactions:
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                self.index_transaction(tx, MEMPOOL)
+                for evicted in self.mempool.add(tx):
+                    self.unindex_transaction(evicted)
+
+        self.verified_height = min(self.verified_height, len(self.chain))
+        if self.prune_candidates is not None:
+            self.prune_candidates.pop(block.id, None)
+            self.prune_height = min(self.prune_height, len(self.chain))
+        return block
+
+    def prune_blocks(self):
+        """
+        Prunes every block that is deeper than prune_depth and has no unspent outputs left. Only two kinds of
+        block are looked at: those that reached the depth since the last call, and deep blocks the UTXO set reports
+        as newly fully spent. Each block is therefore handled a constant number of times over the life of the chain;
+        the first call after a load scans the chain once.
+
+        Returns:
+            int: Number of blocks pruned.
+        """
+        if self.prune_depth is None or self.indexes_stale:
+            return 0
+
+        horizon = len(self.chain) - self.prune_depth
+        if self.prune_candidates is None:
+            self.prune_candidates = {}
+            self.prune_height = 0
+            self.utxos.track_spent_blocks()
+        prunable = []
+        for position in range(self.prune_height, horizon):
+            block = self.chain[position]
+            if block.merkle_root is not None and not block.pruned:
+                if self.utxos.fully_spent(block.id):
+                    prunable.append(position)
+                else:
+                    self.prune_candidates[block.id] = position
+        self.prune_height = max(self.prune_height, horizon)
+
+        # Blocks that are not deep yet are checked when they cross the horizon
+        for block_id in self.utxos.newly_spent:
+            position = self.prune_candidates.get(block_id)
+            if position is not None and self.utxos.fully_spent(block_id):
+                del self.prune_candidates[block_id]
+                prunable.append(position)
+        self.utxos.newly_spent.clear()
+
+        for position in prunable:
+            self.prune_block(position)
+        # An append-only log cannot drop the transactions of a block already in it, so it is compacted once the
+        # pruned blocks make up half of it: each rewrite is paid for by as many prunes as there are blocks in the log
+        if isinstance(self.block_log, BlockLog) and self.unwritten_prunes * 2 >= max(self.block_log.block_count, 1):
+            self.rewrite_log()
+        return len(prunable)
+
+    def prune_block(self, position):
+        """
+        Replaces the block at a position with a copy without its transactions, and drops them from the indexes.
+        The copy on disk keeps its transactions until a snapshot covers the block, because a load replays the blocks
+        after the snapshot: SQLite stores replace it when the next snapshot is saved, and a block log is compacted.
+        """
+        block = self.chain[position]
+        for tx in block.transactions:
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                tx_id = tx['transaction_id']
+                if self.tx_index.get(tx_id) == block.id:
+                    del self.tx_index[tx_id]
+                for spent_tx in tx.get('spent_transactions', []):
+                    if self.spent_index.get(spent_tx) == tx_id:
+                        del self.spent_index[spent_tx]
+        self.utxos.forget_block(block)
+        self.chain_index.remove_transactions(block, position)
+
+        pruned = Block(**dict(block.__getstate__(), transactions=[], pruned=True))
+        self.chain[position] = pruned
+        if isinstance(self.block_log, SQLiteStore):
+            if position < self.block_log.block_count:
+                self.unstored_prunes.append(position)
+        elif self.block_log is not None and position < self.block_log.block_count:
+            self.unwritten_prunes += 1
+
+        emit(DEBUG, 'block_pruned', "✂️ Block {block_id} pruned ({count} transactions discarded)",
+             block_id=block.id, count=len(block.transactions))
+
+    def block_work(self, block):
+        """
+        Proof-of-Work of a single block: from its recorded target, or - for blocks mined against a leading-zeros
+        prefix - from the number of leading zeros its hash actually has. The current difficulty setting is not used,
+        so changing it does not change the work of blocks already in the tree.
+        """
+        if block.target is not None:
+            return block_work(block.target)
+        digest = block.current_hash or ""
+        return block_work(difficulty_to_target(len(digest) - len(digest.lstrip("0"))))
+
+    def chain_work(self):
+        """
+        Returns:
+            int: Cumulative Proof-of-Work of the chain, as compared by fork choice.
+        """
+        if self.last_block is None:
+            return 0
+        node = None if self.indexes_stale else self.block_tree.get(self.last_block.current_hash)
+        if node is not None:
+            return node.total_work
+        return sum(self.block_work(block) for block in self.chain)
+
+    def on_main_chain(self, node):
+        """
+        Returns True if a block tree node is part of the current chain.
+        """
+        return self.chain_index.block_position(node.hash) == node.height
+
+    def receive_block(self, block):
+        """
+        Accepts a block mined elsewhere (e.g. by a peer). It extends the chain, is kept as a side branch, or - if its
+        branch now has more cumulative work than the current chain - triggers a reorganisation onto that branch.
+        Blocks whose parent is not known yet are held until it arrives.
+
+        Args:
+            block: The mined block.
+
+        Returns:
+            bool: True if the block was valid and added to the block tree.
+        """
+        if self.indexes_stale:
+            self.rebuild_indexes()
+
+        accepted = self.place_block(block)
+        # Blocks that were waiting for a placed block can now be placed too. A work list instead of recursion, so a
+        # long run of orphans received newest first cannot exhaust the stack.
+        placed = [block.current_hash] if accepted else []
+        while placed:
+            for orphan in self.block_tree.take_orphans(placed.pop()):
+                if self.place_block(orphan):
+                    placed.append(orphan.current_hash)
+        return accepted
+
+    def place_block(self, block):
+        """
+        Checks a received block and adds it to the block tree (or the orphans), reorganising if its branch is now the
+        heaviest. Used by receive_block, which then places the orphans waiting for it.
+
+        Returns:
+            bool: True if the block was valid and added to the block tree.
+        """
+        if block.current_hash in self.block_tree:
+            return False
+        if getattr(block, 'pruned', False):
+            emit(WARNING, 'invalid_block', "❌ Received block {block_id} has no transactions to check!", block_id=block.id)
+            return False
+        if not self.verify_hash(block):
+            emit(WARNING, 'invalid_block', "❌ Received block {block_id} has an invalid hash!", block_id=block.id)
+            return False
+        # A matching hash proves nothing by itself; it must also meet the block's target (or the difficulty),
+        # and without retargeting that target is fixed by the difficulty
+        if self.retarget_interval is None and not self.target_allowed(block.target, block.id - 1):
+            emit(WARNING, 'invalid_block', "❌ Received block {block_id} does not have the expected difficulty target!",
+                 block_id=block.id)
+            return False
+        target = block.target if block.target is not None else "0" * self.difficulty
+        if not meets_target(block.current_hash, target):
+            emit(WARNING, 'invalid_block', "❌ Received block {block_id} does not meet its Proof-of-Work target!",
+                 block_id=block.id)
+            return False
+
+        parent = self.block_tree.get(block.previous_hash) if block.previous_hash is not None else None
+        if block.previous_hash is not None and parent is None:
+            self.block_tree.add_orphan(block)
+            emit(DEBUG, 'orphan_block', "🧩 Block {block_id} is waiting for its parent", block_id=block.id)
+            return False
+        if block.id != (parent.height + 2 if parent is not None else 1):
+            emit(WARNING, 'invalid_block', "❌ Received block {block_id} has the wrong height!", block_id=block.id)
+            return False
+
+        node = self.block_tree.add(block, self.block_work(block), parent)
+        tip = self.block_tree.get(self.last_block.current_hash) if self.last_block else None
+        if tip is None or node.total_work > tip.total_work:
+            if not self.reorganize(node):
+                return False
+        return True
+
+    def reorganize(self, node):
+        """
+        Switches the chain to the branch ending at a block tree node. Only the divergent suffix is touched: blocks
+        after the fork point are disconnected (tip first) and the new branch is connected one block at a time.
+        If a block on the new branch is invalid, the branch is discarded and the original chain restored.
+        Branches that fork further back than the UTXO set can undo (utxos.undo_depth, or the pruning depth) are
+        refused.
+
+        Args:
+            node (TreeNode): Tip of the branch to switch to.
+
+        Returns:
+            bool: True if the chain now ends at the node.
+        """
+        fork_height, path = self.block_tree.branch(node, self.on_main_chain)
+        # Blocks older than the UTXO undo window (or already pruned) cannot be disconnected
+        depth = len(self.chain) - 1 - fork_height
+        limit = self.utxos.undo_depth if self.prune_depth is None else min(self.utxos.undo_depth, self.prune_depth)
+        if depth > limit:
+            emit(WARNING, 'reorg_too_deep', "❌ Branch forks {depth} blocks back, deeper than the {limit}-block reorganisation limit!",
+                 depth=depth, limit=limit)
+            return False
+
+        disconnected = [self.disconnect_block() for _ in range(len(self.chain) - 1 - fork_height)]
+        if disconnected and self.block_log is not None:
+            self.block_log.truncate(len(self.chain))
+
+        for branch_node in path:
+            block = branch_node.block
+            reason = self.check_block(block)
+            if reason is not None:
+                emit(WARNING, 'invalid_block', "❌ Block {block_id} rejected: {reason}", block_id=block.id, reason=reason)
+                self.block_tree.discard(branch_node.hash)
+                # Put the original chain back
+                while len(self.chain) - 1 > fork_height:
+                    self.disconnect_block()
+                if self.block_log is not None:
+                    self.block_log.truncate(len(self.chain))
+                for old_block in reversed(disconnected):
+                    self.commit_block(old_block)
+                return False
+            self.commit_block(block)
+
+        # Pending transactions may spend outputs that only existed on the old branch
+        for tx in list(self.mempool):
+            spent = tx.get('spent_transactions')
+            if spent and self.utxos.check_inputs(tx['sender'], spent, tx['amount'], tx.get('fee', 0)) is not None:
+                self.unindex_transaction(self.mempool.remove(tx['transaction_id']))
+
+        if disconnected:
+            self.metrics.inc('reorgs_total')
+            emit(INFO, 'chain_reorganized', "🔀 Reorganised onto a heavier branch: {removed} block(s) replaced by {added}",
+                 removed=len(disconnected), added=len(path), height=len(self.chain))
+        return True
+
+    def check_block(self, block):
+        """
+        Checks that a block mined elsewhere can be connected at the tip: it links to the tip, has the expected
+        target, and its transactions are new, well formed, listed once and spend only unspent outputs of their
+        senders.
+
+        Returns:
+            str or None: A description of the first problem found, or None if the block is valid.
+        """
+        last_block = self.last_block
+        if block.previous_hash != (last_block.current_hash if last_block else None):
+            return "Block does not link to the tip"
+        if not self.target_allowed(block.target, len(self.chain)):
+            return "Unexpected difficulty target"
+
+        claimed = set()
+        seen = set()
+        for tx in block.transactions:
+            if not isinstance(tx, Mapping):
+                continue
+            error = self.check_transaction_fields(tx)
+            if error:
+                return error
+            # Also closes the Merkle odd-leaf ambiguity: [a, b, c] and [a, b, c, c] share a root
+            if tx['transaction_id'] in seen:
+                return f"Transaction {tx['transaction_id'][:8]}... appears twice in the block"
+            seen.add(tx['transaction_id'])
+            if self.tx_index.get(tx['transaction_id'], MEMPOOL) != MEMPOOL:
+                return f"Transaction {tx['transaction_id'][:8]}... is already in the chain"
+            spent = tx['spent_transactions']
+            if spent:
+                if not claimed.isdisjoint(spent) or len(set(spent)) < len(spent):
+                    return "Double spend within the block"
+                error = self.utxos.check_inputs(tx['sender'], spent, tx['amount'], tx.get('fee', 0))
+                if error:
+                    return error
+                claimed.update(spent)
+        return None
+
+    def return_to_mempool(self, block):
+        """
+        Puts the transactions of a prepared block that will not be committed (e.g. mining failed) back in the mempool.
+        Transactions that were mined by another block in the meantime (or dropped as conflicts) are left out.
+        """
+        for tx in block.transactions:
+            if not self.indexes_stale and self.tx_index.get(tx.get('transaction_id')) != MEMPOOL:
+                continue
+            for evicted in self.mempool.add(tx):
+                self.unindex_transaction(evicted)
     
-    def mine_block(self, block):
+    def mine_block(self, block, separate_process=False):
         """
         Proof of work mining algorithm to find a valid hash
         
         Args:
             block: The block to mine
+            separate_process (bool): Search in worker processes even when mining on a single core, so the calling
+                process (e.g. a node's event loop) is not held up by the hashing loop.
         
         Returns:
             block: The mined block with a valid nonce and hash
         """
-        target = "0" * self.difficulty
+        # Blocks that record a numeric target are mined against it, others against the leading-zeros difficulty
+        target = block.target if block.target is not None else "0" * self.difficulty
+        difficulty = round(target_to_difficulty(block.target), 2) if block.target is not None else self.difficulty
         attempts = 0
         start_time = time.time()
 
-        print(f"⛏️ Mining block {block.id} with difficulty {self.difficulty}...")
+        emit(INFO, 'mining_started', "⛏️ Mining block {block_id} with difficulty {difficulty}...",
+             block_id=block.id, difficulty=difficulty)
+
+        if (self.mining_workers and self.mining_workers > 1) or separate_process:
+            workers = self.mining_workers or 1
+            attempts = parallel_mine(block, self.difficulty, workers, self.mining_chunk_size)
+
+            # The winning nonce must be accepted by the same check the serial path uses
+            if not self.verify_hash(block) or not meets_target(block.current_hash, target):
+                raise Exception("Parallel mining produced an invalid block.")
+
+            end_time = time.time()
+            self.record_mining(attempts, end_time - start_time)
+            emit(INFO, 'block_mined', "✅ Found valid hash! Nonce: {nonce}, Time: {elapsed:.2f}s ({workers} workers, {attempts} attempts)",
+                 block_id=block.id, nonce=block.nonce, elapsed=end_time - start_time, workers=workers, attempts=attempts)
+            return block
     
+        # Only the nonce changes between attempts, so hash the rest of the block once
+        hasher = MiningHasher.for_block(block)
+
         while True:
             # Calculate hash with current nonce
-            block.current_hash = self.hash(block)
+            block.current_hash = hasher.hash(block.nonce)
             attempts += 1
             
             # Check if hash meets the target requirement
-            if block.current_hash.startswith(target):
+            if meets_target(block.current_hash, target):
                 end_time = time.time()
-                print(f"✅ Found valid hash! Nonce: {block.nonce}, Time: {end_time - start_time:.2f}s")
+                self.record_mining(attempts, end_time - start_time)
+                emit(INFO, 'block_mined', "✅ Found valid hash! Nonce: {nonce}, Time: {elapsed:.2f}s",
+                     block_id=block.id, nonce=block.nonce, elapsed=end_time - start_time, workers=1, attempts=attempts)
                 return block
             
             # Increment nonce and try again
             block.nonce += 1
             
             if attempts % 50000 == 0:
-                print(f"   Attempt {attempts}: {block.current_hash}")
+                emit(DEBUG, 'mining_progress', "   Attempt {attempts}: {hash}", attempts=attempts, hash=block.current_hash)
+
+    def record_mining(self, attempts, elapsed):
+        """
+        Records the attempts, duration and hashrate of a successfully mined block.
+        """
+        self.metrics.inc('blocks_mined_total')
+        self.metrics.inc('hashes_total', attempts)
+        self.metrics.observe('mining_attempts', attempts, ATTEMPT_BUCKETS)
+        self.metrics.observe('block_time_seconds', elapsed, SECONDS_BUCKETS)
+        if elapsed > 0:
+            self.metrics.set_gauge('hashrate', attempts / elapsed)
+
+    def get_metrics(self):
+        """
+        Returns the collected metrics plus the current mempool depth and chain height.
+
+        Returns:
+            dict: 'counters', 'gauges' and 'histograms'.
+        """
+        self.metrics.set_gauge('mempool_depth', len(self.mempool))
+        self.metrics.set_gauge('chain_height', len(self.chain))
+        return self.metrics.snapshot()
+
+    def write_metrics(self, path):
+        """
+        Writes the metrics to a file in Prometheus text format.
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            self.get_metrics()
+            self.metrics.write_prometheus(path)
+            return True
+        except OSError as e:
+            emit(ERROR, 'metrics_write_failed', "❌ Error writing metrics: {error}", error=e)
+            return False
 
     def edit_block(self):
         """
@@ -112,6 +809,11 @@ class Blockchain(object):
         # Get the second to last block
         block = self.chain[-2]
 
+        # Everything from this block onwards has to be verified again
+        self.invalidate_verification(len(self.chain) - 2)
+        # An append-only log cannot update a block in place
+        self.log_needs_rewrite = True
+
         # Modify the block
         print(f"Modifying Block ID: {block.id}")
         print(f"Hash: {block.current_hash}")
@@ -141,10 +843,16 @@ class Blockchain(object):
         # Calculate new block hash based on modified data
         block.current_hash = self.hash(block)
         print(f"\nNew hash: {self.hash(block)}")
+
+        # Store the edited copy back (lazily loaded chains would otherwise drop it from their cache)
+        self.chain[-2] = block
+
+        # The edited transactions may no longer match the indexes
+        self.rebuild_indexes()
         
         return block
 
-    def new_transaction(self, sender, receiver, amount, spent_transactions=None):
+    def new_transaction(self, sender, receiver, amount, spent_transactions=None, fee=0):
         """
         Verifies and adds a new transaction to the mempool. Only valid transactions are added.
 
@@ -153,6 +861,7 @@ class Blockchain(object):
             receiver (str): Receiver of the transaction.
             amount (int/float): Amount to transfer.
             spent_transactions (list): List of transaction IDs that have been completed.
+            fee (int/float): Fee offered to the miner. Higher fees are mined first.
 
         Returns:
             int or None: The ID of the next mined block which will hold the transaction, or None if invalid.
@@ -161,22 +870,190 @@ class Blockchain(object):
         # Generate unique transaction ID
         transaction_id = hashlib.sha256(f"{sender}{receiver}{amount}{time.time()}".encode()).hexdigest()
 
-        transaction = {
-            'transaction_id': transaction_id,
-            'sender': sender,
-            'receiver': receiver,
-            'amount': amount,
-            'spent_transactions': spent_transactions or [],
-            'transaction_time': time.time()
-        }
+        transaction = Transaction(
+            transaction_id=transaction_id,
+            sender=sender,
+            receiver=receiver,
+            amount=amount,
+            spent_transactions=spent_transactions or [],
+            transaction_time=time.time(),
+            fee=fee
+        )
         if self.verify_transaction(transaction):
-            self.mempool.append(transaction)
-            print("✅ Transaction added to mempool.")
+            self.index_transaction(transaction, MEMPOOL)
+            evicted = self.mempool.add(transaction)
+            for tx in evicted:
+                self.unindex_transaction(tx)
+            if any(tx is transaction for tx in evicted):
+                emit(WARNING, 'transaction_evicted', "❌ Mempool is full and the transaction fee is too low.",
+                     transaction_id=transaction_id)
+                return None
+            emit(INFO, 'transaction_added', "✅ Transaction added to mempool.", transaction_id=transaction_id)
             return self.last_block.id + 1 if self.last_block else 1
         else:
-            print("❌ Transaction is invalid and was not added.")
+            emit(WARNING, 'transaction_rejected', "❌ Transaction is invalid and was not added.", transaction_id=transaction_id)
             return None
 
+    def new_transactions(self, batch):
+        """
+        Validates and adds a batch of transactions in one pass. Duplicate IDs and double spends are found with set
+        operations across the whole batch (and against the chain and mempool), and nothing is printed per item.
+        When two transactions in the batch spend the same ID, the first one wins. A malformed item is rejected on its
+        own, and an accepted item that a later one evicts from a full mempool is reported as rejected.
+
+        Args:
+            batch (list): Transactions as dicts with 'sender', 'receiver', 'amount' and optionally
+                'spent_transactions', 'fee' and 'transaction_id' (generated when missing).
+
+        Returns:
+            list: One dict per item with 'transaction_id', 'accepted' (bool) and 'reason' (None when accepted).
+        """
+        if self.indexes_stale:
+            self.rebuild_indexes()
+
+        # Items that cannot be built get their own result instead of failing the whole batch
+        transactions = []
+        build_errors = {}
+        for i, item in enumerate(batch):
+            try:
+                transactions.append(self.batch_transaction(item))
+            except (AttributeError, TypeError, ValueError) as error:
+                transactions.append(None)
+                build_errors[i] = f"Malformed transaction: {error}"
+        built = [tx for tx in transactions if tx is not None]
+
+        # IDs that already exist, or appear more than once in the batch
+        existing_ids = {tx.transaction_id for tx in built} & self.tx_index.keys()
+        # IDs already spent by the chain or mempool
+        all_spent = {spent_tx for tx in built for spent_tx in tx.spent_transactions}
+        already_spent = all_spent & self.spent_index.keys()
+
+        results = []
+        accepted_results = {}
+        seen_ids = set()
+        claimed = set()
+        for i, tx in enumerate(transactions):
+            if tx is None:
+                item_id = batch[i].get('transaction_id') if isinstance(batch[i], Mapping) else None
+                results.append({'transaction_id': item_id if isinstance(item_id, str) else None, 'accepted': False,
+                                'reason': build_errors[i]})
+                continue
+
+            tx_id = tx.transaction_id
+            spent = tx.spent_transactions
+            try:
+                # Records always have every field, so only the values need checking
+                reason = self.check_transaction_values(tx.amount, tx.fee, tx.sender, tx.receiver)
+                if reason is None:
+                    if tx_id in existing_ids or tx_id in seen_ids:
+                        reason = "Duplicate transaction ID"
+                    elif spent:
+                        spent_set = set(spent)
+                        if not already_spent.isdisjoint(spent_set):
+                            reason = "Double spend of an already spent transaction"
+                        elif not claimed.isdisjoint(spent_set) or len(spent_set) < len(spent):
+                            reason = "Double spend within the batch"
+                        else:
+                            reason = self.utxos.check_inputs(tx.sender, spent, tx.amount, tx.fee)
+            except (TypeError, ValueError) as error:
+                reason = f"Malformed transaction: {error}"
+            seen_ids.add(tx_id)
+
+            result = {'transaction_id': tx_id, 'accepted': reason is None, 'reason': reason}
+            results.append(result)
+            if reason is None:
+                claimed.update(spent)
+                accepted_results[tx_id] = result
+                self.index_transaction(tx, MEMPOOL)
+                for evicted in self.mempool.add(tx):
+                    self.unindex_transaction(evicted)
+                    # The evicted transaction may be this one or one accepted earlier in the batch
+                    evicted_result = accepted_results.pop(evicted['transaction_id'], None)
+                    if evicted_result is not None:
+                        evicted_result['accepted'] = False
+                        evicted_result['reason'] = ("Mempool is full and the transaction fee is too low" if evicted is tx
+                                                    else "Evicted from the full mempool by a higher-fee transaction")
+                        claimed.difference_update(evicted['spent_transactions'])
+
+        accepted = sum(result['accepted'] for result in results)
+        emit(INFO, 'batch_processed', "📦 Batch processed: {accepted} accepted, {rejected} rejected",
+             accepted=accepted, rejected=len(results) - accepted)
+        return results
+
+    @staticmethod
+    def batch_transaction(item):
+        """
+        Builds a Transaction from one new_transactions item, generating its ID if missing.
+
+        Raises:
+            TypeError: If the item is not a mapping or its ID or inputs are not strings.
+        """
+        if not isinstance(item, Mapping):
+            raise TypeError(f"expected an object, got {type(item).__name__}")
+        now = time.time()
+        transaction_id = item.get('transaction_id') or hashlib.sha256(
+            f"{item.get('sender')}{item.get('receiver')}{item.get('amount')}{now}".encode()).hexdigest()
+        if not isinstance(transaction_id, str):
+            raise TypeError("transaction_id must be a string")
+        spent_transactions = item.get('spent_transactions') or []
+        if not isinstance(spent_transactions, list) or not all(isinstance(spent_tx, str) for spent_tx in spent_transactions):
+            raise TypeError("spent_transactions must be a list of transaction IDs")
+        return Transaction(
+            transaction_id=transaction_id,
+            sender=item.get('sender'),
+            receiver=item.get('receiver'),
+            amount=item.get('amount'),
+            spent_transactions=spent_transactions,
+            transaction_time=item.get('transaction_time', now),
+            fee=item.get('fee', 0)
+        )
+
+    def index_transaction(self, transaction, location):
+        """
+        Records a transaction and the IDs it spends in the lookup indexes.
+
+        Args:
+            transaction (dict): The transaction to index.
+            location (int or str): ID of the block holding the transaction, or MEMPOOL.
+        """
+        if 'transaction_id' in transaction:
+            self.tx_index[transaction['transaction_id']] = location
+            for spent_tx in transaction.get('spent_transactions', []):
+                self.spent_index[spent_tx] = transaction['transaction_id']
+
+    def unindex_transaction(self, transaction):
+        """
+        Removes a transaction that left the mempool without being mined (e.g. evicted) from the lookup indexes.
+        """
+        tx_id = transaction['transaction_id']
+        self.tx_index.pop(tx_id, None)
+        for spent_tx in transaction.get('spent_transactions', []):
+            if self.spent_index.get(spent_tx) == tx_id:
+                del self.spent_index[spent_tx]
+
+    def rebuild_indexes(self):
+        """
+        Rebuilds the transaction ID and spent ID indexes, the UTXO set, the chain index and the block tree from the
+        chain and mempool. Side branches are forgotten.
+        Used after the chain is replaced (load) or an existing block is edited.
+        """
+        self.tx_index = {}
+        self.spent_index = {}
+        self.utxos = UTXOSet()
+        # A chain read lazily from an SQLite store is already indexed by the store itself
+        self.chain_index = self.block_log if self.store_backed() else ChainIndex()
+        self.indexes_stale = False
+        self.prune_candidates = None
+        for position, block in enumerate(self.chain):
+            for tx in block.transactions:
+                if isinstance(tx, Mapping):
+                    self.index_transaction(tx, block.id)
+            self.utxos.apply_block(block)
+            self.chain_index.add_block(block, position)
+        self.block_tree = BlockTree.from_chain(self.chain, self.block_work)
+        for tx in self.mempool:
+            self.index_transaction(tx, MEMPOOL)
+
     @staticmethod
     def hash(block):
         """
@@ -189,15 +1066,24 @@ class Blockchain(object):
             hash (str): Hash value in hex format.
         """
 
-        # Prepare the string for hashing - using all the block data
-        hashableString = f"{block.id}{block.timestamp}{block.transactions}{block.previous_hash}{block.nonce}"
+        prefix = hash_prefix(block)
+        if isinstance(prefix, bytes):
+            # Binary-hashed block: fixed-width header followed by the 8-byte nonce
+            return hashlib.sha256(prefix + encode_nonce(block.nonce)).hexdigest()
+
+        # Prepare the string for hashing - using all the block data (nonce goes last so miners can reuse the prefix)
+        hashableString = f"{prefix}{block.nonce}"
         
         # Hash and return the string
         return hashlib.sha256(hashableString.encode()).hexdigest()
 
-    def verify_hash(self, block):
+    @staticmethod
+    def verify_hash(block):
         """
         Verify that the hash stored in the block matches the calculated hash.
+        For header-hashed blocks, the Merkle root must also match the transactions. Only header-hashed blocks can be
+        pruned, and a pruned block must carry no transactions at all, since none of them are covered by a check.
+        Blocks that record a numeric target must also have a hash within it.
 
         Args:
             block: The entire block containing the hash to be verified.
@@ -205,9 +1091,45 @@ class Blockchain(object):
         Returns:
             bool: True if calculated hash matches expected result, False is not.
         """
-        calculated_hash = self.hash(block)
+        root = getattr(block, 'merkle_root', None)
+        if getattr(block, 'pruned', False):
+            if root is None or block.transactions:
+                return False
+        elif root is not None:
+            binary = getattr(block, 'version', None) == BINARY_HASHING
+            if merkle_root(block.transactions, binary) != root:
+                return False
+        target = getattr(block, 'target', None)
+        if target is not None and not meets_target(block.current_hash, target):
+            return False
+        calculated_hash = Blockchain.hash(block)
         return calculated_hash == block.current_hash
 
+    def get_merkle_proof(self, transaction_id):
+        """
+        Builds a Merkle inclusion proof for a mined transaction.
+
+        Args:
+            transaction_id (str): ID of the transaction.
+
+        Returns:
+            dict: 'block_id', 'merkle_root', 'binary' (leaves use the binary encoding), 'transaction' and 'proof',
+                or None if the transaction is not in a header-hashed block.
+        """
+        found = self.get_transaction(transaction_id)
+        if found is None or found[0].merkle_root is None:
+            return None
+
+        block, position = found
+        binary = block.version == BINARY_HASHING
+        return {
+            'block_id': block.id,
+            'merkle_root': block.merkle_root,
+            'binary': binary,
+            'transaction': block.transactions[position],
+            'proof': merkle_proof(block.transactions, transaction_id, binary)
+        }
+
     @property
     def last_block(self):
         """
@@ -221,32 +1143,143 @@ class Blockchain(object):
         else:
             return self.chain[-1]
     
-    def verify_chain(self):
+    def invalidate_verification(self, height=0):
+        """
+        Lowers the verified watermark so blocks from the given position onwards are checked again.
+        Must be called whenever an existing block is modified or the chain is replaced.
+
+        Args:
+            height (int): Index of the first block that is no longer trusted.
+        """
+        self.verified_height = min(self.verified_height, max(height, 0))
+
+    def verify_chain(self, incremental=False):
         """
         Validates the entire blockchain by checking that each block's hash and its reference to a previous_hash is correct.
 
+        Args:
+            incremental (bool): Only check blocks after the verified watermark (plus the link into them).
+                A full re-verify from genesis is done otherwise.
+
         Returns:
             bool: True if the chain if valid. False if otherwise.
         """
-        for i in range(len(self.chain)):
+        start = min(self.verified_height, len(self.chain)) if incremental else 0
+        started = time.perf_counter()
+        valid = self._verify_blocks(start)
+        self.metrics.observe('verification_seconds', time.perf_counter() - started)
+        self.metrics.inc('blocks_verified_total', max(self.verified_height - start, 0))
+        return valid
+
+    def _verify_blocks(self, start):
+        """
+        Checks blocks from position start to the tip, moving the verified watermark along. Used by verify_chain.
+        """
+
+        for i in range(start, len(self.chain)):
             current_block = self.chain[i]
 
             # Check the current block's hash is correct
             if not self.verify_hash(current_block):
-                print(f"❌ Block {current_block.id} has an invalid hash!")
+                emit(WARNING, 'invalid_hash', "❌ Block {block_id} has an invalid hash!", block_id=current_block.id)
+                self.verified_height = i
                 return False
 
             # For non-genesis blocks, also check if the previous hash is correct
             if i > 0:
                 previous_block = self.chain[i - 1]
                 if current_block.previous_hash != previous_block.current_hash:
-                    print(f"❌ Block {current_block.id} does not match previous block hash!")
+                    emit(WARNING, 'broken_link', "❌ Block {block_id} does not match previous block hash!", block_id=current_block.id)
+                    self.verified_height = i
+                    return False
+
+            # With retargeting on, each recorded target must follow from the blocks before it
+            if self.retarget_interval is not None and current_block.target is not None:
+                expected = self.expected_target(i)
+                if expected is not None and current_block.target != expected:
+                    emit(WARNING, 'invalid_target', "❌ Block {block_id} does not have the expected difficulty target!", block_id=current_block.id)
+                    self.verified_height = i
                     return False
+
+            self.verified_height = i + 1
         
         # No errors were found
-        print("✅ Blockchain is valid!")
+        emit(INFO, 'chain_valid', "✅ Blockchain is valid!", height=len(self.chain))
         return True
+
+    def audit_chain(self, workers=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Full audit of the chain. Blocks are hashed in parallel across a process pool and every bad block is reported,
+        instead of stopping at the first failure like verify_chain.
+
+        Args:
+            workers (int): Number of worker processes. Defaults to the CPU count.
+            batch_size (int): Number of blocks hashed per worker task.
+
+        Returns:
+            dict: Report with 'valid', 'checked', 'invalid_hashes', 'broken_links', 'invalid_targets'
+                and 'first_invalid_index'.
+        """
+        started = time.perf_counter()
+        expected_target = self.expected_target if self.retarget_interval is not None else None
+        report = audit_chain(self.chain, workers, batch_size, expected_target)
+        self.metrics.observe('verification_seconds', time.perf_counter() - started)
+        self.metrics.inc('blocks_verified_total', report['checked'])
+
+        # The audit covers everything up to the first bad block
+        first_invalid = report['first_invalid_index']
+        self.verified_height = len(self.chain) if first_invalid is None else first_invalid
+
+        for block_id in report['invalid_hashes']:
+            emit(WARNING, 'invalid_hash', "❌ Block {block_id} has an invalid hash!", block_id=block_id)
+        for block_id in report['broken_links']:
+            emit(WARNING, 'broken_link', "❌ Block {block_id} does not match previous block hash!", block_id=block_id)
+        for block_id in report['invalid_targets']:
+            emit(WARNING, 'invalid_target', "❌ Block {block_id} does not have the expected difficulty target!", block_id=block_id)
+        if report['valid']:
+            emit(INFO, 'chain_valid', "✅ Blockchain is valid!", height=len(self.chain))
+
+        return report
     
+    @staticmethod
+    def check_transaction_fields(transaction):
+        """
+        Checks that a transaction has all required fields with sensible values.
+
+        Args:
+            transaction (dict): The transaction to check.
+
+        Returns:
+            str or None: A description of the first problem found, or None if the fields are valid.
+        """
+        # Source: GitHub Copilot (Claude Sonnet 4)
+        required_fields = ['transaction_id', 'sender', 'receiver', 'amount', 'spent_transactions']
+        for field in required_fields:
+            if field not in transaction:
+                return f"Transaction is missing field {field}"
+
+        return Blockchain.check_transaction_values(
+            transaction['amount'], transaction.get('fee', 0), transaction['sender'], transaction['receiver'])
+
+    @staticmethod
+    def check_transaction_values(amount, fee, sender, receiver):
+        """
+        Checks the values of a transaction's fields.
+
+        Returns:
+            str or None: A description of the first problem found, or None if the values are valid.
+        """
+        # Match data types
+        if not isinstance(amount, (int, float)):
+            return "Transaction amount must be a number!"
+        if not isinstance(fee, (int, float)) or fee < 0:
+            return "Transaction fee must be a non-negative number!"
+        if amount <= 0:
+            return "Transaction amount must be positive!"
+        if not sender or not receiver:
+            return "Sender and receiver must not be empty!"
+        return None
+
     def verify_transaction(self, transaction):
         """
         Verifies that a transaction contains all fields and prevents duplicates/double spending.
@@ -258,71 +1291,127 @@ class Blockchain(object):
             bool: True if valid, False otherwise.
         """
 
-        # Source: GitHub Copilot (Claude Sonnet 4)
-        required_fields = ['transaction_id', 'sender', 'receiver', 'amount', 'spent_transactions']
-        for field in required_fields:
-            if field not in transaction:
-                print(f"❌ Transaction is missing field {field}")
-                return False
+        if self.indexes_stale:
+            self.rebuild_indexes()
 
-        # Match data types
-        if not isinstance(transaction['amount'], (int, float)):
-            print("❌ Transaction amount must be a number!")
-            return False
-        if transaction['amount'] <= 0:
-            print("❌ Transaction amount must be positive!")
-            return False
-        if not transaction['sender'] or not transaction['receiver']:
-            print("❌ Sender and receiver must not be empty!")
+        error = self.check_transaction_fields(transaction)
+        if error:
+            emit(WARNING, 'invalid_transaction', "❌ {error}", error=error)
             return False
     
-        # Search for duplicate transaction IDs
-        all_transaction_ids = set()
-        
-        # Collect all transaction IDs from blockchain
-        for block in self.chain:
-            for tx in block.transactions:
-                if isinstance(tx, dict) and 'transaction_id' in tx:
-                    all_transaction_ids.add(tx['transaction_id'])
-        
-        # Collect all transaction IDs from mempool
-        for tx in self.mempool:
-            if 'transaction_id' in tx:
-                all_transaction_ids.add(tx['transaction_id'])
-        
-        # Check if this transaction ID already exists
-        if transaction['transaction_id'] in all_transaction_ids:
-            print(f"❌ Transaction ID {transaction['transaction_id'][:8]}... already exists!")
+        # Check if this transaction ID already exists in the chain or mempool
+        if transaction['transaction_id'] in self.tx_index:
+            emit(WARNING, 'duplicate_transaction', "❌ Transaction ID {short_id}... already exists!",
+                 transaction_id=transaction['transaction_id'], short_id=transaction['transaction_id'][:8])
             return False
 
         # Double-spend prevention
         if not self.check_double_spending(transaction):
             return False
+
+        # Inputs must be unspent outputs of the sender that cover the amount and fee
+        if transaction['spent_transactions']:
+            error = self.utxos.check_inputs(transaction['sender'], transaction['spent_transactions'],
+                                            transaction['amount'], transaction.get('fee', 0))
+            if error:
+                emit(WARNING, 'invalid_inputs', "❌ {error}", error=error)
+                return False
         
         return True
 
+    def get_balance(self, address):
+        """
+        Returns:
+            int/float: Total of the address's unspent outputs in the mined chain.
+        """
+        if self.indexes_stale:
+            self.rebuild_indexes()
+        return self.utxos.balance(address)
+
+    def get_utxos(self, address):
+        """
+        Returns:
+            list: The address's unspent outputs ('transaction_id', 'amount', 'block_id'), i.e. what it can spend.
+        """
+        if self.indexes_stale:
+            self.rebuild_indexes()
+        return self.utxos.unspent(address)
+
+    def store_backed(self):
+        """
+        Returns:
+            bool: True if the chain is a lazy view of the SQLite store it is saved to, so the store's own indexes
+                can answer block and transaction lookups.
+        """
+        return (isinstance(self.chain, SQLiteChain) and isinstance(self.block_log, SQLiteStore)
+                and os.path.abspath(self.chain.path) == os.path.abspath(self.block_log.path))
+
+    def chain_lookups(self):
+        """
+        Returns the index for block and transaction lookups (ChainIndex or SQLiteStore). The in-memory indexes are
+        only rebuilt when the store cannot answer the query itself.
+        """
+        if self.indexes_stale and self.chain_index is not self.block_log:
+            self.rebuild_indexes()
+        return self.chain_index
+
+    def get_address_history(self, address):
+        """
+        Returns:
+            list: (block_id, transaction_id) of every mined transaction sent or received by the address, oldest first.
+        """
+        # An SQLite store keeps the rows of a pruned block until the next snapshot (see prune_block)
+        blocks = ((self.chain[position], tx_id) for position, tx_id in self.chain_lookups().address_postings(address))
+        return [(block.id, tx_id) for block, tx_id in blocks if not getattr(block, 'pruned', False)]
+
+    def get_block_by_hash(self, block_hash):
+        """
+        Returns:
+            block: The block with this hash, or None.
+        """
+        position = self.chain_lookups().block_position(block_hash)
+        return self.chain[position] if position is not None else None
+
+    def get_transaction(self, transaction_id):
+        """
+        Finds a mined transaction without scanning the chain.
+
+        Returns:
+            tuple: (block, position of the transaction in the block), or None if it has not been mined.
+        """
+        location = self.chain_lookups().transaction_location(transaction_id)
+        if location is None:
+            return None
+        position, tx_position = location
+        block = self.chain[position]
+        return (block, tx_position) if not getattr(block, 'pruned', False) else None
+
+    def get_blocks_between(self, start=None, end=None):
+        """
+        Returns the blocks with a timestamp in [start, end], found by binary search.
+
+        Args:
+            start (float): Earliest timestamp (None for no lower bound).
+            end (float): Latest timestamp (None for no upper bound).
+
+        Returns:
+            list: The blocks in chain order.
+        """
+        return [self.chain[position] for position in self.chain_lookups().positions_between(start, end)]
+
     # Source: GitHub CoPilot
     def check_double_spending(self, transaction):
         """
-        Prevents double spending by checking if spent_transactions are already used.
+        Prevents double spending by checking if spent_transactions are already used (in the chain or mempool).
         """
-        used_txs = set()
-        
-        # Collect all spent transaction IDs from the blockchain
-        for block in self.chain:
-            for tx in block.transactions:
-                if isinstance(tx, dict) and 'spent_transactions' in tx:
-                    used_txs.update(tx['spent_transactions'])
-        
-        # Collect all spent transaction IDs from mempool
-        for pending_tx in self.mempool:
-            if 'spent_transactions' in pending_tx:
-                used_txs.update(pending_tx['spent_transactions'])
-        
+        if self.indexes_stale:
+            self.rebuild_indexes()
+
         # Check if this transaction tries to spend already used transactions
         for spent_tx in transaction['spent_transactions']:
-            if spent_tx in used_txs:
-                print(f"❌ Double spending detected! Transaction {spent_tx[:8]}... already spent!")
+            if spent_tx in self.spent_index:
+                emit(WARNING, 'double_spend', "❌ Double spending detected! Transaction {short_id}... already spent!",
+                     spent_transaction=spent_tx, short_id=spent_tx[:8])
                 return False
         
         return True
@@ -340,6 +1429,9 @@ class Blockchain(object):
     def save_blockchain(self, filename="blockchain.pkl"):
         """
         Saves the entire blockchain to a file using pickle in the saves/ directory.
+        Filenames ending in LOG_EXTENSION are saved as an append-only block log instead, and filenames ending in
+        SQLITE_EXTENSION to an SQLite store (see save_block_log). Filenames ending in .pkl.gz, .pkl.xz or .pkl.bz2
+        are saved compressed with zlib, lzma or bz2, one segment of blocks at a time.
         
         Args:
             filename (str): Name of the file to save to
@@ -354,31 +1446,199 @@ class Blockchain(object):
             
             # Create full file path
             filepath = os.path.join(saves_dir, filename)
+
+            if filename.endswith((LOG_EXTENSION, SQLITE_EXTENSION)):
+                return self.save_block_log(filepath)
+
+            compression = compression_for(filename)
+            if compression is not None:
+                save_compressed(filepath, self.chain, self.mempool, self.difficulty, self.retarget_settings(),
+                                compression)
+                emit(INFO, 'chain_saved', "✅ Blockchain saved to {path} ({compression}, {size} bytes)\n📊 Saved {blocks} blocks and {pending} pending transactions",
+                     path=filepath, compression=compression, size=os.path.getsize(filepath), blocks=len(self.chain),
+                     pending=len(self.mempool))
+                return True
             
             # Create data structure to save
             blockchain_data = {
-                'chain': self.chain,
-                'mempool': self.mempool,
-                'difficulty': self.difficulty
+                'chain': list(self.chain),
+                'mempool': list(self.mempool),
+                'difficulty': self.difficulty,
+                'retarget': self.retarget_settings()
             }
             
             with open(filepath, 'wb') as f:
                 pickle.dump(blockchain_data, f)
             
-            print(f"✅ Blockchain saved to {filepath}")
-            print(f"📊 Saved {len(self.chain)} blocks and {len(self.mempool)} pending transactions")
+            emit(INFO, 'chain_saved', "✅ Blockchain saved to {path}\n📊 Saved {blocks} blocks and {pending} pending transactions",
+                 path=filepath, blocks=len(self.chain), pending=len(self.mempool))
             return True
             
         except Exception as e:
-            print(f"❌ Error saving blockchain: {e}")
+            emit(ERROR, 'save_failed', "❌ Error saving blockchain: {error}", error=e)
             return False
+
+    def save_block_log(self, filepath):
+        """
+        Saves the chain to an append-only block log (or an SQLite store, by extension). Only blocks that are not in
+        the log yet are written, followed by a small metadata record for the mempool and difficulty. The log stays
+        attached, so later blocks are appended by new_block as soon as they are added.
+
+        Args:
+            filepath (str): Path of the log file or SQLite database
+
+        Returns:
+            bool: True if successful
+        """
+        if self.block_log is not None and os.path.abspath(self.block_log.path) != os.path.abspath(filepath):
+            if self.chain_index is self.block_log:
+                # Lookups were served by the store being detached
+                self.chain_index = ChainIndex()
+                self.indexes_stale = True
+            self.block_log.close()
+            self.block_log = None
+
+        if self.block_log is None:
+            # Attaching to a new file: write a full copy once, later saves only append
+            self.block_log = SQLiteStore(filepath) if filepath.endswith(SQLITE_EXTENSION) else BlockLog(filepath)
+            self.log_needs_rewrite = True
+
+        if self.log_needs_rewrite or self.block_log.block_count > len(self.chain):
+            self.rewrite_log()
+            new_blocks = len(self.chain)
+        else:
+            new_blocks = len(self.chain) - self.block_log.block_count
+            self.block_log.append_blocks(self.chain[self.block_log.block_count:])
+            self.block_log.write_meta(self.mempool, self.difficulty, self.retarget_settings())
+            self.block_log.commit()
+
+        emit(INFO, 'chain_saved', "✅ Blockchain saved to {path}\n📊 Wrote {blocks} new blocks, {pending} pending transactions",
+             path=filepath, blocks=new_blocks, pending=len(self.mempool))
+        return True
         
-    def load_blockchain(self, filename="blockchain.pkl"):
+    def rewrite_log(self):
+        """
+        Replaces the attached block log with a fresh copy of the chain (pruned blocks without their transactions)
+        and writes a new snapshot, since the old one may describe blocks that were just replaced. A chain with
+        pruned blocks always gets one, even with snapshots turned off: the blocks alone cannot rebuild its state.
+        """
+        self.block_log.rewrite(self.chain, self.mempool, self.difficulty, self.retarget_settings())
+        self.log_needs_rewrite = False
+        self.unwritten_prunes = 0
+        self.unstored_prunes = []
+        remove_snapshot(snapshot_path(self.block_log.path))
+        if self.snapshot_interval is not None or any(getattr(block, 'pruned', False) for block in self.chain):
+            self.save_snapshot()
+
+    def save_snapshot(self):
+        """
+        Writes a snapshot of the derived state (indexes, UTXO set, block tree, mempool and difficulty) beside the
+        block log, tagged with the height and tip hash it covers. Only a verified chain with up-to-date indexes is
+        snapshotted. Blocks pruned since the last snapshot are then replaced in an SQLite store, now that they are
+        no longer replayed on load.
+
+        Returns:
+            bool: True if a snapshot was written.
+        """
+        if self.block_log is None or self.indexes_stale or not self.verify_chain(incremental=True):
+            return False
+
+        # Pending transactions are restored from the mempool itself, so only mined entries are kept
+        tx_index = {tx_id: location for tx_id, location in self.tx_index.items() if location != MEMPOOL}
+        spent_index = {spent_tx: holder for spent_tx, holder in self.spent_index.items() if holder in tx_index}
+        state = {
+            'tx_index': tx_index,
+            'spent_index': spent_index,
+            'utxos': self.utxos,
+            # A store-backed chain is indexed by the store itself
+            'chain_index': None if self.chain_index is self.block_log else self.chain_index,
+            'block_tree': self.block_tree,
+            'mempool': list(self.mempool),
+            'difficulty': self.difficulty,
+            'retarget': self.retarget_settings(),
+            # Blocks pruned since the log was last written are still whole on disk, so they must be scanned again
+            'prune': None if self.log_needs_rewrite or self.unwritten_prunes else (self.prune_height, self.prune_candidates)
+        }
+        path = snapshot_path(self.block_log.path)
+        tip_hash = self.last_block.current_hash if self.last_block else None
+        size = write_snapshot(path, len(self.chain), tip_hash, state)
+        emit(INFO, 'snapshot_saved', "📸 Snapshot of height {height} saved to {path} ({size} bytes)",
+             height=len(self.chain), path=path, size=size)
+
+        if isinstance(self.block_log, SQLiteStore) and self.unstored_prunes:
+            for position in self.unstored_prunes:
+                self.block_log.replace_block(position, self.chain[position])
+            self.block_log.commit()
+            self.unstored_prunes = []
+        return True
+
+    def restore_snapshot(self, filepath, covered):
+        """
+        Restores the derived state from the snapshot of a block log (or SQLite store) that was just loaded, then
+        replays the blocks after it. Only the replayed blocks are left to verify.
+
+        Args:
+            filepath (str): Path of the block log or store.
+            covered (int): Number of blocks covered by the log's metadata record. If the snapshot is newer, its
+                mempool and difficulty are used instead.
+
+        Returns:
+            bool: True if a matching snapshot was restored.
+        """
+        snapshot = read_snapshot(snapshot_path(filepath), self.chain)
+        if snapshot is None:
+            return False
+        height, state = snapshot
+
+        self.tx_index = state['tx_index']
+        self.spent_index = state['spent_index']
+        self.utxos = state['utxos']
+        self.block_tree = state['block_tree']
+        self.indexes_stale = False
+        self.prune_height, self.prune_candidates = state['prune'] or (0, None)
+        if self.prune_depth is None:
+            self.utxos.track_spent_blocks(False)
+        if self.store_backed():
+            self.chain_index = self.block_log
+        else:
+            self.chain_index = state['chain_index'] or ChainIndex.from_chain(self.chain[:height])
+
+        if height > covered:
+            mined = {tx.get('transaction_id') for block in self.chain[height:] for tx in block.transactions if isinstance(tx, Mapping)}
+            self.mempool = Mempool([tx for tx in state['mempool'] if tx.get('transaction_id') not in mined],
+                                   max_size=self.mempool.max_size)
+            self.difficulty = state['difficulty']
+            # Settings saved before the start target was recorded start from the saved difficulty
+            self.retarget_start = None
+            if state['retarget'] is not None:
+                self.modify_retargeting(**state['retarget'])
+            else:
+                self.retarget_interval = None
+
+        for position in range(height, len(self.chain)):
+            self.index_block(self.chain[position], position)
+        for tx in self.mempool:
+            self.index_transaction(tx, MEMPOOL)
+        self.verified_height = height
+
+        emit(INFO, 'snapshot_restored', "📸 Restored snapshot of height {height}, replayed {replayed} blocks",
+             height=height, replayed=len(self.chain) - height)
+        return True
+
+    def load_blockchain(self, filename="blockchain.pkl", lazy=False):
         """
         Loads the entire blockchain from a file using pickle from the saves/ directory.
+        Filenames ending in LOG_EXTENSION are read as an append-only block log, and filenames ending in
+        SQLITE_EXTENSION from an SQLite store. If the log has a matching snapshot (see save_snapshot), the derived
+        state is restored from it and only the blocks after it are replayed and verified. Compressed saves
+        (.pkl.gz, .pkl.xz, .pkl.bz2) are decompressed as a stream.
         
         Args:
             filename (str): Name of the file to load from
+            lazy (bool): For block logs and SQLite stores, decode blocks only when accessed (the log is memory-mapped;
+                the store also answers block and transaction lookups from its own indexes). Block log records are still
+                CRC-checked on open, but the audit and index rebuild are deferred: the chain counts as unverified, so
+                the next verify_chain (e.g. from new_block) checks it, or run audit_chain() to check it up front.
         
         Returns:
             bool: True if successful, False otherwise
@@ -389,30 +1649,82 @@ class Blockchain(object):
             filepath = os.path.join(saves_dir, filename)
             
             if not os.path.exists(filepath):
-                print(f"❌ File {filepath} does not exist")
+                emit(ERROR, 'load_failed', "❌ File {path} does not exist", path=filepath)
                 return False
-            
-            with open(filepath, 'rb') as f:
-                blockchain_data = pickle.load(f)
+
+            # The chain is being replaced, so stop appending to the old log
+            if self.block_log is not None:
+                self.block_log.close()
+                self.block_log = None
+            if isinstance(self.chain, (LazyChain, SQLiteChain)):
+                self.chain.close()
+            self.log_needs_rewrite = False
+            self.unwritten_prunes = 0
+            self.unstored_prunes = []
+            lazy = lazy and filename.endswith((LOG_EXTENSION, SQLITE_EXTENSION))
+
+            if filename.endswith((LOG_EXTENSION, SQLITE_EXTENSION)):
+                # Stream the blocks back out of the log (or map it) and keep it attached for new blocks
+                if filename.endswith(SQLITE_EXTENSION):
+                    self.block_log = SQLiteStore(filepath)
+                    chain = SQLiteChain(filepath) if lazy else self.block_log.read_blocks()
+                else:
+                    self.block_log = BlockLog(filepath)
+                    chain = LazyChain(filepath) if lazy else self.block_log.read_blocks()
+                meta, covered = self.block_log.read_meta()
+
+                # Blocks are appended without a new metadata record, so drop pending transactions mined since
+                mined = {tx.get('transaction_id') for block in chain[covered:] for tx in block.transactions if isinstance(tx, Mapping)}
+                mempool = [tx for tx in meta.get('mempool', []) if tx.get('transaction_id') not in mined]
+                blockchain_data = dict(meta, chain=chain, mempool=mempool)
+            elif compression_for(filename) is not None:
+                blockchain_data = load_compressed(filepath, compression_for(filename))
+            else:
+                with open(filepath, 'rb') as f:
+                    blockchain_data = pickle.load(f)
             
             # Restore blockchain state
             self.chain = blockchain_data.get('chain', [])
-            self.mempool = blockchain_data.get('mempool', [])
+            self.mempool = Mempool(blockchain_data.get('mempool', []), max_size=self.mempool.max_size)
             self.difficulty = blockchain_data.get('difficulty', 4)
+            retarget_settings = blockchain_data.get('retarget')
+            # Settings saved before the start target was recorded start from the saved difficulty
+            self.retarget_start = None
+            if retarget_settings is not None:
+                self.modify_retargeting(**retarget_settings)
+            else:
+                self.retarget_interval = None
+            self.verified_height = 0
             
-            print(f"✅ Blockchain loaded from {filepath}")
-            print(f"📊 Loaded {len(self.chain)} blocks and {len(self.mempool)} pending transactions")
+            emit(INFO, 'chain_loaded', "✅ Blockchain loaded from {path}\n📊 Loaded {blocks} blocks and {pending} pending transactions",
+                 path=filepath, blocks=len(self.chain), pending=len(self.mempool))
+
+            if self.block_log is not None and self.restore_snapshot(filepath, covered):
+                # The snapshot covers everything before the replayed blocks
+                if self.verify_chain(incremental=True):
+                    emit(INFO, 'loaded_chain_valid', "🔍 Loaded blockchain is valid!")
+                    return True
+                emit(WARNING, 'loaded_chain_invalid', "⚠️ Warning: Loaded blockchain failed integrity check!")
+                return False
+
+            if lazy:
+                # Defer the indexes; the watermark stays at 0, so nothing is trusted until it has been verified
+                self.indexes_stale = True
+                self.chain_index = self.block_log if self.store_backed() else ChainIndex()
+                return True
+
+            self.rebuild_indexes()
             
             # Verify loaded chain integrity
-            if self.verify_chain():
-                print("🔍 Loaded blockchain is valid!")
+            if self.audit_chain()['valid']:
+                emit(INFO, 'loaded_chain_valid', "🔍 Loaded blockchain is valid!")
                 return True
             else:
-                print("⚠️ Warning: Loaded blockchain failed integrity check!")
+                emit(WARNING, 'loaded_chain_invalid', "⚠️ Warning: Loaded blockchain failed integrity check!")
                 return False
                 
         except Exception as e:
-            print(f"❌ Error loading blockchain: {e}")
+            emit(ERROR, 'load_failed', "❌ Error loading blockchain: {error}", error=e)
             return False
 
     def get_blockchain_info(self):
@@ -422,13 +1734,19 @@ class Blockchain(object):
         Returns:
             dict: Blockchain statistics
         """
-        total_transactions = sum(len(block.transactions) for block in self.chain)
+        # Lazily loaded chains know their transaction count without decoding every block
+        total_transactions = self.chain.transaction_count() if isinstance(self.chain, (LazyChain, SQLiteChain)) else None
+        if total_transactions is None:
+            total_transactions = sum(len(block.transactions) for block in self.chain)
         
         return {
             'total_blocks': len(self.chain),
             'total_transactions': total_transactions,
             'pending_transactions': len(self.mempool),
             'difficulty': self.difficulty,
+            'next_target': self.next_target(),
             'last_block_hash': self.last_block.current_hash if self.last_block else None,
-            'chain_valid': self.verify_chain() if len(self.chain) > 0 else True
+            'total_work': self.chain_work(),
+            'chain_valid': self.verify_chain(incremental=True) if len(self.chain) > 0 else True,
+            'metrics': self.get_metrics()
         }
\ No newline at end of file
@@ -0,0 +1,139 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Block tree for fork choice. Every known block is a node keyed by its hash, with its height and the cumulative
+Proof-of-Work of the branch ending at it. The main chain is the branch with the most work; other branches are kept
+so the node can switch to them (a reorganisation) if they overtake it.
+
+Blocks on the main chain are reached through Blockchain.chain, so their nodes do not hold the block itself.
+Side-branch nodes keep their block until it is connected.
+"""
+
+
+class TreeNode:
+    """
+    One block in the tree.
+
+    Attributes:
+        hash (str): The block's current_hash.
+        previous_hash (str): Hash of the parent block (None for a genesis block).
+        height (int): Position the block has (or would have) in the chain.
+        total_work (int): Work of this block plus all of its ancestors.
+        block (Block): The block, for side-branch blocks only (None while it is on the main chain).
+    """
+    __slots__ = ('hash', 'previous_hash', 'height', 'total_work', 'block')
+
+    def __init__(self, hash, previous_hash, height, total_work, block=None):
+        self.hash = hash
+        self.previous_hash = previous_hash
+        self.height = height
+        self.total_work = total_work
+        self.block = block
+
+
+class BlockTree:
+    """
+    All known blocks, keyed by hash, plus blocks waiting for a parent that has not arrived yet (orphans).
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.children = {}   # hash -> [child hashes]
+        self.orphans = {}    # missing parent hash -> [blocks]
+
+    @classmethod
+    def from_chain(cls, chain, block_work):
+        """
+        Builds a tree holding only the main chain. Each block's parent is the block before it.
+
+        Args:
+            chain (list): The main chain.
+            block_work (callable): Returns the work of a block.
+        """
+        tree = cls()
+        parent = None
+        for block in chain:
+            parent = tree.add(block, block_work(block), parent, keep_block=False)
+        return tree
+
+    def get(self, block_hash):
+        return self.nodes.get(block_hash)
+
+    def __contains__(self, block_hash):
+        return block_hash in self.nodes
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def add(self, block, work, parent, keep_block=True):
+        """
+        Adds a block under a parent node.
+
+        Args:
+            block: The block to add.
+            work (int): Work of this block alone.
+            parent (TreeNode): The parent's node (None for a genesis block).
+            keep_block (bool): Keep a reference to the block (for side-branch blocks).
+
+        Returns:
+            TreeNode: The new node.
+        """
+        node = TreeNode(
+            block.current_hash,
+            block.previous_hash,
+            parent.height + 1 if parent is not None else 0,
+            (parent.total_work if parent is not None else 0) + work,
+            block if keep_block else None
+        )
+        self.nodes[node.hash] = node
+        if parent is not None:
+            self.children.setdefault(parent.hash, []).append(node.hash)
+        return node
+
+    def branch(self, node, on_main_chain):
+        """
+        Walks back from a node to the main chain.
+
+        Args:
+            node (TreeNode): Tip of a branch.
+            on_main_chain (callable): Returns True for nodes on the main chain.
+
+        Returns:
+            tuple: (height of the fork point, or -1 if the branch shares no block with the main chain,
+                list of the branch's nodes after the fork point, oldest first).
+        """
+        path = []
+        while node is not None and not on_main_chain(node):
+            path.append(node)
+            node = self.nodes.get(node.previous_hash) if node.previous_hash is not None else None
+        path.reverse()
+        return (node.height if node is not None else -1), path
+
+    def discard(self, block_hash):
+        """
+        Removes a block and all of its descendants (e.g. a branch that turned out to be invalid).
+        """
+        pending = [block_hash]
+        while pending:
+            current = pending.pop()
+            node = self.nodes.pop(current, None)
+            pending.extend(self.children.pop(current, []))
+            if node is not None and node.previous_hash in self.children:
+                siblings = self.children[node.previous_hash]
+                if current in siblings:
+                    siblings.remove(current)
+
+    def add_orphan(self, block):
+        """
+        Holds a block whose parent is unknown until the parent arrives.
+        """
+        waiting = self.orphans.setdefault(block.previous_hash, [])
+        if all(orphan.current_hash != block.current_hash for orphan in waiting):
+            waiting.append(block)
+
+    def take_orphans(self, parent_hash):
+        """
+        Returns (and forgets) the orphans waiting for this parent.
+        """
+        return self.orphans.pop(parent_hash, [])
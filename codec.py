@@ -0,0 +1,351 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Canonical binary encoding for blocks and transactions, used for binary block hashing, block log records and
+sync transfers. The same data always encodes to the same bytes, and decoding never runs code (unlike pickle),
+so payloads from other nodes are safe to read: malformed input, including fields of the wrong type in a standard
+transaction or block header, raises ValueError.
+
+Every value is a one-byte tag followed by its data, all big-endian:
+    NONE / TRUE / FALSE    : no data
+    INT                    : signed 8-byte integer
+    FLOAT                  : 8-byte IEEE 754 double
+    TEXT                   : 4-byte length + UTF-8
+    HASH                   : 32 raw bytes (a lowercase 64-character hex hash)
+    LITERAL                : 4-byte length + repr() text, read back with ast.literal_eval (anything else, e.g. big
+                             integers or the non-standard transactions of edited chains)
+
+Transaction : STANDARD + transaction_id, sender, receiver, amount, input count (2 bytes), inputs, transaction_time,
+              fee - or LITERAL for transactions without the standard layout.
+Block       : FORMAT_VERSION (1 byte) + id, timestamp, nonce, previous_hash, current_hash, merkle_root, version
+              + flag byte (HAS_TARGET, PRUNED) + target (32 bytes, if flagged) + transaction count (4 bytes)
+              + transactions.
+Metadata    : transaction count (4 bytes) + mempool transactions + difficulty, retarget settings.
+
+Blocks with version BINARY_HASHING hash a fixed-width header instead of the text used by older blocks (see
+header_prefix).
+"""
+
+from block import Block
+from transaction import Transaction
+import ast
+import struct
+
+# Version of the block layout below
+FORMAT_VERSION = 1
+# Block.version of blocks whose hash covers the binary header
+BINARY_HASHING = 2
+
+NONE, TRUE, FALSE, INT, FLOAT, TEXT, HASH, LITERAL = range(8)
+STANDARD = 8
+
+# Bits of a block's flag byte
+HAS_TARGET = 1
+PRUNED = 2
+
+INT_VALUE = struct.Struct(">Bq")
+FLOAT_VALUE = struct.Struct(">Bd")
+LENGTH_VALUE = struct.Struct(">BI")
+COUNT = struct.Struct(">H")
+TX_COUNT = struct.Struct(">I")
+INT64_RANGE = range(-2 ** 63, 2 ** 63)
+# Types a numeric field of a standard transaction or block header may decode to
+NUMBER = (int, float)
+
+# Hash preimage of a binary-hashed block: version, id, timestamp, merkle root, previous hash, target; then the nonce
+HEADER = struct.Struct(">BQd32s32s32s")
+NONCE = struct.Struct(">Q")
+NO_HASH = bytes(32)
+
+
+def _put_value(out, value):
+    kind = type(value)
+    if value is None:
+        out.append(NONE)
+    elif kind is bool:
+        out.append(TRUE if value else FALSE)
+    elif kind is int and value in INT64_RANGE:
+        out += INT_VALUE.pack(INT, value)
+    elif kind is float:
+        out += FLOAT_VALUE.pack(FLOAT, value)
+    elif kind is str:
+        data = value.encode()
+        out += LENGTH_VALUE.pack(TEXT, len(data))
+        out += data
+    else:
+        data = repr(value).encode()
+        out += LENGTH_VALUE.pack(LITERAL, len(data))
+        out += data
+
+
+def _put_hash(out, value):
+    # Hex hashes are stored as their 32 raw bytes; anything else (e.g. an unmined block's "") as a plain value
+    if type(value) is str and len(value) == 64:
+        try:
+            raw = bytes.fromhex(value)
+        except ValueError:
+            raw = None
+        if raw is not None and raw.hex() == value:
+            out.append(HASH)
+            out += raw
+            return
+    _put_value(out, value)
+
+
+def _is_number(value):
+    return isinstance(value, NUMBER) and not isinstance(value, bool)
+
+
+def _has_standard_types(tx):
+    # The types Reader.transaction accepts, so whatever is encoded as STANDARD can be read back
+    return (isinstance(tx['transaction_id'], str) and _is_number(tx['amount'])
+            and all(isinstance(spent_tx, str) for spent_tx in tx['spent_transactions'])
+            and (tx['transaction_time'] is None or _is_number(tx['transaction_time'])) and _is_number(tx.get('fee', 0)))
+
+
+def _put_transaction(out, tx):
+    if not (isinstance(tx, Transaction) or Transaction.has_layout(tx)) or not _has_standard_types(tx):
+        data = repr(tx).encode()
+        out += LENGTH_VALUE.pack(LITERAL, len(data))
+        out += data
+        return
+
+    out.append(STANDARD)
+    _put_hash(out, tx['transaction_id'])
+    _put_value(out, tx['sender'])
+    _put_value(out, tx['receiver'])
+    _put_value(out, tx['amount'])
+    inputs = tx['spent_transactions']
+    out += COUNT.pack(len(inputs))
+    for spent_tx in inputs:
+        _put_hash(out, spent_tx)
+    _put_value(out, tx['transaction_time'])
+    _put_value(out, tx.get('fee', 0))
+
+
+class Reader:
+    """
+    Reads encoded values from a buffer, keeping track of the position.
+    """
+    __slots__ = ('data', 'position')
+
+    def __init__(self, data, position=0):
+        self.data = data
+        self.position = position
+
+    def _take(self, size):
+        start = self.position
+        self.position = start + size
+        if self.position > len(self.data):
+            raise ValueError("Encoded data ends unexpectedly")
+        return start
+
+    def value(self):
+        data, position = self.data, self.position
+        tag = data[position]
+        # Most values are hashes, strings and numbers, so those are checked first
+        if tag == HASH:
+            end = position + 33
+            if end > len(data):
+                raise ValueError("Encoded data ends unexpectedly")
+            self.position = end
+            return data[position + 1:end].hex()
+        if tag == TEXT or tag == LITERAL:
+            end = position + 5 + TX_COUNT.unpack_from(data, position + 1)[0]
+            if end > len(data):
+                raise ValueError("Encoded data ends unexpectedly")
+            self.position = end
+            text = str(data[position + 5:end], 'utf-8')
+            if tag == TEXT:
+                return text
+            try:
+                return ast.literal_eval(text)
+            except (SyntaxError, RecursionError, MemoryError) as error:
+                raise ValueError(f"Invalid literal in encoded data ({error})") from None
+        if tag == INT or tag == FLOAT:
+            self.position = position + 9
+            return (INT_VALUE if tag == INT else FLOAT_VALUE).unpack_from(data, position)[1]
+        self.position = position + 1
+        if tag == NONE:
+            return None
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        raise ValueError(f"Unknown value tag {tag}")
+
+    def typed_value(self, types, name):
+        """
+        Reads a value that must be one of the given types (bool does not count as a number).
+        """
+        value = self.value()
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"Encoded {name} has unexpected type {type(value).__name__}")
+        return value
+
+    def count(self, size_struct):
+        return size_struct.unpack_from(self.data, self._take(size_struct.size))[0]
+
+    def transaction(self):
+        if self.data[self.position] != STANDARD:
+            return self.value()
+        self._take(1)
+        transaction_id = self.typed_value(str, "transaction_id")
+        sender = self.value()
+        receiver = self.value()
+        amount = self.typed_value(NUMBER, "amount")
+        spent_transactions = [self.typed_value(str, "spent transaction") for _ in range(self.count(COUNT))]
+        transaction_time = self.typed_value(NUMBER + (type(None),), "transaction_time")
+        return Transaction(transaction_id, sender, receiver, amount, spent_transactions, transaction_time,
+                           self.typed_value(NUMBER, "fee"))
+
+
+def encode_transaction(tx):
+    """
+    Encodes one transaction.
+
+    Args:
+        tx: A Transaction, a transaction dict, or any other transaction entry of an edited block.
+
+    Returns:
+        bytes: The canonical encoding.
+    """
+    out = bytearray()
+    _put_transaction(out, tx)
+    return bytes(out)
+
+
+def _decoding(decode):
+    # Truncated or corrupted input surfaces as ValueError whichever read runs past the end
+    def wrapper(data):
+        try:
+            return decode(data)
+        except (IndexError, struct.error) as error:
+            raise ValueError(f"Encoded data ends unexpectedly ({error})") from None
+    wrapper.__name__, wrapper.__doc__ = decode.__name__, decode.__doc__
+    return wrapper
+
+
+@_decoding
+def decode_transaction(data):
+    """
+    Decodes encode_transaction() output. Standard transactions come back as Transaction records.
+    """
+    return Reader(data).transaction()
+
+
+def encode_transactions(transactions):
+    """
+    Encodes a list of transactions (e.g. a block body) as a count followed by the transactions.
+    """
+    out = bytearray(TX_COUNT.pack(len(transactions)))
+    for tx in transactions:
+        _put_transaction(out, tx)
+    return bytes(out)
+
+
+@_decoding
+def decode_transactions(data):
+    reader = Reader(data)
+    return [reader.transaction() for _ in range(reader.count(TX_COUNT))]
+
+
+def encode_block(block):
+    """
+    Encodes a block, including its transactions.
+
+    Returns:
+        bytes: The canonical encoding.
+    """
+    out = bytearray((FORMAT_VERSION,))
+    _put_value(out, block.id)
+    _put_value(out, block.timestamp)
+    _put_value(out, block.nonce)
+    _put_hash(out, block.previous_hash)
+    _put_hash(out, block.current_hash)
+    _put_hash(out, block.merkle_root)
+    _put_value(out, block.version)
+    flags = (HAS_TARGET if block.target is not None else 0) | (PRUNED if block.pruned else 0)
+    out.append(flags)
+    if block.target is not None:
+        out += block.target.to_bytes(32, 'big')
+    out += TX_COUNT.pack(len(block.transactions))
+    for tx in block.transactions:
+        _put_transaction(out, tx)
+    return bytes(out)
+
+
+@_decoding
+def decode_block(data):
+    """
+    Decodes encode_block() output.
+
+    Args:
+        data (bytes | memoryview): The encoded block.
+
+    Returns:
+        Block: The decoded block.
+    """
+    reader = Reader(data)
+    if data[0] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported block encoding version {data[0]}")
+    reader.position = 1
+    id, timestamp, nonce = reader.typed_value(int, "id"), reader.typed_value(NUMBER, "timestamp"), reader.value()
+    hash_or_none = (str, type(None))
+    previous_hash = reader.typed_value(hash_or_none, "previous_hash")
+    current_hash = reader.typed_value(hash_or_none, "current_hash")
+    merkle_root = reader.typed_value(hash_or_none, "merkle_root")
+    version = reader.typed_value((int, type(None)), "version")
+    target = None
+    flags = data[reader._take(1)]
+    if flags & HAS_TARGET:
+        start = reader._take(32)
+        target = int.from_bytes(data[start:start + 32], 'big')
+    transactions = [reader.transaction() for _ in range(reader.count(TX_COUNT))]
+    return Block(id, timestamp, transactions, previous_hash, nonce, current_hash, merkle_root, target, version,
+                 bool(flags & PRUNED))
+
+
+def _raw_hash(value, name):
+    if value is None:
+        return NO_HASH
+    try:
+        raw = bytes.fromhex(value)
+    except (TypeError, ValueError):
+        raw = b""
+    if len(raw) != 32:
+        raise ValueError(f"Binary hashing needs a 64-character hex {name}, got {value!r}")
+    return raw
+
+
+def header_prefix(block):
+    """
+    Builds the fixed-width part of a binary-hashed block's hash preimage (everything except the nonce):
+    version, id, timestamp, Merkle root, previous hash (zeros for a genesis block) and target (zeros if none).
+    """
+    target = block.target.to_bytes(32, 'big') if block.target is not None else NO_HASH
+    return HEADER.pack(block.version, block.id, block.timestamp, _raw_hash(block.merkle_root, "merkle_root"),
+                       _raw_hash(block.previous_hash, "previous_hash"), target)
+
+
+def encode_nonce(nonce):
+    return NONCE.pack(nonce)
+
+
+def encode_meta(meta):
+    """
+    Encodes a block log metadata record: the mempool transactions followed by the difficulty and retarget settings.
+    """
+    out = bytearray(encode_transactions(meta['mempool']))
+    _put_value(out, meta['difficulty'])
+    _put_value(out, meta.get('retarget'))
+    return bytes(out)
+
+
+@_decoding
+def decode_meta(data):
+    reader = Reader(data)
+    mempool = [reader.transaction() for _ in range(reader.count(TX_COUNT))]
+    return {'mempool': mempool, 'difficulty': reader.value(), 'retarget': reader.value()}
@@ -0,0 +1,144 @@
+"""
+Binary Codec Test Cases
+Demonstrates that blocks and transactions survive the canonical encoding unchanged (so their hashes still verify),
+and that malformed payloads from a peer are rejected with ValueError instead of crashing the reader.
+Created by: Zyle Estacion (s4064846)
+RMIT University - INTE264 Assignment 2
+"""
+
+from blockchain import Blockchain
+from codec import (encode_block, decode_block, encode_transaction, decode_transaction, encode_transactions,
+                   decode_transactions, INT, INT_VALUE, LITERAL, LENGTH_VALUE, STANDARD, TX_COUNT)
+from events import configure_cli, WARNING
+
+def build_chain():
+    """
+    Mines a short chain using every hashing mode, with a numeric target on the last blocks.
+    """
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    blockchain.new_block()
+    for header_hashing, binary_hashing in ((False, False), (True, False), (True, True)):
+        blockchain.modify_hashing(header_hashing, binary_hashing)
+        blockchain.new_transaction("genesis", "Alice", 10.5)
+        blockchain.new_transaction("genesis", "Bob", 3, fee=1)
+        blockchain.new_block(previous_hash=blockchain.last_block.current_hash)
+    blockchain.modify_retargeting(4)
+    blockchain.new_block(previous_hash=blockchain.last_block.current_hash)
+    return blockchain
+
+def test_block_round_trip():
+    """
+    Every block decodes to the same fields and still verifies.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 1: Block Round Trip")
+    print("="*50)
+
+    blockchain = build_chain()
+    decoded = [decode_block(encode_block(block)) for block in blockchain.chain]
+    same = all(block.to_dict() == copy.to_dict() for block, copy in zip(blockchain.chain, decoded))
+    verified = all(Blockchain.verify_hash(block) for block in decoded)
+    print(f"{len(decoded)} blocks decode to the same fields: {'✅' if same else '❌'}")
+    print(f"Decoded blocks still verify: {'✅' if verified else '❌'}")
+    return same and verified
+
+def test_transaction_round_trip():
+    """
+    Standard transactions, transaction dicts and the odd entries of edited blocks all round-trip.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 2: Transaction Round Trip")
+    print("="*50)
+
+    blockchain = build_chain()
+    standard = [tx for block in blockchain.chain for tx in block.transactions]
+    edited = [
+        {'transaction_id': "x", 'sender': "s", 'receiver': "r", 'amount': "not a number",
+         'spent_transactions': [], 'transaction_time': 1},
+        {'note': "free-form entry"},
+        42,
+    ]
+    all_same = True
+    for tx in standard + edited:
+        copy = decode_transaction(encode_transaction(tx))
+        same = (copy.to_dict() if hasattr(copy, 'to_dict') else copy) == (tx.to_dict() if hasattr(tx, 'to_dict') else tx)
+        all_same = all_same and same
+    print(f"{len(standard)} standard and {len(edited)} edited transactions round-trip: {'✅' if all_same else '❌'}")
+    return all_same
+
+def rejected(decode, data):
+    try:
+        decode(data)
+    except ValueError:
+        return True
+    return False
+
+def test_malformed_input():
+    """
+    Truncated data, unknown tags, wrongly typed fields and broken literals raise ValueError.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 3: Malformed Payloads")
+    print("="*50)
+
+    chain = build_chain().chain
+    encoded_block = encode_block(chain[-1])
+    transaction = encode_transaction(chain[1].transactions[0])
+    # A standard transaction whose ID is an integer instead of a hash
+    integer_id = TX_COUNT.pack(1) + bytes([STANDARD]) + INT_VALUE.pack(INT, 7) + transaction[34:]
+    broken_literal = TX_COUNT.pack(1) + LENGTH_VALUE.pack(LITERAL, 5) + b"((((("
+
+    cases = {
+        "Truncated block": (decode_block, encoded_block[:len(encoded_block) // 2]),
+        "Unknown block format": (decode_block, bytes([99]) + encoded_block[1:]),
+        "Unknown value tag": (decode_transactions, TX_COUNT.pack(1) + bytes([200])),
+        "Integer transaction ID": (decode_transactions, integer_id),
+        "Broken literal": (decode_transactions, broken_literal),
+        "More transactions than data": (decode_transactions, TX_COUNT.pack(3) + transaction),
+    }
+    all_rejected = True
+    for name, (decode, data) in cases.items():
+        result = rejected(decode, data)
+        all_rejected = all_rejected and result
+        print(f"{name}: {'✅ Rejected' if result else '❌ Accepted'}")
+    return all_rejected
+
+def test_batch_round_trip():
+    """
+    A block body encoded for sync decodes to the same transactions.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 4: Block Body Round Trip")
+    print("="*50)
+
+    transactions = [tx for block in build_chain().chain for tx in block.transactions]
+    copy = decode_transactions(encode_transactions(transactions))
+    same = [tx.to_dict() for tx in copy] == [tx.to_dict() for tx in transactions]
+    print(f"{len(transactions)} transactions decode to the same fields: {'✅' if same else '❌'}")
+    return same
+
+if __name__ == "__main__":
+    configure_cli(WARNING)
+    print("🧬 BINARY CODEC TEST SUITE")
+    print("INTE264 Assignment 2 - Zyle Estacion (s4064846)")
+    print("=" * 60)
+
+    results = {
+        "Block round trip": test_block_round_trip(),
+        "Transaction round trip": test_transaction_round_trip(),
+        "Malformed payloads rejected": test_malformed_input(),
+        "Block body round trip": test_batch_round_trip(),
+    }
+
+    # Final summary
+    print("\n" + "="*60)
+    print("📊 FINAL TEST SUMMARY")
+    print("="*60)
+    for name, passed in results.items():
+        print(f"{name}: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if all(results.values()):
+        print("\n🎉 All tests passed! Encodings round-trip and malformed payloads are rejected safely.")
+    else:
+        print("\n⚠️ Some tests failed. Review the codec implementation.")
@@ -0,0 +1,144 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Compressed saves. The chain is pickled in segments of SEGMENT_SIZE blocks straight into a gzip (zlib), xz (lzma) or
+bzip2 stream, so only one segment's raw pickle exists at a time and the files stay readable by the standard tools
+(e.g. zcat saves/blockchain.pkl.gz).
+
+Stream layout: a header dict (mempool, difficulty, retarget settings and block count), then one list of blocks per
+segment, all pickled by the same Pickler so repeated objects are written once for the whole file. Every 64-character
+hex ID is additionally replaced by its 32 raw bytes the first time it appears and by a reference to that entry
+after that, so the transaction and block IDs that fill a chain (as spent inputs and previous hashes) are stored
+once each. Loading maps each entry back to a single shared string.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+import pickle
+import sys
+
+# Extension of each compressed save format -> compression name
+COMPRESSED_EXTENSIONS = {
+    '.pkl.gz': 'zlib',
+    '.pkl.xz': 'lzma',
+    '.pkl.bz2': 'bz2',
+}
+# Blocks pickled per segment
+SEGMENT_SIZE = 1000
+FORMAT = "segmented-chain"
+VERSION = 1
+
+
+def _open(path, mode, compression, level=None):
+    """
+    Opens a (de)compressing file. 'none' opens the file as is (to measure deduplication on its own).
+    """
+    if compression == 'zlib':
+        return gzip.open(path, mode, compresslevel=9 if level is None else level)
+    if compression == 'lzma':
+        return lzma.open(path, mode, preset=level)
+    if compression == 'bz2':
+        return bz2.open(path, mode, compresslevel=9 if level is None else level)
+    if compression == 'none':
+        return open(path, mode)
+    raise ValueError(f"Unknown compression {compression!r}")
+
+
+def compression_for(filename):
+    """
+    Returns:
+        str: The compression selected by a filename's extension, or None if it is not a compressed save.
+    """
+    for extension, compression in COMPRESSED_EXTENSIONS.items():
+        if filename.endswith(extension):
+            return compression
+    return None
+
+
+class DedupPickler(pickle.Pickler):
+    """
+    Pickler that stores each hex ID once, as raw bytes, and refers back to it afterwards.
+    """
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._ids = {}
+
+    def persistent_id(self, obj):
+        if type(obj) is not str or len(obj) != 64:
+            return None
+        pid = self._ids.get(obj)
+        if pid is None:
+            try:
+                raw = bytes.fromhex(obj)
+            except ValueError:
+                return None
+            if raw.hex() != obj:
+                return None
+            # The same bytes object is returned for every occurrence, so the memo writes it only once
+            pid = self._ids[obj] = raw
+        return pid
+
+
+class DedupUnpickler(pickle.Unpickler):
+    """
+    Reads DedupPickler output, sharing one string per distinct ID.
+    """
+    def __init__(self, file):
+        super().__init__(file)
+        self._ids = {}
+
+    def persistent_load(self, pid):
+        value = self._ids.get(pid)
+        if value is None:
+            value = self._ids[pid] = sys.intern(pid.hex())
+        return value
+
+
+def save_compressed(path, chain, mempool, difficulty, retarget=None, compression='zlib', level=None):
+    """
+    Writes a compressed save, one segment at a time. The file is written beside the target and swapped in
+    atomically.
+
+    Args:
+        path (str): File to write.
+        chain (list): The blocks (a list or a lazy chain).
+        mempool (list): Pending transactions.
+        difficulty (int): Mining difficulty.
+        retarget (dict): Retargeting settings, or None.
+        compression (str): 'zlib', 'lzma' or 'bz2'.
+        level (int): Compression level (the codec's default if None).
+    """
+    temp_path = path + ".tmp"
+    with _open(temp_path, 'wb', compression, level) as f:
+        pickler = DedupPickler(f)
+        pickler.dump({'format': FORMAT, 'version': VERSION, 'blocks': len(chain), 'mempool': list(mempool),
+                      'difficulty': difficulty, 'retarget': retarget})
+        for start in range(0, len(chain), SEGMENT_SIZE):
+            pickler.dump(chain[start:start + SEGMENT_SIZE])
+    os.replace(temp_path, path)
+
+
+def load_compressed(path, compression='zlib'):
+    """
+    Reads a compressed save, decompressing it as a stream.
+
+    Returns:
+        dict: 'chain', 'mempool', 'difficulty' and 'retarget', like the data of a plain pickle save.
+    """
+    with _open(path, 'rb', compression) as f:
+        unpickler = DedupUnpickler(f)
+        header = unpickler.load()
+        if not isinstance(header, dict) or header.get('format') != FORMAT:
+            raise ValueError(f"{path} is not a compressed blockchain save")
+        if header['version'] != VERSION:
+            raise ValueError(f"Unsupported compressed save version {header['version']}")
+
+        chain = []
+        while len(chain) < header['blocks']:
+            chain.extend(unpickler.load())
+    return {'chain': chain, 'mempool': header['mempool'], 'difficulty': header['difficulty'],
+            'retarget': header['retarget']}
@@ -6,6 +6,7 @@ RMIT University - INTE264 Assignment 2
 """
 
 from blockchain import Blockchain
+from events import configure_cli
 import time
 
 def test_double_spend_prevention():
@@ -116,7 +117,8 @@ def test_double_spend_prevention():
     
     # Mine block to confirm David's funds
     block3 = blockchain.new_block(mine=False, nonce=300, previous_hash=block2.current_hash)
-    david_tx_id = block3.transactions[0]['transaction_id']
+    # The block also confirms Alice's pending payment to Bob, so find David's output by receiver
+    david_tx_id = next(tx['transaction_id'] for tx in block3.transactions if tx['receiver'] == "David")
     
     print(f"David received transaction ID: {david_tx_id[:8]}...")
     
@@ -214,6 +216,7 @@ def demonstrate_attack_scenario():
     return attack1 and not attack2
 
 if __name__ == "__main__":
+    configure_cli()
     print("🔗 BLOCKCHAIN DOUBLE-SPEND PREVENTION TEST SUITE")
     print("INTE264 Assignment 2 - Zyle Estacion (s4064846)")
     print("=" * 60)
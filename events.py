@@ -0,0 +1,86 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Status reporting for the blockchain library. Instead of printing, the library emits named events with a level and
+structured fields. They go to the standard "blockchain" logger and to any registered hooks.
+
+By default nothing is shown: the logger only has a NullHandler, and emit() returns after one level check when no
+hook is registered. Scripts that want the original console output call configure_cli().
+"""
+
+import logging
+import sys
+
+DEBUG = logging.DEBUG
+INFO = logging.INFO
+WARNING = logging.WARNING
+ERROR = logging.ERROR
+
+logger = logging.getLogger("blockchain")
+logger.addHandler(logging.NullHandler())
+
+_hooks = []
+
+
+def add_hook(hook):
+    """
+    Registers a callback for every event, regardless of the logger level.
+
+    Args:
+        hook (callable): Called as hook(event, level, fields) with the event name, log level and a dict of fields.
+    """
+    _hooks.append(hook)
+
+
+def remove_hook(hook):
+    _hooks.remove(hook)
+
+
+def enabled(level):
+    """
+    Returns True if an event at this level would be seen by anything. Use it to skip building expensive fields.
+    """
+    return bool(_hooks) or logger.isEnabledFor(level)
+
+
+def emit(level, event, message, **fields):
+    """
+    Reports an event.
+
+    Args:
+        level (int): Log level (DEBUG, INFO, WARNING or ERROR).
+        event (str): Short machine-readable event name, e.g. "block_mined".
+        message (str): Human-readable template, formatted with the fields only if it is actually logged.
+        **fields: Structured event data.
+    """
+    if _hooks:
+        for hook in _hooks:
+            hook(event, level, fields)
+    if logger.isEnabledFor(level):
+        logger.log(level, message.format(**fields) if fields else message, extra={'event': event, 'fields': fields})
+
+
+def set_quiet(quiet=True):
+    """
+    Silences (or restores) all log output. Hooks still receive events.
+    """
+    logger.setLevel(logging.CRITICAL + 1 if quiet else logging.NOTSET)
+
+
+def configure_cli(level=DEBUG):
+    """
+    Prints events to stdout as plain messages, matching the console output of the interactive scripts.
+
+    Args:
+        level (int): Lowest level to show.
+    """
+    if not any(getattr(handler, '_blockchain_cli', False) for handler in logger.handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler._blockchain_cli = True
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    # The CLI handler already prints these; don't repeat them through the root logger
+    logger.propagate = False
@@ -3,8 +3,11 @@
 # RMIT University
 
 from app import Blockchain
+from events import configure_cli
 import time
 
+configure_cli()
+
 # Chain integrity check function (move to top so it's defined before use)
 def verify_chain_integrity(blockchain):
     for i in range(1, len(blockchain.chain)):
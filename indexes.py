@@ -0,0 +1,154 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Secondary indexes over the mined chain, so blocks and transactions can be found without scanning it:
+block hash -> position, transaction ID -> (block position, position in block), address -> transactions, and a
+sorted timestamp index for time range queries.
+
+Positions are indexes into the chain list (block IDs normally match position + 1, but edited blocks may not).
+"""
+
+import bisect
+from collections.abc import Mapping
+
+
+class ChainIndex:
+    """
+    Lookup indexes maintained alongside the chain. Blocks are added in chain order and removed from the tip.
+    """
+    def __init__(self):
+        self.by_hash = {}          # current_hash -> block position
+        self.transactions = {}     # tx_id -> (block position, position in block)
+        self.by_address = {}       # address -> [(block position, tx_id), ...] in chain order
+        self._pruned = set()       # positions whose transactions were removed; their postings are skipped
+        self._stale = {}           # address -> number of its postings that point at pruned positions
+        self._times = []           # sorted block timestamps
+        self._time_positions = []  # block position for each entry of _times
+
+    @classmethod
+    def from_chain(cls, chain):
+        index = cls()
+        for position, block in enumerate(chain):
+            index.add_block(block, position)
+        return index
+
+    @staticmethod
+    def _addresses(tx):
+        sender, receiver = tx.get('sender'), tx.get('receiver')
+        return (sender,) if sender == receiver else (sender, receiver)
+
+    def add_block(self, block, position):
+        """
+        Indexes a block appended at the given position.
+        """
+        self.by_hash[block.current_hash] = position
+
+        for tx_position, tx in enumerate(block.transactions):
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                tx_id = tx['transaction_id']
+                self.transactions[tx_id] = (position, tx_position)
+                for address in self._addresses(tx):
+                    self.by_address.setdefault(address, []).append((position, tx_id))
+
+        # Timestamps are almost always increasing, so this is normally an append
+        timestamp = block.timestamp
+        if not self._times or timestamp >= self._times[-1]:
+            self._times.append(timestamp)
+            self._time_positions.append(position)
+        else:
+            i = bisect.bisect_right(self._times, timestamp)
+            self._times.insert(i, timestamp)
+            self._time_positions.insert(i, position)
+
+    def remove_block(self, block, position):
+        """
+        Removes the block at the tip (the last block added) from the indexes.
+        """
+        if self.by_hash.get(block.current_hash) == position:
+            del self.by_hash[block.current_hash]
+
+        for tx in reversed(block.transactions):
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                tx_id = tx['transaction_id']
+                if self.transactions.get(tx_id, (None,))[0] == position:
+                    del self.transactions[tx_id]
+                for address in self._addresses(tx):
+                    postings = self.by_address.get(address)
+                    if postings and postings[-1] == (position, tx_id):
+                        postings.pop()
+
+        i = bisect.bisect_left(self._times, block.timestamp)
+        while i < len(self._times) and self._times[i] == block.timestamp:
+            if self._time_positions[i] == position:
+                del self._times[i]
+                del self._time_positions[i]
+                break
+            i += 1
+
+    def remove_transactions(self, block, position):
+        """
+        Removes the transactions of a block anywhere in the chain (e.g. when pruning discards them), keeping the block
+        itself indexed by hash and timestamp. Address postings are skipped from then on and only dropped once they
+        are half of the address's list, so the cost stays proportional to the block's transactions.
+        """
+        self._pruned.add(position)
+        for tx in block.transactions:
+            if isinstance(tx, Mapping) and 'transaction_id' in tx:
+                tx_id = tx['transaction_id']
+                if self.transactions.get(tx_id, (None,))[0] == position:
+                    del self.transactions[tx_id]
+                for address in self._addresses(tx):
+                    postings = self.by_address.get(address)
+                    if not postings:
+                        continue
+                    stale = self._stale.get(address, 0) + 1
+                    if stale * 2 < len(postings):
+                        self._stale[address] = stale
+                        continue
+                    self._stale.pop(address, None)
+                    postings = [posting for posting in postings if posting[0] not in self._pruned]
+                    if postings:
+                        self.by_address[address] = postings
+                    else:
+                        del self.by_address[address]
+
+    def block_position(self, block_hash):
+        """
+        Returns:
+            int: Position of the block with this hash, or None.
+        """
+        return self.by_hash.get(block_hash)
+
+    def transaction_location(self, tx_id):
+        """
+        Returns:
+            tuple: (block position, position in block) of a mined transaction, or None.
+        """
+        return self.transactions.get(tx_id)
+
+    def address_postings(self, address):
+        """
+        Returns:
+            list: (block position, tx_id) of every transaction sent or received by the address, oldest first.
+        """
+        postings = self.by_address.get(address, ())
+        if address not in self._stale:
+            return list(postings)
+        return [posting for posting in postings if posting[0] not in self._pruned]
+
+    def positions_between(self, start=None, end=None):
+        """
+        Finds the blocks with start <= timestamp <= end in O(log n).
+
+        Args:
+            start (float): Earliest timestamp (None for no lower bound).
+            end (float): Latest timestamp (None for no upper bound).
+
+        Returns:
+            list: Block positions in chain order.
+        """
+        low = 0 if start is None else bisect.bisect_left(self._times, start)
+        high = len(self._times) if end is None else bisect.bisect_right(self._times, end)
+        return sorted(self._time_positions[low:high])
@@ -0,0 +1,202 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Priority-ordered mempool. Pending transactions are kept in a heap ordered by fee (highest first, oldest first on
+ties) so building a block pops the best transactions in O(log n) each, and a second heap finds the lowest-priority
+entry to evict when the pool is full.
+"""
+
+import heapq
+import itertools
+
+# Default maximum number of pending transactions
+DEFAULT_MAX_SIZE = 50000
+# Transactions in a row that may be passed over for not fitting a block before selection gives up
+MAX_SKIPPED = 100
+
+
+def transaction_size(transaction):
+    """
+    Approximate size of a transaction in bytes, as it appears in the block's hashable string.
+    """
+    return len(repr(transaction).encode())
+
+
+class Mempool:
+    """
+    Pending transactions waiting to be mined.
+
+    Iterating (or indexing) returns transactions in the order they would be mined. The sorted order is cached until
+    the pool changes; mempool[0] is read from the top of the heap without sorting.
+    Removed or evicted entries are dropped from the heaps lazily when they reach the top.
+
+    Attributes:
+        max_size (int): Maximum number of pending transactions (None for unbounded).
+    """
+    def __init__(self, transactions=(), max_size=DEFAULT_MAX_SIZE):
+        self.max_size = max_size
+        self._entries = {}       # tx_id -> (priority, sequence, transaction)
+        self._best = []          # (-priority, sequence, tx_id): next to mine on top
+        self._worst = []         # (priority, -sequence, tx_id): next to evict on top
+        self._sequence = itertools.count()
+        self._ordered = None     # cached mining order, rebuilt after the pool changes
+        for transaction in transactions:
+            self.add(transaction)
+
+    @staticmethod
+    def priority(transaction):
+        return transaction.get('fee', 0)
+
+    def add(self, transaction):
+        """
+        Adds a transaction. If the pool is over capacity the lowest-priority transactions are evicted
+        (newest first among equal fees), which may be the new transaction itself.
+
+        Args:
+            transaction (Mapping): The transaction to add.
+
+        Returns:
+            list: Evicted transactions (empty if nothing was evicted).
+        """
+        tx_id = transaction['transaction_id']
+        priority = self.priority(transaction)
+        sequence = next(self._sequence)
+
+        self._entries[tx_id] = (priority, sequence, transaction)
+        self._ordered = None
+        heapq.heappush(self._best, (-priority, sequence, tx_id))
+        heapq.heappush(self._worst, (priority, -sequence, tx_id))
+
+        if max(len(self._best), len(self._worst)) > 2 * len(self._entries) + 64:
+            self.compact()
+
+        evicted = []
+        while self.max_size is not None and len(self._entries) > self.max_size:
+            evicted.append(self.evict_lowest())
+        return evicted
+
+    def _pop(self, heap):
+        """
+        Pops the top live entry from one of the heaps, skipping entries that were already removed.
+        """
+        while heap:
+            _, sequence_key, tx_id = heapq.heappop(heap)
+            entry = self._entries.get(tx_id)
+            if entry is not None and abs(sequence_key) == entry[1]:
+                del self._entries[tx_id]
+                self._ordered = None
+                return entry[2]
+        raise IndexError("pop from an empty mempool")
+
+    def pop(self):
+        """
+        Removes and returns the highest-priority transaction.
+        """
+        return self._pop(self._best)
+
+    def evict_lowest(self):
+        """
+        Removes and returns the lowest-priority transaction (newest first among equal fees), the next one eviction
+        would drop.
+        """
+        return self._pop(self._worst)
+
+    def peek(self):
+        """
+        Returns the highest-priority transaction without removing it (None if empty).
+        """
+        while self._best:
+            _, sequence, tx_id = self._best[0]
+            entry = self._entries.get(tx_id)
+            if entry is not None and entry[1] == sequence:
+                return entry[2]
+            heapq.heappop(self._best)
+        return None
+
+    def select(self, max_transactions=None, max_bytes=None):
+        """
+        Removes and returns the transactions for the next block in priority order. A transaction too large for the
+        space left is passed over (and stays in the pool) so smaller ones behind it can still be mined; selection
+        stops after MAX_SKIPPED of those in a row.
+
+        Args:
+            max_transactions (int): Maximum number of transactions (None for no limit).
+            max_bytes (int): Maximum total size of the transactions (None for no limit).
+
+        Returns:
+            list: The selected transactions.
+        """
+        selected = []
+        skipped = []
+        total_bytes = 0
+        misses = 0
+        while self._entries and misses < MAX_SKIPPED and (max_transactions is None or len(selected) < max_transactions):
+            entry = self._entries[self.peek()['transaction_id']]
+            size = transaction_size(entry[2])
+            self.pop()
+            if max_bytes is not None and total_bytes + size > max_bytes:
+                skipped.append(entry)
+                misses += 1
+                continue
+            selected.append(entry[2])
+            total_bytes += size
+            misses = 0
+
+        # Passed-over transactions go back with their original place in the queue. Their eviction heap entries
+        # were never popped, so only the mining heap needs them again.
+        for priority, sequence, transaction in skipped:
+            self._entries[transaction['transaction_id']] = (priority, sequence, transaction)
+            heapq.heappush(self._best, (-priority, sequence, transaction['transaction_id']))
+        if skipped:
+            self._ordered = None
+        return selected
+
+    def remove(self, tx_id):
+        """
+        Removes a transaction by ID.
+
+        Returns:
+            The removed transaction, or None if it was not in the pool.
+        """
+        entry = self._entries.pop(tx_id, None)
+        if entry is None:
+            return None
+        self._ordered = None
+        return entry[2]
+
+    def compact(self):
+        """
+        Rebuilds the heaps without stale entries. Called automatically when they grow much larger than the pool.
+        """
+        self._best = [(-p, s, tx_id) for tx_id, (p, s, _) in self._entries.items()]
+        self._worst = [(p, -s, tx_id) for tx_id, (p, s, _) in self._entries.items()]
+        heapq.heapify(self._best)
+        heapq.heapify(self._worst)
+
+    def __contains__(self, tx_id):
+        return tx_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _order(self):
+        if self._ordered is None:
+            self._ordered = [entry[2] for entry in sorted(self._entries.values(), key=lambda e: (-e[0], e[1]))]
+        return self._ordered
+
+    def __iter__(self):
+        return iter(self._order())
+
+    def __getitem__(self, index):
+        if index == 0 and self._ordered is None:
+            # The next transaction to mine is the top of the heap, no sort needed
+            transaction = self.peek()
+            if transaction is None:
+                raise IndexError("mempool index out of range")
+            return transaction
+        return self._order()[index]
+
+    def __repr__(self):
+        return f"Mempool({len(self)} transactions)"
@@ -0,0 +1,111 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Merkle tree over a block's transactions. The root commits to every transaction, so the block header (and its
+Proof-of-Work hash) stays a fixed size no matter how many transactions the block holds, and a single transaction
+can be proven to be in a block with log2(n) sibling hashes.
+
+Leaves hash a transaction's repr(), or its canonical binary encoding (codec) for binary-hashed blocks.
+Because an odd node out is paired with itself, a list ending in a repeated transaction has the same root as the list
+without the repeat; blocks are therefore rejected if they list a transaction ID twice (Blockchain.check_block).
+"""
+
+from codec import encode_transaction
+import hashlib
+
+
+def leaf_hash(transaction, binary=False):
+    """
+    Hashes a single transaction. The leaf covers the whole transaction, not just its ID.
+
+    Args:
+        transaction: The transaction.
+        binary (bool): Hash the canonical binary encoding instead of the repr().
+
+    Returns:
+        bytes: Raw SHA-256 digest.
+    """
+    if binary:
+        return hashlib.sha256(encode_transaction(transaction)).digest()
+    return hashlib.sha256(repr(transaction).encode()).digest()
+
+
+def _parent(left, right):
+    return hashlib.sha256(left + right).digest()
+
+
+def _next_level(level):
+    # An odd node out is paired with itself
+    if len(level) % 2 == 1:
+        level = level + [level[-1]]
+    return [_parent(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+
+
+def merkle_root(transactions, binary=False):
+    """
+    Computes the Merkle root of a list of transactions.
+
+    Args:
+        transactions (list): The block's transactions.
+        binary (bool): Use binary leaves (for binary-hashed blocks).
+
+    Returns:
+        str: Root hash in hex format (hash of empty input for a block without transactions).
+    """
+    if not transactions:
+        return hashlib.sha256(b"").hexdigest()
+
+    level = [leaf_hash(tx, binary) for tx in transactions]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+
+def merkle_proof(transactions, transaction_id, binary=False):
+    """
+    Builds an inclusion proof for one transaction.
+
+    Args:
+        transactions (list): The block's transactions.
+        transaction_id (str): ID of the transaction to prove.
+        binary (bool): Use binary leaves (for binary-hashed blocks).
+
+    Returns:
+        list: (sibling hash hex, 'left' or 'right') pairs from leaf to root, or None if the ID is not in the list.
+    """
+    index = next((i for i, tx in enumerate(transactions) if tx.get('transaction_id') == transaction_id), None)
+    if index is None:
+        return None
+
+    proof = []
+    level = [leaf_hash(tx, binary) for tx in transactions]
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level = level + [level[-1]]
+        sibling = index ^ 1
+        proof.append((level[sibling].hex(), 'left' if sibling < index else 'right'))
+        level = _next_level(level)
+        index //= 2
+    return proof
+
+
+def verify_proof(transaction, proof, root, binary=False):
+    """
+    Checks an inclusion proof against a Merkle root.
+
+    Args:
+        transaction (Mapping): The transaction being proven.
+        proof (list): Output of merkle_proof.
+        root (str): Merkle root from the block header.
+        binary (bool): Use binary leaves (for binary-hashed blocks).
+
+    Returns:
+        bool: True if the transaction is part of the tree with this root.
+    """
+    current = leaf_hash(transaction, binary)
+    for sibling_hex, side in proof:
+        sibling = bytes.fromhex(sibling_hex)
+        current = _parent(sibling, current) if side == 'left' else _parent(current, sibling)
+    return current.hex() == root
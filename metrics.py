@@ -0,0 +1,146 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Lightweight metrics for mining and verification: counters, gauges and fixed-bucket histograms, readable as a dict
+(get_metrics) or as Prometheus text exposition format.
+"""
+
+import bisect
+import os
+
+# Metric names are prefixed with this in the Prometheus output
+NAMESPACE = "blockchain"
+
+# Bucket upper bounds for the built-in histograms
+ATTEMPT_BUCKETS = (16, 256, 4096, 65536, 1048576, 16777216, 268435456)
+SECONDS_BUCKETS = (0.001, 0.01, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+
+# Help text for the metrics recorded by Blockchain
+DEFAULT_HELP = {
+    'blocks_mined_total': "Blocks mined by this process",
+    'hashes_total': "Proof-of-Work hashes computed for mined blocks",
+    'blocks_verified_total': "Blocks checked by verify_chain and audit_chain",
+    'hashrate': "Hashes per second of the last mined block",
+    'mempool_depth': "Pending transactions in the mempool",
+    'chain_height': "Number of blocks in the chain",
+    'mining_attempts': "Nonces tried per mined block",
+    'block_time_seconds': "Time spent mining each block",
+    'verification_seconds': "Time spent per chain verification",
+}
+
+
+class Histogram:
+    """
+    Counts observations into cumulative buckets, like a Prometheus histogram.
+
+    Attributes:
+        buckets (tuple): Sorted bucket upper bounds (an implicit +Inf bucket is added).
+        count (int): Number of observations.
+        sum (float): Total of all observations.
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Returns:
+            list: (upper bound label, cumulative count) pairs, ending with ('+Inf', count).
+        """
+        result = []
+        running = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            running += count
+            result.append((str(bound), running))
+        return result
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'buckets': dict(self.cumulative())
+        }
+
+
+class Metrics:
+    """
+    A registry of named counters, gauges and histograms.
+    """
+    def __init__(self):
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.help = dict(DEFAULT_HELP)
+
+    def inc(self, name, value=1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name, value):
+        self.gauges[name] = value
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(buckets)
+        histogram.observe(value)
+
+    def describe(self, name, text):
+        """
+        Sets the help text shown for a metric in the Prometheus output.
+        """
+        self.help[name] = text
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: 'counters', 'gauges' and 'histograms' as plain data.
+        """
+        return {
+            'counters': dict(self.counters),
+            'gauges': dict(self.gauges),
+            'histograms': {name: histogram.to_dict() for name, histogram in self.histograms.items()}
+        }
+
+    def to_prometheus(self):
+        """
+        Renders every metric in the Prometheus text exposition format.
+        """
+        lines = []
+
+        def header(name, kind):
+            full_name = f"{NAMESPACE}_{name}"
+            if name in self.help:
+                lines.append(f"# HELP {full_name} {self.help[name]}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            return full_name
+
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{header(name, 'counter')} {value}")
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"{header(name, 'gauge')} {value}")
+        for name, histogram in sorted(self.histograms.items()):
+            full_name = header(name, 'histogram')
+            for bound, count in histogram.cumulative():
+                lines.append(f'{full_name}_bucket{{le="{bound}"}} {count}')
+            lines.append(f"{full_name}_sum {histogram.sum}")
+            lines.append(f"{full_name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Writes the Prometheus text to a file, replacing it atomically so scrapers never see a partial file.
+        """
+        temp_path = path + ".tmp"
+        with open(temp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
@@ -0,0 +1,266 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Proof-of-Work helpers: a midstate hasher that only hashes the constant part of a block once, and a parallel
+nonce search that splits the nonce space into chunks handed out to a pool of worker processes.
+
+A Proof-of-Work target is either a hex prefix ("0000", the fixed difficulty) or a numeric target (an int): the hash,
+read as a 256-bit number, must be at most the target. Numeric targets allow the fine-grained steps used by
+difficulty retargeting.
+"""
+
+from codec import BINARY_HASHING, NONCE, header_prefix
+import hashlib
+import math
+import multiprocessing
+import os
+import queue
+
+# Default number of nonces a worker checks before looking at the stop flag
+DEFAULT_CHUNK_SIZE = 20000
+# Seconds to wait for a worker result before checking that the workers are still running
+RESULT_POLL_SECONDS = 1.0
+
+# Easiest possible numeric target (every hash meets it)
+MAX_TARGET = 2 ** 256 - 1
+
+
+def difficulty_to_target(difficulty):
+    """
+    Converts a leading-zeros difficulty to the equivalent numeric target. A hash starts with difficulty zeros
+    exactly when it is at most this number.
+    """
+    return 2 ** (256 - 4 * difficulty) - 1
+
+
+def target_to_difficulty(target):
+    """
+    Converts a numeric target back to a (fractional) number of leading hex zeros, for display.
+    """
+    return math.log(MAX_TARGET / target, 16)
+
+
+def block_work(target):
+    """
+    Expected number of hashes needed to meet a numeric target. Summed along a branch for fork choice.
+    """
+    return (MAX_TARGET + 1) // (target + 1)
+
+
+def meets_target(digest, target):
+    """
+    Checks a hex hash against a target.
+
+    Args:
+        digest (str): Hex hash.
+        target (str | int): Required hex prefix, or numeric target.
+
+    Returns:
+        bool: True if the hash satisfies the target.
+    """
+    if isinstance(target, int):
+        return int(digest, 16) <= target
+    return digest.startswith(target)
+
+
+def retarget(target, actual_span, expected_span, max_factor=4):
+    """
+    Scales a target by how long the last blocks actually took compared to how long they should have taken.
+    Slow blocks raise the target (easier), fast blocks lower it. Integer arithmetic keeps the result identical on
+    every node.
+
+    Args:
+        target (int): Current numeric target.
+        actual_span (float): Seconds between the first and last block of the retarget window.
+        expected_span (float): Seconds the window should have taken.
+        max_factor (int): Largest change allowed in one step, in either direction.
+
+    Returns:
+        int: The new target, between 1 and MAX_TARGET.
+    """
+    actual_ms = int(actual_span * 1000)
+    expected_ms = max(int(expected_span * 1000), 1)
+    actual_ms = min(max(actual_ms, expected_ms // max_factor, 1), expected_ms * max_factor)
+    return min(max(target * actual_ms // expected_ms, 1), MAX_TARGET)
+
+
+def hash_prefix(block):
+    """
+    Builds the part of the hashable string that does not change while mining (everything except the nonce).
+    Blocks with a Merkle root hash a fixed-size header; older blocks hash the full transaction list.
+    Blocks that record a numeric target commit to it (as 64 hex digits) so it cannot be changed without re-mining.
+    The fixed width keeps the target from running into the decimal nonce: with variable-width hex, target T and
+    nonce "12" would hash the same text as target T * 16 + 1 and nonce "2".
+    Binary-hashed blocks use the fixed-width binary header from codec instead of text.
+
+    Args:
+        block: The block being mined.
+
+    Returns:
+        str | bytes: The constant prefix used by Blockchain.hash (bytes for binary-hashed blocks).
+    """
+    if getattr(block, 'version', None) == BINARY_HASHING:
+        return header_prefix(block)
+    merkle_root = getattr(block, 'merkle_root', None)
+    target = getattr(block, 'target', None)
+    target = f"{target:064x}" if target is not None else ""
+    if merkle_root is not None:
+        return f"{block.id}{block.timestamp}{merkle_root}{block.previous_hash}{target}"
+    return f"{block.id}{block.timestamp}{block.transactions}{block.previous_hash}{target}"
+
+
+class MiningHasher:
+    """
+    Hashes a block for many nonces. The constant prefix is serialized and fed to SHA-256 once, then each attempt
+    copies that midstate and appends only the nonce. Output is byte-for-byte identical to Blockchain.hash.
+
+    Attributes:
+        prefix (str | bytes): Constant part of the hashable string, or the binary header of a binary-hashed block
+            (whose nonce is appended as 8 bytes instead of decimal text).
+    """
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self.binary = isinstance(prefix, bytes)
+        self._midstate = hashlib.sha256(prefix if self.binary else prefix.encode())
+
+    @classmethod
+    def for_block(cls, block):
+        return cls(hash_prefix(block))
+
+    def hash(self, nonce):
+        """
+        Returns the hex hash of the block with the given nonce.
+        """
+        h = self._midstate.copy()
+        h.update(NONCE.pack(nonce) if self.binary else str(nonce).encode())
+        return h.hexdigest()
+
+    def search(self, target, start, count):
+        """
+        Checks a contiguous range of nonces.
+
+        Args:
+            target (str | int): Required hash prefix, e.g. "0000", or numeric target.
+            start (int): First nonce to try.
+            count (int): Number of nonces to try.
+
+        Returns:
+            tuple: (nonce, hash) of the first valid nonce, or None if the range has no solution.
+        """
+        midstate = self._midstate
+        pack = NONCE.pack if self.binary else None
+        if isinstance(target, int):
+            # Big-endian digests compare like the numbers they encode, so skip the hex conversion per attempt
+            target_bytes = target.to_bytes(32, 'big')
+            for nonce in range(start, start + count):
+                h = midstate.copy()
+                h.update(pack(nonce) if pack else str(nonce).encode())
+                if h.digest() <= target_bytes:
+                    return nonce, h.hexdigest()
+            return None
+
+        for nonce in range(start, start + count):
+            h = midstate.copy()
+            h.update(pack(nonce) if pack else str(nonce).encode())
+            digest = h.hexdigest()
+            if digest.startswith(target):
+                return nonce, digest
+        return None
+
+
+def _worker(prefix, target, start, stride, chunk_size, stop_event, results):
+    """
+    Worker process loop. Worker i checks chunks i, i + workers, i + 2 * workers, ... until a solution is found anywhere.
+    """
+    hasher = MiningHasher(prefix)
+    chunk_start = start
+    attempts = 0
+    while not stop_event.is_set():
+        found = hasher.search(target, chunk_start, chunk_size)
+        if found is not None:
+            nonce, digest = found
+            attempts += nonce - chunk_start + 1
+            stop_event.set()
+            results.put((nonce, digest, attempts))
+            return
+        attempts += chunk_size
+        chunk_start += stride
+    results.put((None, None, attempts))
+
+
+def parallel_mine(block, difficulty, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Searches for a valid nonce using a pool of worker processes. The first worker to find a hash with the
+    "0" * difficulty prefix (or within the block's own numeric target, if it records one) stops the others.
+    The block's nonce and current_hash are updated in place.
+
+    Args:
+        block: The block to mine. Its current nonce is used as the starting point.
+        difficulty (int): Number of leading zeros required when the block has no numeric target.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        chunk_size (int): Number of nonces each worker checks between stop checks.
+
+    Returns:
+        int: Total number of hashes attempted across all workers.
+
+    Raises:
+        RuntimeError: If a worker process dies before a solution is found.
+    """
+    workers = workers or os.cpu_count() or 1
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+
+    prefix = hash_prefix(block)
+    target = getattr(block, 'target', None)
+    if target is None:
+        target = "0" * difficulty
+    stride = workers * chunk_size
+
+    stop_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(prefix, target, block.nonce + i * chunk_size, stride, chunk_size, stop_event, results),
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    winner = None
+    attempts = 0
+    try:
+        # Every worker reports exactly once, either with a solution or with its attempt count after being stopped
+        reported = 0
+        while reported < len(processes):
+            try:
+                nonce, digest, worker_attempts = results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                # A worker that was killed (or crashed) never reports, so stop waiting for it
+                failed = [process for process in processes if process.exitcode not in (None, 0)]
+                if failed or not any(process.is_alive() for process in processes):
+                    if winner is not None:
+                        break
+                    codes = ", ".join(str(process.exitcode) for process in failed) or "0"
+                    raise RuntimeError(f"Mining worker exited (code {codes}) before a valid nonce was found")
+                continue
+            reported += 1
+            attempts += worker_attempts
+            if nonce is not None and winner is None:
+                winner = (nonce, digest)
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+    if winner is None:
+        raise RuntimeError("Parallel mining stopped without finding a valid nonce")
+
+    block.nonce, block.current_hash = winner
+    return attempts
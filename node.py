@@ -0,0 +1,300 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Local JSON-RPC node service. Wraps a Blockchain in an asyncio server speaking newline-delimited JSON over TCP,
+so other processes can submit transactions, trigger mining and query the chain.
+
+Request:  {"id": 1, "method": "new_transaction", "params": {"sender": "Alice", "receiver": "Bob", "amount": 5}}
+Response: {"id": 1, "result": ...} or {"id": 1, "error": "message"}
+
+Requests without an "id" are notifications: they are handled the same way but get no response.
+
+Mining runs in worker processes (waited on from an executor thread), so requests keep being handled at full speed
+while Proof-of-Work is in progress.
+
+Usage: python node.py [--host 127.0.0.1] [--port 8545] [--genesis] [--sync HOST:PORT]
+"""
+
+from blockchain import Blockchain
+from block import Block
+from codec import encode_transactions
+from events import configure_cli
+import argparse
+import asyncio
+import base64
+import functools
+import itertools
+import json
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8545
+# Longest request or response line accepted (header and body chunks are large)
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+class NodeServer:
+    """
+    Serves one Blockchain over newline-delimited JSON-RPC.
+
+    Attributes:
+        blockchain (Blockchain): The chain being served.
+        host (str): Interface to listen on.
+        port (int): TCP port to listen on (0 picks a free port).
+    """
+    def __init__(self, blockchain, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.blockchain = blockchain
+        self.host = host
+        self.port = port
+        self.server = None
+        # Only one block is mined at a time
+        self._mining_lock = asyncio.Lock()
+        self.methods = {
+            'new_transaction': self.rpc_new_transaction,
+            'new_transactions': self.rpc_new_transactions,
+            'mine': self.rpc_mine,
+            'get_block': self.rpc_get_block,
+            'get_blocks': self.rpc_get_blocks,
+            'get_headers': self.rpc_get_headers,
+            'find_fork': self.rpc_find_fork,
+            'get_bodies': self.rpc_get_bodies,
+            'get_info': self.rpc_get_info,
+            'get_mempool': self.rpc_get_mempool,
+            'get_metrics': self.rpc_get_metrics,
+            'get_balance': self.rpc_get_balance,
+            'get_utxos': self.rpc_get_utxos,
+            'get_history': self.rpc_get_history,
+            'get_block_by_hash': self.rpc_get_block_by_hash,
+            'submit_block': self.rpc_submit_block,
+            'get_transaction': self.rpc_get_transaction,
+        }
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port, limit=STREAM_LIMIT)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self.server
+
+    async def serve_forever(self):
+        if self.server is None:
+            await self.start()
+        print(f"🌐 Node listening on {self.host}:{self.port}")
+        async with self.server:
+            await self.server.serve_forever()
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads one request per line and answers each in order on the same connection.
+        """
+        try:
+            while line := await reader.readline():
+                response = await self.dispatch(line)
+                if response is not None:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, line):
+        """
+        Handles one request line.
+
+        Returns:
+            dict: The response, or None for a notification.
+        """
+        request_id = None
+        notification = False
+        try:
+            request = json.loads(line)
+            request_id = request.get('id')
+            notification = 'id' not in request
+            method = self.methods.get(request.get('method'))
+            if method is None:
+                raise Exception(f"Unknown method {request.get('method')}")
+            result = await method(**request.get('params', {}))
+            return None if notification else {'id': request_id, 'result': result}
+        except Exception as e:
+            return None if notification else {'id': request_id, 'error': str(e)}
+
+    async def rpc_new_transaction(self, sender, receiver, amount, spent_transactions=None, fee=0):
+        block_id = self.blockchain.new_transaction(sender, receiver, amount, spent_transactions, fee)
+        return {'accepted': block_id is not None, 'block_id': block_id}
+
+    async def rpc_new_transactions(self, batch):
+        return self.blockchain.new_transactions(batch)
+
+    async def rpc_mine(self):
+        """
+        Mines the next block. Transactions are selected and the block is added on the event loop;
+        only the Proof-of-Work search runs elsewhere: in worker processes, waited on from an executor thread. Hashing
+        in the thread itself would hold the GIL and stall the event loop for the whole search.
+        """
+        async with self._mining_lock:
+            last_block = self.blockchain.last_block
+            block = self.blockchain.prepare_block(previous_hash=last_block.current_hash if last_block else None)
+
+            loop = asyncio.get_running_loop()
+            try:
+                mine = functools.partial(self.blockchain.mine_block, block, separate_process=True)
+                block = await loop.run_in_executor(None, mine)
+            except Exception:
+                self.blockchain.return_to_mempool(block)
+                raise
+
+            # A peer's block may have extended the chain while mining; then ours competes as a side branch
+            last_block = self.blockchain.last_block
+            if block.previous_hash != (last_block.current_hash if last_block else None):
+                self.blockchain.return_to_mempool(block)
+                self.blockchain.receive_block(block)
+                return block.to_dict()
+
+            return self.blockchain.commit_block(block).to_dict()
+
+    async def rpc_submit_block(self, block):
+        """
+        Accepts a block mined by another node (as returned by get_block).
+        """
+        return {'accepted': self.blockchain.receive_block(Block.from_dict(block))}
+
+    async def rpc_get_block(self, block_id):
+        if not 0 < block_id <= len(self.blockchain.chain):
+            return None
+        return self.blockchain.chain[block_id - 1].to_dict()
+
+    async def rpc_get_blocks(self, start=0, count=100):
+        return [block.to_dict() for block in self.blockchain.chain[start:start + count]]
+
+    async def rpc_get_headers(self, start=0, count=2000):
+        return [block.header() for block in self.blockchain.chain[start:start + count]]
+
+    async def rpc_find_fork(self, locator):
+        """
+        Finds where a peer's chain leaves this one, from the peer's block locator (see sync.block_locator).
+
+        Returns:
+            int: Number of leading blocks both chains share (the position to download headers from).
+        """
+        lookups = self.blockchain.chain_lookups()
+        for block_hash in locator:
+            position = lookups.block_position(block_hash)
+            if position is not None:
+                return position + 1
+        return 0
+
+    async def rpc_get_bodies(self, start=0, count=100, encoding="json"):
+        """
+        Returns only the transaction lists of a range of blocks; the rest of each block comes from get_headers.
+        With encoding="binary" each body is its canonical encoding (codec.encode_transactions) in base64, which is
+        smaller and faster to decode than JSON.
+        """
+        blocks = self.blockchain.chain[start:start + count]
+        if encoding == "binary":
+            return [base64.b64encode(encode_transactions(block.transactions)).decode() for block in blocks]
+        return [[dict(tx) for tx in block.transactions] for block in blocks]
+
+    async def rpc_get_info(self):
+        return self.blockchain.get_blockchain_info()
+
+    async def rpc_get_mempool(self):
+        return [dict(tx) for tx in self.blockchain.mempool]
+
+    async def rpc_get_metrics(self):
+        return self.blockchain.get_metrics()
+
+    async def rpc_get_balance(self, address):
+        return self.blockchain.get_balance(address)
+
+    async def rpc_get_utxos(self, address):
+        return self.blockchain.get_utxos(address)
+
+    async def rpc_get_history(self, address):
+        return self.blockchain.get_address_history(address)
+
+    async def rpc_get_block_by_hash(self, block_hash):
+        block = self.blockchain.get_block_by_hash(block_hash)
+        return block.to_dict() if block is not None else None
+
+    async def rpc_get_transaction(self, transaction_id):
+        found = self.blockchain.get_transaction(transaction_id)
+        if found is None:
+            return None
+        block, position = found
+        return {'block_id': block.id, 'position': position, 'transaction': dict(block.transactions[position])}
+
+
+class NodeClient:
+    """
+    Minimal asyncio client for NodeServer. Calls on one client are sent one at a time.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self._ids = itertools.count(1)
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=STREAM_LIMIT)
+        return self
+
+    async def call(self, method, **params):
+        """
+        Sends one request and waits for its response.
+
+        Returns:
+            The 'result' field of the response.
+
+        Raises:
+            Exception: If the node returned an error.
+        """
+        async with self._lock:
+            request = {'id': next(self._ids), 'method': method, 'params': params}
+            self.writer.write(json.dumps(request).encode() + b"\n")
+            await self.writer.drain()
+            response = json.loads(await self.reader.readline())
+
+        if 'error' in response:
+            raise Exception(response['error'])
+        return response['result']
+
+    async def notify(self, method, **params):
+        """
+        Sends a notification: the node handles it but sends no response, so nothing is waited for.
+        """
+        self.writer.write(json.dumps({'method': method, 'params': params}).encode() + b"\n")
+        await self.writer.drain()
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local blockchain JSON-RPC node")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--difficulty', type=int, default=4)
+    parser.add_argument('--genesis', action='store_true', help="Mine a genesis block before serving")
+    parser.add_argument('--sync', action='append', default=[], metavar="HOST:PORT",
+                        help="Sync the chain from this node before serving (can be repeated)")
+    parser.add_argument('--log-level', default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    args = parser.parse_args()
+
+    configure_cli(args.log_level)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(args.difficulty)
+    if args.sync:
+        from sync import sync_chain, parse_peer
+        asyncio.run(sync_chain(blockchain, [parse_peer(peer) for peer in args.sync]))
+    elif args.genesis:
+        blockchain.new_block(mine=True)
+
+    try:
+        asyncio.run(NodeServer(blockchain, args.host, args.port).serve_forever())
+    except KeyboardInterrupt:
+        print("\n👋 Node stopped")
@@ -0,0 +1,189 @@
+"""
+Chain Reorganisation and Rollback Test Cases
+Demonstrates fork choice by cumulative work, restoring the chain when a heavier branch turns out to be invalid,
+the reorganisation depth limit, and the checks every block received from a peer must pass.
+Created by: Zyle Estacion (s4064846)
+RMIT University - INTE264 Assignment 2
+"""
+
+from blockchain import Blockchain
+from block import Block
+from mining import difficulty_to_target
+from transaction import Transaction
+from events import configure_cli, WARNING
+import hashlib
+import time
+
+def make_transaction(sender, receiver, amount, spent_transactions=()):
+    transaction_id = hashlib.sha256(f"{sender}{receiver}{amount}{time.time()}".encode()).hexdigest()
+    return Transaction(transaction_id, sender, receiver, amount, list(spent_transactions), time.time())
+
+def mine_on(blockchain, parent, transactions=(), target=None):
+    """
+    Mines a block on top of any parent, like a peer would. Blocks record the target of the difficulty so every
+    block carries the same work and the heavier branch is simply the longer one.
+    """
+    block = Block(parent.id + 1, time.time(), list(transactions), parent.current_hash, 0, "",
+                  target=target if target is not None else difficulty_to_target(blockchain.difficulty))
+    return blockchain.mine_block(block)
+
+def mine_branch(blockchain, parent, length):
+    branch = [parent]
+    for _ in range(length):
+        branch.append(mine_on(blockchain, branch[-1]))
+    return branch[1:]
+
+def test_reorganisation():
+    """
+    A heavier branch replaces the tip, and the transactions only the old branch confirmed go back to the mempool.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 1: Reorganisation Onto a Heavier Branch")
+    print("="*50)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    genesis = blockchain.new_block()
+
+    payment = make_transaction("genesis", "Alice", 50)
+    main = [mine_on(blockchain, genesis, [payment])]
+    main.append(mine_on(blockchain, main[-1]))
+    for block in main:
+        blockchain.receive_block(block)
+    print(f"Main chain: {len(blockchain.chain)} blocks, Alice holds {blockchain.get_balance('Alice')}")
+
+    branch = mine_branch(blockchain, genesis, 3)
+    for block in branch:
+        blockchain.receive_block(block)
+
+    switched = blockchain.last_block.current_hash == branch[-1].current_hash
+    returned = payment['transaction_id'] in blockchain.mempool
+    print(f"Switched to the 3-block branch: {'✅' if switched else '❌'}")
+    print(f"Alice's payment back in the mempool: {'✅' if returned else '❌'} (balance {blockchain.get_balance('Alice')})")
+    return switched and returned and blockchain.get_balance('Alice') == 0 and blockchain.verify_chain()
+
+def test_rollback():
+    """
+    A heavier branch with an invalid block is abandoned part way, and the original chain is put back.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 2: Rollback When a Heavier Branch Is Invalid")
+    print("="*50)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    genesis = blockchain.new_block()
+    funding = make_transaction("genesis", "Alice", 50)
+    main = [mine_on(blockchain, genesis, [funding])]
+    main += mine_branch(blockchain, main[-1], 2)
+    for block in main:
+        blockchain.receive_block(block)
+    tip = blockchain.last_block.current_hash
+
+    # The third block of the branch spends an output that does not exist on that branch
+    branch = mine_branch(blockchain, genesis, 2)
+    branch.append(mine_on(blockchain, branch[-1], [make_transaction("Alice", "Mallory", 50, [funding['transaction_id']])]))
+    branch.append(mine_on(blockchain, branch[-1]))
+    for block in branch:
+        blockchain.receive_block(block)
+
+    restored = blockchain.last_block.current_hash == tip
+    print(f"Original tip restored: {'✅' if restored else '❌'}")
+    print(f"Balances unchanged: Alice {blockchain.get_balance('Alice')}, Mallory {blockchain.get_balance('Mallory')}")
+    return (restored and blockchain.get_balance('Alice') == 50 and blockchain.get_balance('Mallory') == 0
+            and blockchain.verify_chain())
+
+def test_depth_limit():
+    """
+    A branch forking further back than the UTXO set can undo is refused, however heavy it is.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 3: Reorganisation Depth Limit")
+    print("="*50)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    blockchain.utxos.undo_depth = 2
+    genesis = blockchain.new_block()
+    for block in mine_branch(blockchain, genesis, 4):
+        blockchain.receive_block(block)
+    tip = blockchain.last_block.current_hash
+
+    for block in mine_branch(blockchain, genesis, 6):
+        blockchain.receive_block(block)
+
+    refused = blockchain.last_block.current_hash == tip
+    print(f"Branch forking 4 blocks back refused with a 2-block limit: {'✅' if refused else '❌'}")
+    return refused and blockchain.verify_chain()
+
+def test_orphans():
+    """
+    Blocks received newest first are held as orphans and connected once their ancestors arrive.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 4: Orphans Received Newest First")
+    print("="*50)
+
+    source = Blockchain()
+    source.modify_difficulty(1)
+    genesis = source.new_block()
+    blocks = mine_branch(source, genesis, 1200)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    blockchain.receive_block(genesis)
+    for block in reversed(blocks):
+        blockchain.receive_block(block)
+
+    connected = blockchain.last_block.current_hash == blocks[-1].current_hash
+    print(f"All {len(blocks)} blocks connected: {'✅' if connected else '❌'} ({len(blockchain.chain)} in chain)")
+    return connected and not blockchain.block_tree.orphans
+
+def test_rejected_blocks():
+    """
+    Blocks that skip the Proof-of-Work or repeat a transaction are rejected.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 5: Invalid Blocks From a Peer")
+    print("="*50)
+
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    genesis = blockchain.new_block()
+
+    easy = mine_on(blockchain, genesis, target=2**256 - 1)
+    easy_accepted = blockchain.receive_block(easy)
+    print(f"Block with its own easy target: {'❌ Accepted' if easy_accepted else '✅ Rejected'}")
+
+    payment = make_transaction("genesis", "Mallory", 100)
+    repeated = mine_on(blockchain, genesis, [payment, payment])
+    repeated_accepted = blockchain.receive_block(repeated)
+    print(f"Block listing a transaction twice: {'❌ Accepted' if repeated_accepted else '✅ Rejected'}")
+
+    return not easy_accepted and not repeated_accepted and blockchain.get_balance('Mallory') == 0
+
+if __name__ == "__main__":
+    configure_cli(WARNING)
+    print("🔀 BLOCKCHAIN REORGANISATION AND ROLLBACK TEST SUITE")
+    print("INTE264 Assignment 2 - Zyle Estacion (s4064846)")
+    print("=" * 60)
+
+    results = {
+        "Reorganisation onto a heavier branch": test_reorganisation(),
+        "Rollback from an invalid branch": test_rollback(),
+        "Reorganisation depth limit": test_depth_limit(),
+        "Orphans received newest first": test_orphans(),
+        "Invalid blocks from a peer": test_rejected_blocks(),
+    }
+
+    # Final summary
+    print("\n" + "="*60)
+    print("📊 FINAL TEST SUMMARY")
+    print("="*60)
+    for name, passed in results.items():
+        print(f"{name}: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if all(results.values()):
+        print("\n🎉 All tests passed! Forks are resolved by work and invalid branches are rolled back.")
+    else:
+        print("\n⚠️ Some tests failed. Review the fork choice and reorganisation implementation.")
@@ -0,0 +1,356 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Multi-node gossip simulation. Starts N node processes on localhost that mine competing blocks and relay
+transactions and blocks to their peers over the JSON-RPC protocol of node.py, with configurable latency and
+message loss. Measures how long blocks take to reach every node, how many mined blocks end up stale (off the
+final chain), and transaction throughput, for each network size.
+
+Usage: python simulation.py [--nodes 2 4 8] [--duration 10] [--difficulty 4] [--latency 0.05] [--loss 0.0]
+"""
+
+from blockchain import Blockchain
+from block import Block
+from mining import MiningHasher
+from node import NodeServer, NodeClient, DEFAULT_HOST
+from events import set_quiet
+import argparse
+import asyncio
+import hashlib
+import multiprocessing
+import random
+import time
+
+# Nonces checked between chances for the node to handle messages (and notice a new tip)
+MINING_CHUNK_SIZE = 2000
+
+
+class GossipNode(NodeServer):
+    """
+    A NodeServer that relays new transactions and blocks to its peers and mines on its own tip.
+
+    Attributes:
+        peers (list): (host, port) of the nodes to relay to.
+        latency (float): Mean one-way delay added to every relayed message, in seconds (+/- 50% jitter).
+        loss (float): Probability that a relayed message is dropped.
+        first_seen (dict): block hash -> time this node first saw (or mined) the block.
+        mined (list): (block hash, time) of the blocks this node mined.
+    """
+    def __init__(self, blockchain, host=DEFAULT_HOST, port=0, latency=0.0, loss=0.0, seed=None):
+        super().__init__(blockchain, host, port)
+        self.peers = []
+        self.latency = latency
+        self.loss = loss
+        self.random = random.Random(seed)
+        self.first_seen = {}
+        self.mined = []
+        self.mining = False
+        self.relayed = 0
+        self.dropped = 0
+        self.orphans = set()
+        self._clients = {}
+        self._tasks = set()
+        self.methods.update({
+            'set_peers': self.rpc_set_peers,
+            'relay_transaction': self.rpc_relay_transaction,
+            'relay_block': self.rpc_relay_block,
+            'start_mining': self.rpc_start_mining,
+            'stop_mining': self.rpc_stop_mining,
+            'sync': self.rpc_sync,
+            'get_stats': self.rpc_get_stats,
+        })
+
+    def spawn(self, coroutine):
+        # Keep a reference so pending tasks are not garbage collected
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def client(self, peer):
+        if peer not in self._clients:
+            self._clients[peer] = await NodeClient(*peer).connect()
+        return self._clients[peer]
+
+    def gossip(self, method, **params):
+        """
+        Sends a message to every peer after the simulated latency, unless the simulated loss drops it.
+        """
+        for peer in self.peers:
+            if self.random.random() < self.loss:
+                self.dropped += 1
+                continue
+            self.relayed += 1
+            self.spawn(self.send(peer, method, params, notify=True))
+
+    async def send(self, peer, method, params, notify=False):
+        """
+        Delivers a message to a peer after the simulated latency. Relayed messages are notifications, so a slow
+        peer does not hold up the messages queued behind them.
+        """
+        await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+        try:
+            client = await self.client(peer)
+            if notify:
+                return await client.notify(method, **params)
+            return await client.call(method, **params)
+        except Exception:
+            # Peers shutting down or rejecting the message do not stop the simulation
+            return None
+
+    async def rpc_set_peers(self, peers):
+        self.peers = [tuple(peer) for peer in peers]
+        return True
+
+    async def rpc_relay_transaction(self, transaction):
+        result = self.blockchain.new_transactions([transaction])[0]
+        if result['accepted']:
+            self.gossip('relay_transaction', transaction=transaction)
+        return result['accepted']
+
+    async def rpc_relay_block(self, block):
+        """
+        Accepts a block from a peer and relays it on if it was new. If its parent is unknown (the parent's message
+        was lost or is still on its way) the parent is requested from the peers.
+        """
+        received = Block.from_dict(block)
+        self.first_seen.setdefault(received.current_hash, time.time())
+        if self.blockchain.receive_block(received):
+            self.gossip('relay_block', block=block)
+            return True
+        if received.previous_hash is not None and received.previous_hash not in self.blockchain.block_tree:
+            self.orphans.add(received.current_hash)
+            self.spawn(self.fetch_block(received.previous_hash))
+        return False
+
+    async def fetch_block(self, block_hash):
+        for peer in self.random.sample(self.peers, len(self.peers)):
+            block = await self.send(peer, 'get_block_by_hash', {'block_hash': block_hash})
+            if block is not None:
+                await self.rpc_relay_block(block)
+                return
+
+    async def rpc_sync(self):
+        """
+        Asks every peer for its tip and fetches any tip this node has not seen (with its missing ancestors), so
+        nodes that lost messages can catch up once mining stops.
+        """
+        for peer in self.peers:
+            info = await self.send(peer, 'get_info', {})
+            tip = info and info['last_block_hash']
+            if tip and tip not in self.blockchain.block_tree:
+                await self.fetch_block(tip)
+        return self.blockchain.last_block.current_hash
+
+    async def rpc_start_mining(self):
+        if not self.mining:
+            self.mining = True
+            self.spawn(self.mine_forever())
+        return True
+
+    async def rpc_stop_mining(self):
+        self.mining = False
+        return True
+
+    async def mine_forever(self):
+        """
+        Mines on the current tip in small chunks, giving up on a block as soon as a peer's block changes the tip.
+        """
+        blockchain = self.blockchain
+        while self.mining:
+            tip_hash = blockchain.last_block.current_hash
+            block = blockchain.prepare_block(previous_hash=tip_hash)
+            target = block.target if block.target is not None else "0" * blockchain.difficulty
+            hasher = MiningHasher.for_block(block)
+            started = time.time()
+            nonce = 0
+            found = None
+
+            while self.mining and blockchain.last_block.current_hash == tip_hash:
+                found = hasher.search(target, nonce, MINING_CHUNK_SIZE)
+                if found is not None:
+                    break
+                nonce += MINING_CHUNK_SIZE
+                await asyncio.sleep(0)
+
+            if found is None:
+                blockchain.return_to_mempool(block)
+                continue
+
+            block.nonce, block.current_hash = found
+            blockchain.record_mining(found[0] + 1, time.time() - started)
+            blockchain.commit_block(block)
+            self.first_seen[block.current_hash] = self.mined_at = time.time()
+            self.mined.append((block.current_hash, self.mined_at))
+            self.gossip('relay_block', block=block.to_dict())
+
+    async def rpc_get_stats(self):
+        return {
+            'first_seen': self.first_seen,
+            'mined': self.mined,
+            'chain': [block.current_hash for block in self.blockchain.chain],
+            'transactions': sum(len(block.transactions) for block in self.blockchain.chain),
+            'relayed': self.relayed,
+            'dropped': self.dropped,
+            'orphans': len(self.orphans),
+            'received': len(self.first_seen) - len(self.mined),
+        }
+
+
+def run_node(index, genesis, difficulty, latency, loss, seed, ports):
+    """
+    Process entry point: serves one GossipNode and reports its port back to the harness.
+    """
+    set_quiet()
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(difficulty)
+    blockchain.receive_block(Block.from_dict(genesis))
+
+    async def serve():
+        node = GossipNode(blockchain, latency=latency, loss=loss, seed=seed + index)
+        await node.start()
+        ports.put((index, node.port))
+        async with node.server:
+            await node.server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)] if ordered else 0
+
+
+def summarize(stats, duration):
+    """
+    Combines the per-node statistics into propagation, stale rate and throughput figures.
+    """
+    final_chain = stats[0]['chain']
+    on_chain = set(final_chain)
+    mined = [(block_hash, mined_at) for node in stats for block_hash, mined_at in node['mined']]
+
+    # Time from mining until the block had reached every node
+    propagation = []
+    for block_hash, mined_at in mined:
+        seen = [node['first_seen'].get(block_hash) for node in stats]
+        if all(time_seen is not None for time_seen in seen):
+            propagation.append(max(seen) - mined_at)
+
+    stale = sum(block_hash not in on_chain for block_hash, _ in mined)
+    return {
+        'blocks_mined': len(mined),
+        'stale_rate': stale / len(mined) if mined else 0,
+        'propagation_p50': percentile(propagation, 0.5),
+        'propagation_p90': percentile(propagation, 0.9),
+        'fully_propagated': len(propagation) / len(mined) if mined else 0,
+        'orphan_rate': sum(node['orphans'] for node in stats) / max(sum(node['received'] for node in stats), 1),
+        'transactions_per_second': stats[0]['transactions'] / duration,
+        'blocks_per_minute': (len(final_chain) - 1) * 60 / duration,
+        'converged': all(node['chain'][-1] == final_chain[-1] for node in stats),
+        'dropped': sum(node['dropped'] for node in stats),
+        'relayed': sum(node['relayed'] for node in stats),
+    }
+
+
+async def drive(ports, duration, tx_rate, settle, seed):
+    """
+    Connects to every node, wires them into a full mesh, then mines and submits transactions for the duration.
+    """
+    clients = [await NodeClient(port=port).connect() for port in ports]
+    for i, client in enumerate(clients):
+        await client.call('set_peers', peers=[[DEFAULT_HOST, port] for j, port in enumerate(ports) if j != i])
+    for client in clients:
+        await client.call('start_mining')
+
+    # Submit transactions to random nodes at a steady rate
+    rng = random.Random(seed)
+    start = time.time()
+    sent = 0
+    while time.time() - start < duration:
+        now = time.time()
+        transaction = {
+            'transaction_id': hashlib.sha256(f"sim{seed}-{sent}".encode()).hexdigest(),
+            'sender': f"user{rng.randrange(100)}",
+            'receiver': f"user{rng.randrange(100)}",
+            'amount': rng.randint(1, 100),
+            'transaction_time': now,
+        }
+        await rng.choice(clients).call('relay_transaction', transaction=transaction)
+        sent += 1
+        await asyncio.sleep(max(0, start + sent / tx_rate - time.time()))
+
+    for client in clients:
+        await client.call('stop_mining')
+    # Let in-flight blocks arrive, then let nodes that lost messages catch up, before reading the results
+    await asyncio.sleep(settle)
+    for client in clients:
+        await client.call('sync')
+    await asyncio.sleep(settle)
+    stats = [await client.call('get_stats') for client in clients]
+    for client in clients:
+        await client.close()
+    return stats
+
+
+def run_simulation(nodes=4, duration=10, difficulty=4, latency=0.05, loss=0.0, tx_rate=50, seed=0):
+    """
+    Runs one simulation.
+
+    Args:
+        nodes (int): Number of node processes.
+        duration (float): Seconds to mine and submit transactions for.
+        difficulty (int): Mining difficulty of every node.
+        latency (float): Mean one-way message delay in seconds.
+        loss (float): Probability that a relayed message is dropped.
+        tx_rate (float): Transactions submitted per second (spread over random nodes).
+        seed (int): Seed for the simulated latency, loss and transactions.
+
+    Returns:
+        dict: Summary (see summarize).
+    """
+    genesis_chain = Blockchain()
+    genesis_chain.modify_difficulty(difficulty)
+    set_quiet()
+    genesis = genesis_chain.new_block(mine=True).to_dict()
+    set_quiet(False)
+
+    ports = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=run_node, args=(i, genesis, difficulty, latency, loss, seed, ports), daemon=True)
+        for i in range(nodes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        by_index = dict(ports.get(timeout=30) for _ in processes)
+        stats = asyncio.run(drive([by_index[i] for i in range(nodes)], duration, tx_rate, 1 + 10 * latency, seed))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.join()
+    return summarize(stats, duration)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate a network of gossiping blockchain nodes")
+    parser.add_argument('--nodes', type=int, nargs='+', default=[2, 4, 8], help="Network sizes to simulate")
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--difficulty', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.05, help="Mean one-way message delay in seconds")
+    parser.add_argument('--loss', type=float, default=0.0, help="Probability a relayed message is dropped")
+    parser.add_argument('--tx-rate', type=float, default=50, help="Transactions submitted per second")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"\n🌐 GOSSIP SIMULATION (latency {args.latency * 1000:.0f} ms, loss {args.loss:.0%}, "
+          f"difficulty {args.difficulty}, {args.duration:.0f}s per run)")
+    print("=" * 96)
+    print(f"{'Nodes':>5} | {'Blocks':>6} | {'Stale':>6} | {'Prop. p50':>9} | {'Prop. p90':>9} | "
+          f"{'Reached all':>11} | {'Orphans':>7} | {'Tx/s':>6} | Converged")
+    for count in args.nodes:
+        result = run_simulation(count, args.duration, args.difficulty, args.latency, args.loss, args.tx_rate, args.seed)
+        print(f"{count:>5} | {result['blocks_mined']:>6} | {result['stale_rate']:>6.1%} | "
+              f"{result['propagation_p50'] * 1000:>7.0f}ms | {result['propagation_p90'] * 1000:>7.0f}ms | "
+              f"{result['fully_propagated']:>11.0%} | {result['orphan_rate']:>7.1%} | "
+              f"{result['transactions_per_second']:>6.1f} | {'✅' if result['converged'] else '❌'}")
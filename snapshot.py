@@ -0,0 +1,101 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Snapshots of the state derived from a chain (transaction and spent-input indexes, UTXO set, chain index, block tree,
+mempool and difficulty), written beside a block log or SQLite store every few blocks. On restart the snapshot is
+restored and only the blocks after it are replayed and verified, so startup time depends on the distance since the
+last snapshot instead of the length of the chain.
+
+File layout:
+    header  : MAGIC (6 bytes) + format version (2 bytes) + height (8 bytes) + tip hash (32 bytes)
+              + payload length (4 bytes) + CRC32 of payload (4 bytes)
+    payload : zlib-compressed pickle of the state dict
+
+The height and tip hash can be checked against the chain before the payload is read. Snapshots are written to a
+temporary file and swapped in atomically, so a crash leaves the previous snapshot in place.
+"""
+
+import os
+import pickle
+import struct
+import zlib
+
+MAGIC = b"BLKSNP"
+VERSION = 6
+HEADER = struct.Struct(">6sHQ32sII")
+
+# File suffix added to the block log / store path
+SNAPSHOT_SUFFIX = ".snapshot"
+# zlib level for the payload; the state is mostly hex strings, which compress well even at a fast level
+COMPRESSION_LEVEL = 1
+
+
+def snapshot_path(chain_path):
+    """
+    Returns the snapshot file that belongs to a block log or SQLite store.
+    """
+    return chain_path + SNAPSHOT_SUFFIX
+
+
+def write_snapshot(path, height, tip_hash, state):
+    """
+    Writes a snapshot atomically.
+
+    Args:
+        path (str): Snapshot file.
+        height (int): Number of blocks the state covers.
+        tip_hash (str): Hash of the last covered block (None for an empty chain).
+        state (dict): The derived state.
+
+    Returns:
+        int: Size of the file in bytes.
+    """
+    payload = zlib.compress(pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+    tip = bytes.fromhex(tip_hash) if tip_hash else bytes(32)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, height, tip, len(payload), zlib.crc32(payload)))
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    return HEADER.size + len(payload)
+
+
+def read_snapshot(path, chain):
+    """
+    Reads a snapshot if it matches the chain: it must not be ahead of the chain, and the block at its height must
+    have the recorded hash.
+
+    Args:
+        path (str): Snapshot file.
+        chain (list): The loaded chain.
+
+    Returns:
+        tuple: (height, state dict), or None if there is no usable snapshot.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER.size)
+        if len(raw) < HEADER.size:
+            return None
+        magic, version, height, tip, length, crc = HEADER.unpack(raw)
+        if magic != MAGIC or version != VERSION or height > len(chain):
+            return None
+        if height and chain[height - 1].current_hash != tip.hex():
+            return None
+        payload = f.read(length)
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+    return height, pickle.loads(zlib.decompress(payload))
+
+
+def remove_snapshot(path):
+    """
+    Deletes a snapshot that no longer describes the chain (e.g. after a block was edited).
+    """
+    if os.path.exists(path):
+        os.remove(path)
@@ -0,0 +1,195 @@
+"""
+Snapshot and Pruning Test Cases
+Demonstrates that restoring a snapshot (and replaying the blocks after it) gives the same state as rebuilding from
+the full chain, and that a pruned chain keeps the same balances and lookups for everything it still holds.
+Created by: Zyle Estacion (s4064846)
+RMIT University - INTE264 Assignment 2
+"""
+
+from blockchain import Blockchain, MEMPOOL
+from block import Block
+from benchmark import build_spending_chain
+from merkle import merkle_root
+from events import configure_cli, WARNING
+import os
+
+SAVE_NAME = "snapshot_check"
+
+def header_hashed_chain(length):
+    """
+    Builds a chain where every transaction spends an earlier one, with Merkle roots so its blocks can be pruned.
+    """
+    chain = build_spending_chain(length)
+    previous_hash = None
+    for block in chain:
+        block.merkle_root = merkle_root(block.transactions)
+        block.previous_hash = previous_hash
+        block.current_hash = Blockchain.hash(block)
+        previous_hash = block.current_hash
+    return chain
+
+def fresh_copy(block):
+    return Block(**block.__getstate__())
+
+def derived_state(blockchain):
+    """
+    Everything rebuilt from the chain, in a form that can be compared.
+    """
+    addresses = sorted(address for address, balance in blockchain.utxos.balances.items() if balance)
+    return {
+        'outputs': dict(blockchain.utxos.outputs),
+        'balances': {address: blockchain.get_balance(address) for address in addresses},
+        'tx_index': {tx_id: location for tx_id, location in blockchain.tx_index.items() if location != MEMPOOL},
+        'spent_index': {spent: holder for spent, holder in blockchain.spent_index.items()
+                        if blockchain.tx_index.get(holder) != MEMPOOL},
+        'history': {address: blockchain.get_address_history(address) for address in addresses},
+        'tip': blockchain.last_block.current_hash,
+    }
+
+def load(filename, pruning=None):
+    blockchain = Blockchain()
+    blockchain.modify_pruning(pruning)
+    loaded = blockchain.load_blockchain(filename)
+    return loaded, blockchain
+
+def remove_saves():
+    for name in os.listdir("saves"):
+        if name.startswith(SAVE_NAME):
+            os.remove(os.path.join("saves", name))
+
+def test_snapshot_restore(extension):
+    """
+    A load that restores the snapshot and replays the tail matches a load that rebuilds everything.
+    """
+    print("\n" + "="*50)
+    print(f"TEST CASE: Snapshot Restore ({extension})")
+    print("="*50)
+
+    filename = SAVE_NAME + extension
+    chain = header_hashed_chain(230)
+    blockchain = Blockchain()
+    blockchain.modify_snapshots(100)
+    for block in chain[:10]:
+        blockchain.commit_block(fresh_copy(block))
+    blockchain.save_blockchain(filename)
+    # Blocks are appended as they are added; snapshots are written at heights 100 and 200
+    for block in chain[10:]:
+        blockchain.commit_block(fresh_copy(block))
+    blockchain.save_blockchain(filename)
+    blockchain.block_log.close()
+
+    restored_ok, restored = load(filename)
+    restored.block_log.close()
+    os.remove(os.path.join("saves", filename + ".snapshot"))
+    rebuilt_ok, rebuilt = load(filename)
+    rebuilt.block_log.close()
+
+    same = derived_state(restored) == derived_state(rebuilt) == derived_state(blockchain)
+    print(f"Snapshot load ({restored.verified_height} blocks verified) and full rebuild both succeed: "
+          f"{'✅' if restored_ok and rebuilt_ok else '❌'}")
+    print(f"Restored state matches the full rebuild: {'✅' if same else '❌'}")
+    remove_saves()
+    return restored_ok and rebuilt_ok and same
+
+def test_pruning_equivalence():
+    """
+    A pruned chain has the same balances, unspent outputs and tip as the full chain, and its recent transactions and
+    address histories match the full chain's for every block that was not pruned.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE: Pruning Equivalence")
+    print("="*50)
+
+    chain = header_hashed_chain(300)
+    full = Blockchain()
+    pruned = Blockchain()
+    pruned.modify_pruning(20)
+    for block in chain:
+        full.commit_block(fresh_copy(block))
+        pruned.commit_block(fresh_copy(block))
+
+    pruned_count = sum(block.pruned for block in pruned.chain)
+    kept = {position for position, block in enumerate(pruned.chain) if not block.pruned}
+    full_state, pruned_state = derived_state(full), derived_state(pruned)
+
+    same_utxos = (full_state['outputs'] == pruned_state['outputs'] and full_state['balances'] == pruned_state['balances']
+                  and full_state['tip'] == pruned_state['tip'])
+    same_recent = pruned_state['tx_index'] == {tx_id: block_id for tx_id, block_id in full_state['tx_index'].items()
+                                               if block_id - 1 in kept}
+    same_history = all(
+        pruned_state['history'][address] == [(block_id, tx_id) for block_id, tx_id in history if block_id - 1 in kept]
+        for address, history in full_state['history'].items()
+    )
+    valid = pruned.verify_chain() and pruned.audit_chain(workers=1)['valid']
+
+    print(f"{pruned_count} of {len(chain)} blocks pruned")
+    print(f"Same balances, unspent outputs and tip: {'✅' if same_utxos else '❌'}")
+    print(f"Same transaction index for the blocks kept: {'✅' if same_recent else '❌'}")
+    print(f"Same address histories for the blocks kept: {'✅' if same_history else '❌'}")
+    print(f"Pruned chain verifies: {'✅' if valid else '❌'}")
+    return pruned_count > 0 and same_utxos and same_recent and same_history and valid
+
+def test_pruned_reload(extension, interval):
+    """
+    A pruned chain saved and loaded again matches the chain it was saved from, with or without regular snapshots.
+    Blocks only lose their transactions on disk once a snapshot covers them, since the blocks after the snapshot
+    are replayed on load.
+    """
+    print("\n" + "="*50)
+    snapshots = f"snapshot every {interval} blocks" if interval is not None else "no snapshots"
+    print(f"TEST CASE: Pruned Chain Reload ({extension}, {snapshots})")
+    print("="*50)
+
+    filename = SAVE_NAME + extension
+    chain = header_hashed_chain(300)
+    blockchain = Blockchain()
+    blockchain.modify_pruning(20)
+    blockchain.modify_snapshots(interval)
+    for block in chain[:10]:
+        blockchain.commit_block(fresh_copy(block))
+    blockchain.save_blockchain(filename)
+    for block in chain[10:]:
+        blockchain.commit_block(fresh_copy(block))
+    blockchain.save_blockchain(filename)
+    blockchain.block_log.close()
+
+    loaded_ok, loaded = load(filename, pruning=20)
+    pruned_on_disk = sum(block.pruned for block in loaded.block_log.read_blocks())
+    loaded.block_log.close()
+    same = derived_state(loaded)['outputs'] == derived_state(blockchain)['outputs'] and \
+        derived_state(loaded)['balances'] == derived_state(blockchain)['balances']
+    print(f"Loaded: {'✅' if loaded_ok else '❌'}, same balances and unspent outputs: {'✅' if same else '❌'}")
+    print(f"{pruned_on_disk} blocks pruned on disk")
+    remove_saves()
+    return loaded_ok and same
+
+if __name__ == "__main__":
+    configure_cli(WARNING)
+    print("📸 SNAPSHOT AND PRUNING TEST SUITE")
+    print("INTE264 Assignment 2 - Zyle Estacion (s4064846)")
+    print("=" * 60)
+
+    try:
+        results = {
+            "Snapshot restore (block log)": test_snapshot_restore(".blocklog"),
+            "Snapshot restore (SQLite)": test_snapshot_restore(".sqlite"),
+            "Pruning equivalence": test_pruning_equivalence(),
+            "Pruned chain reload (block log)": test_pruned_reload(".blocklog", 100),
+            "Pruned chain reload (SQLite)": test_pruned_reload(".sqlite", 100),
+            "Pruned chain reload without snapshots (block log)": test_pruned_reload(".blocklog", None),
+            "Pruned chain reload without snapshots (SQLite)": test_pruned_reload(".sqlite", None),
+        }
+    finally:
+        remove_saves()
+
+    # Final summary
+    print("\n" + "="*60)
+    print("📊 FINAL TEST SUMMARY")
+    print("="*60)
+    for name, passed in results.items():
+        print(f"{name}: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if all(results.values()):
+        print("\n🎉 All tests passed! Snapshots and pruning keep the same state as a full rebuild.")
+    else:
+        print("\n⚠️ Some tests failed. Review the snapshot and pruning implementation.")
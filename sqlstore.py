@@ -0,0 +1,399 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+SQLite chain store. Blocks are kept as canonical binary encodings (codec) alongside indexed columns, so history
+can be queried without loading the chain:
+
+    blocks       : position, id, hash, previous_hash, timestamp, tx_count, data  (indexed by hash and timestamp)
+    transactions : tx_id, position, tx_position, sender, receiver, amount, fee  (indexed by tx_id, sender, receiver)
+    spent_inputs : spent_tx, tx_id, position  (indexed by spent_tx)
+    meta         : the latest mempool/difficulty record
+
+The database runs in WAL mode, so readers (e.g. an SQLiteChain) never block the writer, and rows are inserted
+with executemany inside one transaction per commit.
+
+SQLiteStore has the same interface as storage.BlockLog (so Blockchain persists new blocks to it the same way) and
+the lookup interface of indexes.ChainIndex (so it can stand in for the in-memory index). SQLiteChain is a lazy,
+LazyChain-style view of the stored blocks.
+"""
+
+from codec import encode_block, decode_block, encode_meta, decode_meta
+from collections import OrderedDict
+from collections.abc import Mapping
+import itertools
+import sqlite3
+
+# File extension that selects the SQLite store in save_blockchain / load_blockchain
+SQLITE_EXTENSION = ".sqlite"
+# Version of the schema below (stored in PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+# Number of decoded blocks an SQLiteChain keeps in memory
+DEFAULT_CACHE_SIZE = 256
+# Blocks whose rows are built and inserted per executemany batch
+INSERT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blocks (
+    position INTEGER PRIMARY KEY,
+    id INTEGER,
+    hash TEXT,
+    previous_hash TEXT,
+    timestamp REAL,
+    tx_count INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blocks_hash ON blocks (hash);
+CREATE INDEX IF NOT EXISTS blocks_timestamp ON blocks (timestamp);
+
+CREATE TABLE IF NOT EXISTS transactions (
+    tx_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    tx_position INTEGER NOT NULL,
+    sender TEXT,
+    receiver TEXT,
+    amount,
+    fee,
+    PRIMARY KEY (position, tx_position)
+);
+CREATE INDEX IF NOT EXISTS transactions_tx_id ON transactions (tx_id);
+CREATE INDEX IF NOT EXISTS transactions_sender ON transactions (sender);
+CREATE INDEX IF NOT EXISTS transactions_receiver ON transactions (receiver);
+
+CREATE TABLE IF NOT EXISTS spent_inputs (
+    spent_tx TEXT NOT NULL,
+    tx_id TEXT NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spent_inputs_spent_tx ON spent_inputs (spent_tx);
+CREATE INDEX IF NOT EXISTS spent_inputs_position ON spent_inputs (position);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    block_count INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+"""
+
+
+def _column(value):
+    # SQLite stores 64-bit integers, floats and text; anything else (from edited blocks) is stored as its repr
+    if value is None or isinstance(value, (str, float)):
+        return value
+    if isinstance(value, int) and -2 ** 63 <= value < 2 ** 63:
+        return value
+    return repr(value)
+
+
+def _block_rows(block, position):
+    """
+    Builds the rows a block adds to each table.
+
+    Returns:
+        tuple: (block row, transaction rows, spent input rows)
+    """
+    timestamp = block.timestamp if isinstance(block.timestamp, (int, float)) else None
+    block_row = (position, _column(block.id), _column(block.current_hash), _column(block.previous_hash), timestamp,
+                 len(block.transactions), encode_block(block))
+    transaction_rows = []
+    input_rows = []
+    for tx_position, tx in enumerate(block.transactions):
+        if isinstance(tx, Mapping) and 'transaction_id' in tx:
+            tx_id = _column(tx['transaction_id'])
+            transaction_rows.append((tx_id, position, tx_position, _column(tx.get('sender')),
+                                     _column(tx.get('receiver')), _column(tx.get('amount')), _column(tx.get('fee', 0))))
+            input_rows.extend((_column(spent_tx), tx_id, position) for spent_tx in tx.get('spent_transactions', []))
+    return block_row, transaction_rows, input_rows
+
+
+def connect(path):
+    """
+    Opens a connection in WAL mode, creating the schema if needed.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    # WAL keeps the database consistent after a crash; NORMAL only syncs at checkpoints
+    connection.execute("PRAGMA synchronous=NORMAL")
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        connection.close()
+        raise ValueError(f"Unsupported chain store schema version {version}")
+    connection.executescript(SCHEMA)
+    connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return connection
+
+
+class SQLiteStore:
+    """
+    A chain stored in an SQLite database.
+
+    Args:
+        path (str): Location of the database file. Created if it does not exist.
+
+    Attributes:
+        path (str): Location of the database file.
+        block_count (int): Number of blocks stored.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._connection = connect(path)
+        self.block_count = self._connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+
+    def _insert(self, blocks, start):
+        """
+        Inserts blocks from a position onwards with one executemany per table for every INSERT_BATCH_SIZE blocks.
+        """
+        cursor = self._connection.cursor()
+        blocks = iter(blocks)
+        position = start
+        while True:
+            batch = list(itertools.islice(blocks, INSERT_BATCH_SIZE))
+            if not batch:
+                break
+            block_rows, transaction_rows, input_rows = [], [], []
+            for block in batch:
+                block_row, transactions, inputs = _block_rows(block, position)
+                block_rows.append(block_row)
+                transaction_rows.extend(transactions)
+                input_rows.extend(inputs)
+                position += 1
+            cursor.executemany("INSERT INTO blocks VALUES (?, ?, ?, ?, ?, ?, ?)", block_rows)
+            cursor.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", transaction_rows)
+            cursor.executemany("INSERT INTO spent_inputs VALUES (?, ?, ?)", input_rows)
+        self.block_count = position
+
+    def append_block(self, block):
+        """
+        Adds a block inside the open transaction. Call commit() to make it durable.
+        """
+        self._insert([block], self.block_count)
+
+    def append_blocks(self, blocks):
+        """
+        Bulk-adds blocks inside the open transaction. Call commit() to make them durable.
+        """
+        self._insert(blocks, self.block_count)
+
+    def write_meta(self, mempool, difficulty, retarget=None):
+        """
+        Replaces the metadata record holding the state that is not part of any block.
+        """
+        data = encode_meta({'mempool': list(mempool), 'difficulty': difficulty, 'retarget': retarget})
+        self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('state', ?, ?)", (self.block_count, data))
+
+    def truncate(self, block_count):
+        """
+        Deletes every block after the first block_count, e.g. when a chain reorganisation disconnects blocks.
+        """
+        for table in ("blocks", "transactions", "spent_inputs"):
+            self._connection.execute(f"DELETE FROM {table} WHERE position >= ?", (block_count,))
+        self.block_count = min(self.block_count, block_count)
+        self.commit()
+
+    def replace_block(self, position, block):
+        """
+        Overwrites a stored block inside the open transaction, e.g. with its pruned copy. The block's transaction and
+        spent input rows are replaced too.
+        """
+        block_row, transaction_rows, input_rows = _block_rows(block, position)
+        cursor = self._connection.cursor()
+        cursor.execute("UPDATE blocks SET tx_count = ?, data = ? WHERE position = ?", (block_row[5], block_row[6], position))
+        for table in ("transactions", "spent_inputs"):
+            cursor.execute(f"DELETE FROM {table} WHERE position = ?", (position,))
+        cursor.executemany("INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?, ?)", transaction_rows)
+        cursor.executemany("INSERT INTO spent_inputs VALUES (?, ?, ?)", input_rows)
+
+    def commit(self):
+        self._connection.commit()
+
+    def rewrite(self, chain, mempool, difficulty, retarget=None):
+        """
+        Replaces the stored chain with a fresh copy in a single transaction, e.g. after an existing block was edited.
+        """
+        for table in ("blocks", "transactions", "spent_inputs"):
+            self._connection.execute(f"DELETE FROM {table}")
+        self.block_count = 0
+        self._insert(chain, 0)
+        self.write_meta(mempool, difficulty, retarget)
+        self.commit()
+
+    def read_block(self, position):
+        row = self._connection.execute("SELECT data FROM blocks WHERE position = ?", (position,)).fetchone()
+        return decode_block(row[0]) if row is not None else None
+
+    def read_blocks(self):
+        """
+        Reads every block in the store.
+
+        Returns:
+            list: The blocks in order.
+        """
+        return [decode_block(data) for data, in self._connection.execute("SELECT data FROM blocks ORDER BY position")]
+
+    def read_meta(self):
+        """
+        Returns:
+            tuple: (metadata dict or an empty dict, number of blocks stored when it was written)
+        """
+        row = self._connection.execute("SELECT block_count, data FROM meta WHERE key = 'state'").fetchone()
+        if row is None:
+            return {}, 0
+        return decode_meta(row[1]), row[0]
+
+    # Lookups with the same interface as indexes.ChainIndex. Blocks are indexed as they are stored, so adding
+    # and removing blocks through the index interface has nothing left to do.
+
+    def add_block(self, block, position):
+        pass
+
+    def remove_block(self, block, position):
+        pass
+
+    def remove_transactions(self, block, position):
+        pass
+
+    def block_position(self, block_hash):
+        """
+        Returns:
+            int: Position of the block with this hash, or None.
+        """
+        row = self._connection.execute(
+            "SELECT position FROM blocks WHERE hash = ? ORDER BY position DESC LIMIT 1", (block_hash,)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def transaction_location(self, tx_id):
+        """
+        Returns:
+            tuple: (block position, position in block) of a mined transaction, or None.
+        """
+        row = self._connection.execute(
+            "SELECT position, tx_position FROM transactions WHERE tx_id = ? ORDER BY position DESC LIMIT 1", (tx_id,)
+        ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def address_postings(self, address):
+        """
+        Returns:
+            list: (block position, tx_id) of every transaction sent or received by the address, oldest first.
+        """
+        return self._connection.execute(
+            "SELECT position, tx_id FROM transactions WHERE sender = ? OR receiver = ? ORDER BY position, tx_position",
+            (address, address)
+        ).fetchall()
+
+    def positions_between(self, start=None, end=None):
+        """
+        Finds the blocks with start <= timestamp <= end using the timestamp index.
+
+        Returns:
+            list: Block positions in chain order.
+        """
+        rows = self._connection.execute(
+            "SELECT position FROM blocks WHERE timestamp >= COALESCE(?, timestamp) AND timestamp <= COALESCE(?, timestamp)"
+            " ORDER BY position",
+            (start, end)
+        )
+        return [position for position, in rows]
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteChain:
+    """
+    A read-mostly view of the blocks in an SQLite store, with its own connection. Blocks are decoded when accessed
+    and kept in a small LRU cache, so memory use does not grow with the length of the history.
+
+    Supports the list operations Blockchain uses, like storage.LazyChain: len(), indexing, slicing, iteration,
+    append() and pop(). Blocks added after opening are held in memory; replacing a block with chain[i] = block keeps
+    the edited copy pinned.
+
+    Attributes:
+        path (str): Location of the database file.
+    """
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._connection = connect(path)
+        self._stored = self._connection.execute("SELECT COUNT(*) FROM blocks").fetchone()[0]
+        self._tail = []
+        self._pinned = {}
+        self._cache = OrderedDict()
+
+    def _decode(self, index):
+        row = self._connection.execute("SELECT data FROM blocks WHERE position = ?", (index,)).fetchone()
+        return decode_block(row[0])
+
+    def __len__(self):
+        return self._stored + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chain index out of range")
+
+        if index >= self._stored:
+            return self._tail[index - self._stored]
+        if index in self._pinned:
+            return self._pinned[index]
+
+        block = self._cache.get(index)
+        if block is None:
+            block = self._decode(index)
+            self._cache[index] = block
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(index)
+        return block
+
+    def __setitem__(self, index, block):
+        if index < 0:
+            index += len(self)
+        if index >= self._stored:
+            self._tail[index - self._stored] = block
+        else:
+            self._pinned[index] = block
+            self._cache.pop(index, None)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, block):
+        self._tail.append(block)
+
+    def pop(self):
+        """
+        Removes and returns the last block, e.g. when a chain reorganisation disconnects it.
+        """
+        if self._tail:
+            return self._tail.pop()
+        if not self._stored:
+            raise IndexError("pop from an empty chain")
+        index = self._stored - 1
+        block = self[index]
+        self._stored -= 1
+        self._pinned.pop(index, None)
+        self._cache.pop(index, None)
+        return block
+
+    def transaction_count(self):
+        """
+        Returns the number of transactions in the chain, counting stored blocks in SQL.
+        """
+        stored = self._connection.execute(
+            "SELECT COALESCE(SUM(tx_count), 0) FROM blocks WHERE position < ?", (self._stored,)
+        ).fetchone()[0]
+        pinned_delta = sum(len(block.transactions) - len(self._decode(i).transactions) for i, block in self._pinned.items())
+        return stored + pinned_delta + sum(len(block.transactions) for block in self._tail)
+
+    def close(self):
+        self._connection.close()
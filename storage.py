@@ -0,0 +1,416 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Append-only block log. Instead of re-pickling the whole chain on every save, each block is written once as a
+length-prefixed record and fsynced, so saving a new block costs O(1).
+
+File layout:
+    header : MAGIC (6 bytes) + format version (2 bytes)
+    record : kind (1 byte) + payload length (4 bytes) + CRC32 of payload (4 bytes)
+             + item count (4 bytes, version 2+) + payload
+
+Record kinds are BLOCK_RECORD (one block) and META_RECORD (mempool and difficulty, the latest one wins).
+The item count is the number of transactions in a block, so totals can be reported without decoding payloads.
+Payloads are pickles up to version 2 and canonical binary encodings (codec) from version 3, which are smaller and
+cannot run code when read.
+A record cut short by a crash (its declared length runs past the end of the file) is ignored on open and cut off
+before the next record is appended. A record that fails its CRC check is corruption, not a torn write: the log
+refuses to open rather than drop the history after it.
+
+LazyChain memory-maps a log and decodes blocks only when they are accessed.
+"""
+
+from codec import encode_block, decode_block, encode_meta, decode_meta
+from array import array
+from collections import OrderedDict
+import mmap
+import os
+import pickle
+import struct
+import zlib
+
+MAGIC = b"BLKLOG"
+VERSION = 3
+HEADER = struct.Struct(">6sH")
+RECORD_HEADERS = {
+    1: struct.Struct(">cII"),
+    2: struct.Struct(">cIII"),
+    3: struct.Struct(">cIII"),
+}
+# First version whose payloads use the binary codec instead of pickle
+CODEC_VERSION = 3
+
+# Number of decoded blocks a LazyChain keeps in memory
+DEFAULT_CACHE_SIZE = 256
+
+BLOCK_RECORD = b"B"
+META_RECORD = b"M"
+
+# File extension that selects the block log format in save_blockchain / load_blockchain
+LOG_EXTENSION = ".blocklog"
+
+
+def read_header(f, path):
+    """
+    Reads and checks the file header.
+
+    Returns:
+        int: The format version of the log.
+    """
+    magic, version = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a block log")
+    if version not in RECORD_HEADERS:
+        raise ValueError(f"Unsupported block log version {version}")
+    return version
+
+
+def encode_payload(kind, obj, version):
+    if version < CODEC_VERSION:
+        return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+    return encode_block(obj) if kind == BLOCK_RECORD else encode_meta(obj)
+
+
+def decode_payload(kind, payload, version):
+    """
+    Decodes a record payload written in the given format version.
+    """
+    if version < CODEC_VERSION:
+        return pickle.loads(payload)
+    return decode_block(payload) if kind == BLOCK_RECORD else decode_meta(payload)
+
+
+class BlockLog:
+    """
+    An append-only, length-prefixed log of blocks stored in a single file.
+
+    Args:
+        path (str): Location of the log file. Created if it does not exist.
+        verify (bool): Check the CRC of every record on open. When False only record lengths are checked,
+            which avoids reading the payloads.
+
+    Raises:
+        ValueError: If a record fails its CRC check.
+
+    Attributes:
+        path (str): Location of the log file.
+        version (int): Format version of the file. Records are appended in the same version.
+        block_count (int): Number of block records in the log.
+    """
+    def __init__(self, path, verify=True):
+        self.path = path
+        self.block_count = 0
+
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, 'wb') as f:
+                f.write(HEADER.pack(MAGIC, VERSION))
+                f.flush()
+                os.fsync(f.fileno())
+
+        with open(path, 'rb') as f:
+            self.version = read_header(f, path)
+
+        # Count the blocks and find where the last complete record ends
+        end = HEADER.size
+        for kind, offset, length, _ in self._scan(verify):
+            if kind == BLOCK_RECORD:
+                self.block_count += 1
+            end = offset + length
+
+        # A partially written record left behind by a crash is cut off before the next append, not on open
+        self._torn_tail = os.path.getsize(path) > end
+        self._file = open(path, 'r+b')
+        self._file.seek(end)
+
+    def _scan(self, verify=True):
+        """
+        Walks the records in the file without decoding their payloads.
+
+        Args:
+            verify (bool): Read each payload and check its CRC. Otherwise the payloads are skipped over.
+
+        Yields:
+            tuple: (kind, payload offset, payload length, item count) for each complete record.
+
+        Raises:
+            ValueError: If a complete record fails its CRC check.
+        """
+        with open(self.path, 'rb') as f:
+            version = read_header(f, self.path)
+            record_header = RECORD_HEADERS[version]
+            size = os.fstat(f.fileno()).st_size
+
+            offset = HEADER.size
+            while True:
+                raw = f.read(record_header.size)
+                if len(raw) < record_header.size:
+                    return
+                kind, length, crc, *count = record_header.unpack(raw)
+                if offset + record_header.size + length > size:
+                    return
+                if verify:
+                    if zlib.crc32(f.read(length)) != crc:
+                        raise ValueError(f"{self.path}: record at byte {offset} fails its CRC check")
+                else:
+                    f.seek(length, os.SEEK_CUR)
+                yield kind, offset + record_header.size, length, count[0] if count else None
+                offset += record_header.size + length
+
+    def _write_record(self, kind, obj, count=0):
+        if self._torn_tail:
+            self._file.truncate(self._file.tell())
+            self._torn_tail = False
+        payload = encode_payload(kind, obj, self.version)
+        fields = (kind, len(payload), zlib.crc32(payload)) + ((count,) if self.version >= 2 else ())
+        self._file.write(RECORD_HEADERS[self.version].pack(*fields))
+        self._file.write(payload)
+
+    def append_block(self, block):
+        """
+        Appends a block record. Call commit() to make it durable.
+        """
+        self._write_record(BLOCK_RECORD, block, len(block.transactions))
+        self.block_count += 1
+
+    def append_blocks(self, blocks):
+        for block in blocks:
+            self.append_block(block)
+
+    def write_meta(self, mempool, difficulty, retarget=None):
+        """
+        Appends a metadata record holding the state that is not part of any block.
+        """
+        self._write_record(META_RECORD, {'mempool': list(mempool), 'difficulty': difficulty, 'retarget': retarget})
+
+    def truncate(self, block_count):
+        """
+        Drops every record after the first block_count blocks, e.g. when a chain reorganisation disconnects blocks.
+        Only the tail of the file is cut; nothing before it is rewritten.
+        """
+        self._file.flush()
+        end = HEADER.size
+        blocks = 0
+        for kind, offset, length, _ in self._scan(verify=False):
+            if kind == BLOCK_RECORD:
+                if blocks == block_count:
+                    break
+                blocks += 1
+            end = offset + length
+
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._torn_tail = False
+        self.block_count = blocks
+        self.commit()
+
+    def commit(self):
+        """
+        Flushes pending records and fsyncs them to disk.
+        """
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def read(self):
+        """
+        Streams the log back one record at a time.
+
+        Yields:
+            tuple: (kind, object) for each record.
+        """
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            for kind, offset, length, _ in self._scan():
+                f.seek(offset)
+                yield kind, decode_payload(kind, f.read(length), self.version)
+
+    def read_blocks(self):
+        """
+        Reads every block in the log.
+
+        Returns:
+            list: The blocks in order.
+        """
+        return [obj for kind, obj in self.read() if kind == BLOCK_RECORD]
+
+    def read_meta(self):
+        """
+        Decodes only the latest metadata record.
+
+        Returns:
+            tuple: (metadata dict or an empty dict, number of blocks written before that record)
+        """
+        latest = None
+        blocks_before = 0
+        block_count = 0
+        for kind, offset, length, _ in self._scan(verify=False):
+            if kind == BLOCK_RECORD:
+                block_count += 1
+            elif kind == META_RECORD:
+                latest = (offset, length)
+                blocks_before = block_count
+
+        if latest is None:
+            return {}, 0
+        offset, length = latest
+        self._file.flush()
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return decode_payload(META_RECORD, f.read(length), self.version), blocks_before
+
+    def rewrite(self, chain, mempool, difficulty, retarget=None):
+        """
+        Replaces the log with a fresh copy of the chain. Used when an existing block was modified, which an
+        append-only log cannot express. The new file is written beside the old one and swapped in atomically,
+        upgrading it to the current format version.
+        """
+        self._file.close()
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION))
+            self._file = f
+            self.version = VERSION
+            for block in chain:
+                self._write_record(BLOCK_RECORD, block, len(block.transactions))
+            self._write_record(META_RECORD, {'mempool': list(mempool), 'difficulty': difficulty, 'retarget': retarget})
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+        self.block_count = len(chain)
+        self._torn_tail = False
+        self._file = open(self.path, 'r+b')
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._file.close()
+
+
+class LazyChain:
+    """
+    A read-mostly view of the blocks in a block log. The file is memory-mapped and only the record headers are walked
+    on open, building an offset index per block. Blocks are decoded when accessed (chain[i], last_block) and kept
+    in a small LRU cache, so startup time and memory use do not grow with the decoded size of the history.
+
+    Supports the list operations Blockchain uses: len(), indexing, slicing, iteration and append(). Blocks added
+    after opening are held in memory; replacing a block with chain[i] = block keeps the edited copy pinned.
+
+    Attributes:
+        path (str): Location of the log file.
+    """
+    def __init__(self, path, cache_size=DEFAULT_CACHE_SIZE):
+        self.path = path
+        self.cache_size = cache_size
+        self._offsets = array('Q')
+        self._lengths = array('I')
+        self._tail = []
+        self._pinned = {}
+        self._cache = OrderedDict()
+
+        with open(path, 'rb') as f:
+            version = read_header(f, path)
+            size = os.fstat(f.fileno()).st_size
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+        # Hop from record header to record header without touching the payloads
+        record_header = RECORD_HEADERS[version]
+        self.version = version
+        self._transaction_total = 0
+        self._counts_known = version >= 2
+        offset = HEADER.size
+        while offset + record_header.size <= size:
+            kind, length, _, *count = record_header.unpack_from(self._mmap, offset)
+            start = offset + record_header.size
+            if start + length > size:
+                break
+            if kind == BLOCK_RECORD:
+                self._offsets.append(start)
+                self._lengths.append(length)
+                self._transaction_total += count[0] if count else 0
+            offset = start + length
+
+    def _decode(self, index):
+        start, length = self._offsets[index], self._lengths[index]
+        return decode_payload(BLOCK_RECORD, self._mmap[start:start + length], self.version)
+
+    def __len__(self):
+        return len(self._offsets) + len(self._tail)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("chain index out of range")
+
+        stored = len(self._offsets)
+        if index >= stored:
+            return self._tail[index - stored]
+        if index in self._pinned:
+            return self._pinned[index]
+
+        block = self._cache.get(index)
+        if block is None:
+            block = self._decode(index)
+            self._cache[index] = block
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(index)
+        return block
+
+    def __setitem__(self, index, block):
+        if index < 0:
+            index += len(self)
+        stored = len(self._offsets)
+        if index >= stored:
+            self._tail[index - stored] = block
+        else:
+            self._pinned[index] = block
+            self._cache.pop(index, None)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def append(self, block):
+        self._tail.append(block)
+        self._transaction_total += len(block.transactions)
+
+    def pop(self):
+        """
+        Removes and returns the last block, e.g. when a chain reorganisation disconnects it.
+        """
+        if self._tail:
+            block = self._tail.pop()
+            self._transaction_total -= len(block.transactions)
+            return block
+        if not self._offsets:
+            raise IndexError("pop from an empty chain")
+
+        index = len(self._offsets) - 1
+        block = self[index]
+        # The stored count is for the block as written, which an edited (pinned) copy may not match
+        self._transaction_total -= len(self._decode(index).transactions)
+        self._offsets.pop()
+        self._lengths.pop()
+        self._pinned.pop(index, None)
+        self._cache.pop(index, None)
+        return block
+
+    def transaction_count(self):
+        """
+        Returns the number of transactions in the chain, or None if the log predates stored counts.
+        """
+        if not self._counts_known:
+            return None
+        pinned_delta = sum(len(block.transactions) - len(self._decode(i).transactions) for i, block in self._pinned.items())
+        return self._transaction_total + pinned_delta
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
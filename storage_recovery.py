@@ -0,0 +1,152 @@
+"""
+Block Log Recovery Test Cases
+Demonstrates that a record torn by a crash is dropped while corruption inside the log is refused, so damage is
+never "repaired" by deleting the history after it.
+Created by: Zyle Estacion (s4064846)
+RMIT University - INTE264 Assignment 2
+"""
+
+from blockchain import Blockchain
+from storage import HEADER, RECORD_HEADERS, VERSION
+from events import configure_cli, WARNING
+import os
+
+LOG_NAME = "recovery_check.blocklog"
+LOG_PATH = os.path.join("saves", LOG_NAME)
+
+def build_log(blocks=10):
+    """
+    Saves a short chain to a fresh block log and returns its bytes.
+    """
+    remove_log()
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    blockchain.modify_snapshots(None)
+    blockchain.new_block()
+    for i in range(blocks):
+        blockchain.new_transaction("genesis", f"user{i}", i + 1)
+        blockchain.new_block(previous_hash=blockchain.last_block.current_hash)
+    blockchain.save_blockchain(LOG_NAME)
+    blockchain.block_log.close()
+    with open(LOG_PATH, 'rb') as f:
+        return f.read()
+
+def record_offsets(data):
+    """
+    Returns the offset of every record header in a block log.
+    """
+    record_header = RECORD_HEADERS[VERSION]
+    offsets = []
+    offset = HEADER.size
+    while offset + record_header.size <= len(data):
+        offsets.append(offset)
+        offset += record_header.size + record_header.unpack_from(data, offset)[1]
+    return offsets
+
+def write_log(data):
+    with open(LOG_PATH, 'wb') as f:
+        f.write(data)
+
+def load(lazy=False, keep_open=False):
+    """
+    Loads the log into a new chain. The log is closed again unless keep_open is set (to append to it).
+    """
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(1)
+    loaded = blockchain.load_blockchain(LOG_NAME, lazy=lazy)
+    if blockchain.block_log is not None and not keep_open:
+        blockchain.block_log.close()
+    return loaded, blockchain
+
+def remove_log():
+    for name in os.listdir("saves"):
+        if name.startswith(LOG_NAME):
+            os.remove(os.path.join("saves", name))
+
+def test_torn_tail():
+    """
+    A final record whose length runs past the end of the file is ignored on open and cut off before the next append.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 1: Record Torn by a Crash")
+    print("="*50)
+
+    data = build_log()
+    torn = data + RECORD_HEADERS[VERSION].pack(b"B", 500, 0, 0) + b"partial"
+    write_log(torn)
+
+    loaded, blockchain = load(keep_open=True)
+    untouched = os.path.getsize(LOG_PATH) == len(torn)
+    print(f"Loaded {len(blockchain.chain)} blocks: {'✅' if loaded else '❌'}, file left as it was: {'✅' if untouched else '❌'}")
+
+    blockchain.new_transaction("genesis", "late", 1)
+    blockchain.new_block(previous_hash=blockchain.last_block.current_hash)
+    blockchain.save_blockchain(LOG_NAME)
+    blockchain.block_log.close()
+    reloaded, again = load()
+    print(f"After appending a block: {len(again.chain)} blocks load: {'✅' if reloaded else '❌'}")
+    return loaded and untouched and len(blockchain.chain) == 12 and reloaded and len(again.chain) == 12
+
+def test_corrupt_record():
+    """
+    A record that fails its CRC check in the middle of the log is refused, eagerly or lazily, and nothing is cut.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 2: Corruption Inside the Log")
+    print("="*50)
+
+    data = bytearray(build_log())
+    offset = record_offsets(data)[2] + RECORD_HEADERS[VERSION].size + 5
+    data[offset] ^= 0xFF
+    write_log(bytes(data))
+
+    loaded, _ = load()
+    lazily_loaded, _ = load(lazy=True)
+    untouched = os.path.getsize(LOG_PATH) == len(data)
+    print(f"Load refused: {'✅' if not loaded else '❌'}, lazy load refused: {'✅' if not lazily_loaded else '❌'}")
+    print(f"File left as it was ({len(data)} bytes): {'✅' if untouched else '❌'}")
+    return not loaded and not lazily_loaded and untouched
+
+def test_corrupt_last_record():
+    """
+    A complete final record that fails its CRC check is corruption too, not a torn write.
+    """
+    print("\n" + "="*50)
+    print("TEST CASE 3: Corruption in the Last Record")
+    print("="*50)
+
+    data = bytearray(build_log())
+    data[-1] ^= 0xFF
+    write_log(bytes(data))
+
+    loaded, _ = load()
+    untouched = os.path.getsize(LOG_PATH) == len(data)
+    print(f"Load refused: {'✅' if not loaded else '❌'}, file left as it was: {'✅' if untouched else '❌'}")
+    return not loaded and untouched
+
+if __name__ == "__main__":
+    configure_cli(WARNING)
+    print("💾 BLOCK LOG RECOVERY TEST SUITE")
+    print("INTE264 Assignment 2 - Zyle Estacion (s4064846)")
+    print("=" * 60)
+
+    try:
+        results = {
+            "Torn tail dropped": test_torn_tail(),
+            "Corruption inside the log refused": test_corrupt_record(),
+            "Corruption in the last record refused": test_corrupt_last_record(),
+        }
+    finally:
+        remove_log()
+
+    # Final summary
+    print("\n" + "="*60)
+    print("📊 FINAL TEST SUMMARY")
+    print("="*60)
+    for name, passed in results.items():
+        print(f"{name}: {'✅ PASS' if passed else '❌ FAIL'}")
+
+    if all(results.values()):
+        print("\n🎉 All tests passed! Crashes are recovered from and corruption never deletes history.")
+    else:
+        print("\n⚠️ Some tests failed. Review the block log recovery implementation.")
@@ -0,0 +1,281 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Two-stage chain sync from other nodes over the JSON-RPC protocol of node.py.
+
+Blocks are taken from the peer whose chain has the most cumulative work. A block locator (hashes of the local chain,
+densely near the tip and exponentially sparser towards genesis) lets that peer report the last block both chains
+share, so only the headers after it are downloaded.
+
+1. Headers: the header chain (every block without its transactions) is downloaded in parallel chunks and checked
+   in order: hash links, Proof-of-Work against the recorded target (or the leading-zeros difficulty), the retarget
+   schedule, and - for header-hashed blocks - the hash itself.
+2. Bodies: the transaction lists (in the binary codec encoding) are downloaded in parallel chunks over several connections (spread across the
+   peers) and each chunk is checked against its headers (Merkle root, or the full hash for older blocks) while
+   other chunks are still downloading.
+
+Blocks that extend the tip are checked like any received block (check_block: transactions, inputs and target) and
+appended with commit_block, so the indexes are updated incrementally and nothing is re-verified afterwards. Blocks
+of a competing branch go through receive_block and fork choice.
+
+Usage: python sync.py --peer 127.0.0.1:8545 [--peer HOST:PORT ...] [--save synced.blocklog]
+"""
+
+from blockchain import Blockchain
+from block import Block
+from mining import meets_target
+from codec import decode_transactions
+from node import NodeClient
+from events import emit, configure_cli, INFO, WARNING
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import asyncio
+import base64
+import os
+import time
+
+# Headers and bodies requested per call
+HEADER_CHUNK_SIZE = 2000
+BODY_CHUNK_SIZE = 200
+# Connections opened to each peer for body download
+DEFAULT_CONNECTIONS = 4
+# Locator entries taken one block apart before the steps start doubling
+LOCATOR_DENSE_ENTRIES = 10
+
+
+class HeaderChain:
+    """
+    The local chain up to the fork point followed by downloaded headers, indexable like a chain so the retarget
+    rules (Blockchain.expected_target) can be applied to headers that have no block yet.
+    """
+    def __init__(self, chain, start, headers):
+        self.chain = chain
+        self.start = start
+        self.headers = headers
+
+    def __getitem__(self, index):
+        return self.chain[index] if index < self.start else self.headers[index - self.start]
+
+
+def block_locator(chain):
+    """
+    Lists block hashes from the tip back to genesis: the last LOCATOR_DENSE_ENTRIES blocks, then steps that double
+    each time, so a fork anywhere is found with O(log n) hashes.
+
+    Returns:
+        list: Hashes, newest first, always ending with the genesis block (empty for an empty chain).
+    """
+    positions = []
+    position, step = len(chain) - 1, 1
+    while position > 0:
+        positions.append(position)
+        if len(positions) >= LOCATOR_DENSE_ENTRIES:
+            step *= 2
+        position -= step
+    if chain:
+        positions.append(0)
+    return [chain[position].current_hash for position in positions]
+
+
+def header_block(header):
+    """
+    Builds a transaction-less Block from a header so the hashing and retarget rules can be applied to it.
+    """
+    return Block(transactions=[], **header)
+
+
+def check_headers(blockchain, start, headers):
+    """
+    Checks downloaded headers in order, starting at position start of the chain.
+
+    Args:
+        blockchain (Blockchain): The syncing chain (for the local prefix, difficulty and retarget settings).
+        start (int): Chain position of the first header.
+        headers (list): Header Blocks from header_block().
+
+    Returns:
+        int: Number of leading headers that are valid (len(headers) if all are).
+    """
+    previous_hash = blockchain.chain[start - 1].current_hash if start > 0 else None
+    joined = HeaderChain(blockchain.chain, start, headers)
+    prefix = "0" * blockchain.difficulty
+
+    for i, header in enumerate(headers):
+        height = start + i
+        if header.previous_hash != previous_hash or header.id != height + 1:
+            return i
+        if not meets_target(header.current_hash, header.target if header.target is not None else prefix):
+            return i
+        if not blockchain.target_allowed(header.target, height, joined):
+            return i
+        # Header-hashed blocks can be fully checked without their transactions
+        if header.merkle_root is not None and Blockchain.hash(header) != header.current_hash:
+            return i
+        previous_hash = header.current_hash
+    return len(headers)
+
+
+def build_blocks(headers, bodies):
+    """
+    Decodes downloaded bodies (binary codec encodings in base64), combines them with their headers and checks
+    that each body matches its header. Runs in a worker process when several are available.
+
+    Returns:
+        tuple: (list of Blocks, index of the first block whose body does not match, or None)
+    """
+    blocks = []
+    for header, body in zip(headers, bodies):
+        try:
+            block = Block(**dict(header, transactions=decode_transactions(base64.b64decode(body))))
+        except (ValueError, SyntaxError):
+            return blocks, len(blocks)
+        if not Blockchain.verify_hash(block):
+            return blocks, len(blocks)
+        blocks.append(block)
+    return blocks, None
+
+
+async def connect(peers, connections):
+    """
+    Opens several connections to every peer.
+    """
+    clients = []
+    for host, port in peers:
+        for _ in range(connections):
+            clients.append(await NodeClient(host, port).connect())
+    return clients
+
+
+async def fetch_headers(clients, start, end):
+    """
+    Downloads the headers for positions [start, end) in parallel chunks.
+    """
+    chunks = range(start, end, HEADER_CHUNK_SIZE)
+    results = await asyncio.gather(*(
+        clients[i % len(clients)].call('get_headers', start=chunk_start, count=min(HEADER_CHUNK_SIZE, end - chunk_start))
+        for i, chunk_start in enumerate(chunks)
+    ))
+    return [header for chunk in results for header in chunk]
+
+
+async def sync_chain(blockchain, peers, connections=DEFAULT_CONNECTIONS, workers=None):
+    """
+    Brings a chain up to date with the longest chain offered by the peers.
+
+    Args:
+        blockchain (Blockchain): The chain to update.
+        peers (list): (host, port) of the nodes to sync from.
+        connections (int): Connections per peer used for the body download.
+        workers (int): Processes used to check bodies. Defaults to the CPU count; 1 checks them in-process.
+
+    Returns:
+        dict: 'headers' and 'blocks' downloaded, 'height' reached and 'elapsed' seconds.
+    """
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if blockchain.indexes_stale:
+        blockchain.rebuild_indexes()
+
+    clients = await connect(peers, connections)
+    try:
+        # Sync from the peer whose chain has the most work, if it has more than ours
+        infos = await asyncio.gather(*(clients[i * connections].call('get_info') for i in range(len(peers))))
+        best = max(range(len(peers)), key=lambda i: infos[i]['total_work'])
+        height = infos[best]['total_blocks']
+        best_clients = clients[best * connections:(best + 1) * connections]
+        if infos[best]['total_work'] <= blockchain.chain_work():
+            return {'headers': 0, 'blocks': 0, 'height': len(blockchain.chain), 'elapsed': time.perf_counter() - started}
+
+        # Stage 1: headers, from the last block both chains share
+        start = await best_clients[0].call('find_fork', locator=block_locator(blockchain.chain))
+        header_data = await fetch_headers(best_clients, start, height) if height > start else []
+        headers = [header_block(header) for header in header_data]
+        valid = check_headers(blockchain, start, headers)
+        if valid < len(headers):
+            emit(WARNING, 'sync_bad_header', "❌ Header {block_id} failed validation; syncing up to it",
+                 block_id=start + valid + 1)
+            header_data = header_data[:valid]
+
+        if not header_data:
+            return {'headers': 0, 'blocks': 0, 'height': len(blockchain.chain), 'elapsed': time.perf_counter() - started}
+        emit(INFO, 'sync_headers', "📋 {count} headers validated", count=len(header_data))
+
+        # Stage 2: bodies, downloaded over every connection to every peer that has them, checked as they arrive
+        loop = asyncio.get_running_loop()
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        # Only peers on the same chain as the best one can serve its bodies
+        best_tip = infos[best]['last_block_hash']
+        sources = [client for i, client in enumerate(clients) if infos[i // connections]['last_block_hash'] == best_tip]
+
+        async def download(chunk_number, offset):
+            client = sources[chunk_number % len(sources)]
+            chunk_headers = header_data[offset:offset + BODY_CHUNK_SIZE]
+            bodies = await client.call('get_bodies', start=start + offset, count=len(chunk_headers), encoding="binary")
+            return await loop.run_in_executor(executor, build_blocks, chunk_headers, bodies)
+
+        try:
+            results = await asyncio.gather(*(
+                download(n, offset) for n, offset in enumerate(range(0, len(header_data), BODY_CHUNK_SIZE))
+            ))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        # Stage 3: connect. Extending the tip appends each block after checking its transactions; a competing branch
+        # goes through fork choice.
+        extends_tip = start == len(blockchain.chain)
+        connected = 0
+        for blocks, bad in results:
+            for block in blocks:
+                if extends_tip:
+                    reason = blockchain.check_block(block)
+                    if reason is not None:
+                        bad = len(blocks)
+                        emit(WARNING, 'invalid_block', "❌ Block {block_id} rejected: {reason}", block_id=block.id,
+                             reason=reason)
+                        break
+                    # Hash, Proof-of-Work, link and transactions are all checked, so the watermark can move along
+                    verified = blockchain.verified_height == len(blockchain.chain)
+                    blockchain.commit_block(block)
+                    if verified:
+                        blockchain.verified_height = len(blockchain.chain)
+                elif not blockchain.receive_block(block) and block.current_hash not in blockchain.block_tree:
+                    bad = len(blocks)
+                    break
+                connected += 1
+            if bad is not None:
+                emit(WARNING, 'sync_bad_body', "❌ Block {block_id} could not be connected; sync stopped",
+                     block_id=start + connected + 1)
+                break
+
+        elapsed = time.perf_counter() - started
+        emit(INFO, 'sync_complete', "✅ Synced {blocks} blocks in {elapsed:.2f}s (height {height})",
+             blocks=connected, elapsed=elapsed, height=len(blockchain.chain))
+        return {'headers': len(header_data), 'blocks': connected, 'height': len(blockchain.chain), 'elapsed': elapsed}
+    finally:
+        for client in clients:
+            await client.close()
+
+
+def parse_peer(text):
+    host, _, port = text.rpartition(':')
+    return host or "127.0.0.1", int(port)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sync a blockchain from running nodes")
+    parser.add_argument('--peer', action='append', required=True, type=parse_peer, help="HOST:PORT of a node")
+    parser.add_argument('--difficulty', type=int, default=4)
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--save', help="Save the synced chain to this file in saves/")
+    args = parser.parse_args()
+
+    configure_cli()
+    blockchain = Blockchain()
+    blockchain.modify_difficulty(args.difficulty)
+    asyncio.run(sync_chain(blockchain, args.peer, args.connections, args.workers))
+    if args.save:
+        blockchain.save_blockchain(args.save)
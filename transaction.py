@@ -0,0 +1,96 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Compact transaction record. Behaves like the transaction dicts used throughout the project (tx['transaction_id'],
+'sender' in tx, tx.get(...)) but stores its fields in __slots__ instead of a per-instance dict.
+"""
+
+from collections.abc import Mapping
+import sys
+
+
+class Transaction(Mapping):
+    """
+    A single transfer between two parties.
+
+    Attributes:
+        transaction_id (str): Unique SHA-256 transaction ID.
+        sender (str): Sender of the transaction.
+        receiver (str): Receiver of the transaction.
+        amount (int/float): Amount transferred.
+        spent_transactions (list): IDs of the transactions this one spends.
+        transaction_time (float): Time the transaction was created.
+        fee (int/float): Fee paid to the miner, used to prioritise the transaction in the mempool.
+    """
+    # Field order matches the original dict layout, so repr() (and therefore Blockchain.hash) is unchanged
+    __slots__ = ('transaction_id', 'sender', 'receiver', 'amount', 'spent_transactions', 'transaction_time', 'fee')
+
+    def __init__(self, transaction_id, sender, receiver, amount, spent_transactions=None, transaction_time=None, fee=0):
+        # IDs and addresses repeat across many transactions, so share one copy of each string
+        self.transaction_id = sys.intern(transaction_id)
+        self.sender = sys.intern(sender) if isinstance(sender, str) else sender
+        self.receiver = sys.intern(receiver) if isinstance(receiver, str) else receiver
+        self.amount = amount
+        self.spent_transactions = [sys.intern(tx_id) for tx_id in spent_transactions or []]
+        self.transaction_time = transaction_time
+        self.fee = fee
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Creates a record from a transaction dict.
+        """
+        return cls(**{field: data[field] for field in cls.__slots__ if field in data})
+
+    @classmethod
+    def has_layout(cls, data):
+        """
+        Checks whether a transaction dict has exactly the fields (in the same order) a Transaction would produce,
+        so converting it keeps its repr, and therefore block hashes, unchanged.
+        """
+        if not isinstance(data, Mapping):
+            return False
+        keys = tuple(data)
+        return keys == cls.__slots__[:-1] or (keys == cls.__slots__ and bool(data['fee']))
+
+    def fields(self):
+        """
+        Field names present in this transaction. The fee is optional and left out when zero, so fee-less
+        transactions keep exactly the original dict layout.
+        """
+        return self.__slots__ if self.fee else self.__slots__[:-1]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.fields()}
+
+    def __getitem__(self, key):
+        if key not in _FIELD_SET or (key == 'fee' and not self.fee):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key):
+        return key in _FIELD_SET and (key != 'fee' or bool(self.fee))
+
+    def get(self, key, default=None):
+        if key not in _FIELD_SET or (key == 'fee' and not self.fee):
+            return default
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.fields())
+
+    def __len__(self):
+        return len(self.fields())
+
+    def __repr__(self):
+        return repr(self.to_dict())
+
+    def __reduce__(self):
+        # Pickle as positional values only, without repeating the field names for every transaction
+        return (self.__class__, tuple(getattr(self, field) for field in self.__slots__))
+
+
+# Set version of the field names for fast key lookups
+_FIELD_SET = frozenset(Transaction.__slots__)
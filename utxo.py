@@ -0,0 +1,195 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Unspent transaction outputs (UTXOs) and per-address balances, kept up to date block by block.
+
+Every mined transaction creates one output: its amount, owned by its receiver. A later transaction spends outputs by
+listing their transaction IDs in spent_transactions. Inputs are consumed whole, so whatever they hold beyond the
+amount and fee comes back to the sender as a change output, spendable under change_id(transaction ID).
+Transactions without inputs (e.g. from "genesis") issue new funds, as they always have.
+"""
+
+from collections import deque
+from collections.abc import Mapping
+
+# Number of most recent blocks that can be undone (the deepest reorganisation the set supports)
+DEFAULT_UNDO_DEPTH = 100
+# Appended to a transaction ID to name its change output
+CHANGE_SUFFIX = ":change"
+
+
+def change_id(tx_id):
+    """
+    Returns:
+        str: The ID under which the change output of a transaction is spent.
+    """
+    return tx_id + CHANGE_SUFFIX
+
+
+class UTXOSet:
+    """
+    The unspent outputs of a chain, indexed by transaction ID and by owner.
+
+    Blocks must be applied in chain order and undone in reverse order (tip first). Only the last undo_depth blocks can
+    be undone: the outputs spent by older blocks are forgotten, so memory follows the unspent outputs rather than
+    the whole history.
+
+    Attributes:
+        undo_depth (int): Number of most recent blocks that can be undone.
+        outputs (dict): tx_id -> (owner, amount, block_id) for every unspent output.
+        balances (dict): address -> total amount of its unspent outputs.
+        unspent_by_block (dict): block_id -> number of unspent outputs created in that block (blocks without any
+            are left out).
+        newly_spent (list): IDs of the blocks whose last unspent output was spent since the list was last emptied,
+            or None while nobody is tracking them (see track_spent_blocks).
+    """
+    def __init__(self, undo_depth=DEFAULT_UNDO_DEPTH):
+        self.undo_depth = undo_depth
+        self.outputs = {}
+        self.balances = {}
+        self.unspent_by_block = {}
+        self.newly_spent = None
+        self._owned = {}      # address -> set of unspent tx_ids
+        self._spent = {}      # tx_id -> spent output, kept so undo_block can restore it
+        self._undo = deque()  # tx_ids spent by each of the last undo_depth blocks, oldest first
+
+    @staticmethod
+    def _transactions(block):
+        return [tx for tx in block.transactions if isinstance(tx, Mapping) and 'transaction_id' in tx]
+
+    def _add_output(self, tx_id, output):
+        # A transaction ID creates one output only; a repeat must not count its amount twice
+        if tx_id in self.outputs:
+            return
+        owner, amount, block_id = output
+        self.outputs[tx_id] = output
+        self._owned.setdefault(owner, set()).add(tx_id)
+        self.balances[owner] = self.balances.get(owner, 0) + amount
+        self.unspent_by_block[block_id] = self.unspent_by_block.get(block_id, 0) + 1
+
+    def _remove_output(self, tx_id):
+        output = self.outputs.pop(tx_id, None)
+        if output is not None:
+            owner, amount, block_id = output
+            self._owned[owner].discard(tx_id)
+            self.balances[owner] -= amount
+            remaining = self.unspent_by_block[block_id] - 1
+            if remaining:
+                self.unspent_by_block[block_id] = remaining
+            else:
+                del self.unspent_by_block[block_id]
+                if self.newly_spent is not None:
+                    self.newly_spent.append(block_id)
+        return output
+
+    def apply_block(self, block):
+        """
+        Spends the inputs and adds the outputs of a newly appended block.
+        Inputs that are not unspent outputs (e.g. in chains saved before inputs were checked) are ignored.
+        """
+        spent = []
+        for tx in self._transactions(block):
+            tx_id = tx['transaction_id']
+            total_in = 0
+            for spent_tx in tx.get('spent_transactions', []):
+                output = self._remove_output(spent_tx)
+                if output is not None:
+                    self._spent[spent_tx] = output
+                    spent.append(spent_tx)
+                    total_in += output[1]
+
+            amount = tx.get('amount')
+            if isinstance(amount, (int, float)):
+                self._add_output(tx_id, (tx.get('receiver'), amount, block.id))
+                fee = tx.get('fee', 0)
+                change = total_in - amount - (fee if isinstance(fee, (int, float)) else 0)
+                if change > 0:
+                    self._add_output(change_id(tx_id), (tx.get('sender'), change, block.id))
+
+        # The block leaving the undo window can no longer be undone, so its spent outputs are dropped
+        self._undo.append(spent)
+        while len(self._undo) > self.undo_depth:
+            for spent_tx in self._undo.popleft():
+                self._spent.pop(spent_tx, None)
+
+    def undo_block(self, block):
+        """
+        Reverses apply_block for the block at the tip: removes its outputs and restores the outputs it spent.
+
+        Raises:
+            ValueError: If the block is deeper than undo_depth, so the outputs it spent are no longer known.
+        """
+        if not self._undo:
+            raise ValueError(f"Only the last {self.undo_depth} blocks can be undone")
+        self._undo.pop()
+        for tx in reversed(self._transactions(block)):
+            tx_id = tx['transaction_id']
+            self._remove_output(change_id(tx_id))
+            self._remove_output(tx_id)
+            for spent_tx in tx.get('spent_transactions', []):
+                output = self._spent.pop(spent_tx, None)
+                if output is not None:
+                    self._add_output(spent_tx, output)
+
+    def fully_spent(self, block_id):
+        """
+        Returns:
+            bool: True if no output created in the block is still unspent. O(1).
+        """
+        return block_id not in self.unspent_by_block
+
+    def track_spent_blocks(self, enabled=True):
+        """
+        Starts (or stops) recording in newly_spent the blocks whose outputs become fully spent, so a caller can act
+        on them without scanning every block. Starting again empties the list.
+        """
+        self.newly_spent = [] if enabled else None
+
+    def forget_block(self, block):
+        """
+        Drops the undo records of the outputs a block spent, once the block can no longer be undone (pruning mode).
+        """
+        for tx in self._transactions(block):
+            for spent_tx in tx.get('spent_transactions', []):
+                self._spent.pop(spent_tx, None)
+
+    def check_inputs(self, sender, spent_transactions, amount, fee=0):
+        """
+        Checks that a transaction's inputs are unspent outputs owned by the sender and cover the amount plus fee.
+        Runs in O(inputs).
+
+        Returns:
+            str or None: A description of the problem, or None if the inputs are valid.
+        """
+        total = 0
+        for spent_tx in spent_transactions:
+            output = self.outputs.get(spent_tx)
+            if output is None:
+                return f"Input {spent_tx[:8]}... is not an unspent output"
+            if output[0] != sender:
+                return f"Input {spent_tx[:8]}... does not belong to {sender}"
+            total += output[1]
+        if total < amount + fee:
+            return f"Inputs total {total}, less than the amount plus fee ({amount + fee})"
+        return None
+
+    def balance(self, address):
+        return self.balances.get(address, 0)
+
+    def unspent(self, address):
+        """
+        Returns:
+            list: The address's unspent outputs as dicts with 'transaction_id', 'amount' and 'block_id'.
+        """
+        return [
+            {'transaction_id': tx_id, 'amount': self.outputs[tx_id][1], 'block_id': self.outputs[tx_id][2]}
+            for tx_id in sorted(self._owned.get(address, ()), key=lambda tx_id: self.outputs[tx_id][2])
+        ]
+
+    def __contains__(self, tx_id):
+        return tx_id in self.outputs
+
+    def __len__(self):
+        return len(self.outputs)
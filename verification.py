@@ -0,0 +1,110 @@
+# INTE264[1|2] | Blockchain Technology Fundamentals
+# Created by: Zyle Estacion (s4064846)
+# RMIT University
+
+"""
+Parallel full-chain audit. Block hashes are recomputed across a process pool, then the previous_hash links
+are compared in a single pass over the collected hashes. Every bad block is reported, not only the first.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+# Number of blocks sent to a worker at a time
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _check_hashes(blocks):
+    """
+    Recomputes the hash of each block in a batch.
+
+    Returns:
+        list: The IDs of blocks whose stored hash (or Merkle root) does not match.
+    """
+    # Imported here so worker processes resolve the same hashing rules as the chain
+    from blockchain import Blockchain
+    return [block.id for block in blocks if not Blockchain.verify_hash(block)]
+
+
+def find_broken_links(chain):
+    """
+    Compares every block's previous_hash with the hash of the block before it.
+
+    Args:
+        chain (list): The blocks to check, in order.
+
+    Returns:
+        list: The IDs of blocks that do not point at the previous block.
+    """
+    hashes = [block.current_hash for block in chain]
+    previous_hashes = [block.previous_hash for block in chain]
+    return [
+        chain[i].id
+        for i, (expected, found) in enumerate(zip(hashes[:-1], previous_hashes[1:]), start=1)
+        if expected != found
+    ]
+
+
+def find_invalid_targets(chain, expected_target):
+    """
+    Compares every recorded Proof-of-Work target with the one the retargeting rules expect.
+
+    Args:
+        chain (list): The blocks to check, in order.
+        expected_target (callable): Called with a block position; returns the expected target or None if any
+            target is allowed there.
+
+    Returns:
+        list: The IDs of blocks with an unexpected target.
+    """
+    invalid = []
+    for i, block in enumerate(chain):
+        target = getattr(block, 'target', None)
+        if target is None:
+            continue
+        expected = expected_target(i)
+        if expected is not None and target != expected:
+            invalid.append(block.id)
+    return invalid
+
+
+def audit_chain(chain, workers=None, batch_size=DEFAULT_BATCH_SIZE, expected_target=None):
+    """
+    Verifies every block of a chain and collects all failures.
+
+    Args:
+        chain (list): The blocks to check, in order.
+        workers (int): Number of worker processes. Defaults to the CPU count.
+        batch_size (int): Number of blocks hashed per task. Chains shorter than one batch are checked in-process.
+        expected_target (callable): Retargeting rule used to check recorded targets (see find_invalid_targets).
+            Targets are not checked against the schedule if None.
+
+    Returns:
+        dict: Report with 'valid', 'checked', 'invalid_hashes', 'broken_links' and 'invalid_targets' (lists of
+            block IDs), and 'first_invalid_index' (position of the first bad block, or None).
+    """
+    workers = workers or os.cpu_count() or 1
+    blocks = list(chain)
+    batches = [blocks[i:i + batch_size] for i in range(0, len(blocks), batch_size)]
+
+    if workers == 1 or len(batches) <= 1:
+        results = map(_check_hashes, batches)
+        invalid_hashes = [block_id for batch in results for block_id in batch]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            invalid_hashes = [block_id for batch in executor.map(_check_hashes, batches) for block_id in batch]
+
+    broken_links = find_broken_links(blocks)
+    invalid_targets = find_invalid_targets(blocks, expected_target) if expected_target is not None else []
+
+    bad_ids = set(invalid_hashes) | set(broken_links) | set(invalid_targets)
+    first_invalid_index = next((i for i, block in enumerate(blocks) if block.id in bad_ids), None)
+
+    return {
+        'valid': not bad_ids,
+        'checked': len(blocks),
+        'invalid_hashes': invalid_hashes,
+        'broken_links': broken_links,
+        'invalid_targets': invalid_targets,
+        'first_invalid_index': first_invalid_index
+    }